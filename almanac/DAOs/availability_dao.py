@@ -0,0 +1,150 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+import pytz
+from psycopg2.extras import DateTimeRange, DateTimeTZRange
+from sqlalchemy import func
+
+from almanac.DAOs.base_dao import BaseDAO
+from almanac.exc.exceptions import DAOException
+from almanac.models import db
+from almanac.models import EventTable as Event
+from almanac.models import ScheduleTable as Schedule
+
+VALID_SLOT_DURATIONS = [5, 15, 30, 60]
+MAX_WINDOW = timedelta(days=31)
+
+
+class AvailabilityDAO(BaseDAO):
+    """
+    Handles computing a user's bookable time.
+    """
+
+    def get_bookable_slots(self, user_id, window_start, window_end, duration):
+        """
+        Retrieves every bookable slot of `duration` minutes for a user within
+        the requested window. Slots are carved out of the user's schedules
+        minus the events already booked against them.
+
+        :param str user_id: The user whose time is being booked.
+        :param datetime.datetime window_start: The start of the window.
+        :param datetime.datetime window_end: The end of the window.
+        :param int duration: The length of each slot in minutes.
+        :raises: DAOException
+        :rtype: list[tuple]
+        :return: `(utc_start, utc_end)` pairs ordered by start.
+        """
+        if duration not in VALID_SLOT_DURATIONS:
+            raise DAOException(
+                'Invalid duration. Attempted duration is not of valid length.'
+            )
+
+        window_start = self._to_naive_utc(window_start)
+        window_end = self._to_naive_utc(window_end)
+
+        if window_start >= window_end:
+            raise DAOException(
+                'Invalid start time. Start must be before the end.'
+            )
+
+        if window_end - window_start > MAX_WINDOW:
+            raise DAOException(
+                'Invalid window. Availability can be requested for at most '
+                '{0} days at a time.'.format(MAX_WINDOW.days)
+            )
+
+        window_start = max(window_start, datetime.utcnow())
+        if window_start >= window_end:
+            return []
+
+        schedules = db.session.query(
+            func.lower(Schedule.utc_duration),
+            func.upper(Schedule.utc_duration),
+        ).filter(
+            Schedule.user_id == user_id,
+            Schedule.utc_duration.op('&&')(
+                DateTimeRange(window_start, window_end)
+            ),
+        ).all()
+
+        events = db.session.query(
+            func.lower(Event.utc_duration),
+            func.upper(Event.utc_duration),
+        ).filter(
+            Event.scheduled_user_id == user_id,
+            Event.utc_duration.op('&&')(
+                DateTimeTZRange(
+                    pytz.utc.localize(window_start),
+                    pytz.utc.localize(window_end),
+                )
+            ),
+        ).all()
+
+        return self._compute_slots(
+            [(self._to_naive_utc(l), self._to_naive_utc(u)) for l, u in schedules],
+            [(self._to_naive_utc(l), self._to_naive_utc(u)) for l, u in events],
+            window_start,
+            window_end,
+            timedelta(minutes=duration),
+        )
+
+    @staticmethod
+    def _compute_slots(schedules, events, window_start, window_end, length):
+        """
+        Sweeps the schedules and events in start order, subtracting the busy
+        time from every schedule and cutting what's left into slots.
+
+        A slot never spans two schedules (bookings must fit within a single
+        schedule) and never crosses midnight, mirroring
+        `_assert_schedule_exists` and `_assert_valid_duration`. A schedule
+        clipped by `window_start` (e.g. one that's already open) is still cut
+        on its own `lower + k * length` grid, so every slot can be booked back
+        as is.
+
+        :param list[tuple] schedules: `(lower, upper)` naive UTC schedules.
+        :param list[tuple] events: `(lower, upper)` naive UTC events.
+        :param datetime.datetime window_start: Drop slots starting before
+        this.
+        :param datetime.datetime window_end: Clip everything to this end.
+        :param datetime.timedelta length: The length of each slot.
+        :rtype: list[tuple]
+        :return: `(utc_start, utc_end)` pairs ordered by start.
+        """
+        busy = []
+        for lower, upper in sorted(events):
+            if busy and lower <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], upper)
+            else:
+                busy.append([lower, upper])
+
+        busy_ends = [upper for lower, upper in busy]
+
+        slots = set()
+        for lower, upper in sorted(schedules):
+            cursor = lower
+            if window_start > lower:
+                # Round up to the schedule's next slot boundary.
+                cursor += -((lower - window_start) // length) * length
+            upper = min(upper, window_end)
+
+            i = bisect_right(busy_ends, cursor)
+            while cursor < upper:
+                if i < len(busy) and busy[i][0] < upper:
+                    free_until = busy[i][0]
+                else:
+                    free_until = upper
+
+                slot_start = cursor
+                while slot_start + length <= free_until:
+                    slot_end = slot_start + length
+                    if slot_end.day == slot_start.day:
+                        slots.add((slot_start, slot_end))
+                    slot_start = slot_end
+
+                if free_until == upper:
+                    break
+
+                cursor = max(cursor, busy[i][1])
+                i += 1
+
+        return sorted(slots)
@@ -1,12 +1,13 @@
-from sqlalchemy import and_
-from sqlalchemy import func
-from datetime import datetime
+from datetime import datetime, timedelta
 from dateutil import relativedelta
 
 import math
+import pytz
 
-from almanac.models import ScheduleTable as Schedule, db
 from almanac.exc.exceptions import DAOException
+from almanac.utils.schedule_index import get_schedule_index
+
+MAX_QUERY_WINDOW = timedelta(days=366)
 
 
 class BaseDAO(object):
@@ -59,17 +60,9 @@ class BaseDAO(object):
         if start_time.tzinfo is not None:
             start_time = start_time.replace(tzinfo=None)
 
-        schedule = db.session.query(
-            Schedule
-        ).filter(
-            Schedule.user_id == scheduled_user_id,
-            func.lower(Schedule.utc_duration) <= start_time,
-            func.upper(Schedule.utc_duration) >= end_time,
-        )
-
-        schedule = schedule.first()
+        schedule_index = get_schedule_index(scheduled_user_id)
 
-        if schedule is None:
+        if not schedule_index.covers(start_time, end_time):
             raise DAOException(
                 'Invalid event. User does not have an open schedule time slot '
                 'for the requested booking.'
@@ -94,19 +87,66 @@ class BaseDAO(object):
                 'Cannot create schedules in the past.'
             )
 
-    def _add_time_period(self, time_period_offset):
+    def _get_query_window(self, time_period_offset=0, window_start=None,
+                          window_end=None):
         """
-        Adds a time period offset to get the current period.
+        Resolves the `[start, end)` window a listing should cover. An explicit
+        window wins, otherwise the calendar month `time_period_offset` months
+        away from the current one is used.
 
-        :param int time_period_offset: The offset for teh current time period.
-        :rtype: datetime
-        :return: The current date + time period offset.
+        :param int time_period_offset: The offset for the current month.
+        :param datetime.datetime window_start: The start of an explicit window.
+        :param datetime.datetime window_end: The end of an explicit window.
+        :raises: DAOException
+        :rtype: tuple
+        :return: The naive UTC start and end of the window.
         """
-        time_now = datetime.today()
+        if window_start is None and window_end is None:
+            month_start = datetime.utcnow().replace(
+                day=1,
+                hour=0,
+                minute=0,
+                second=0,
+                microsecond=0,
+            ) + relativedelta.relativedelta(months=time_period_offset)
+
+            return (
+                month_start,
+                month_start + relativedelta.relativedelta(months=1),
+            )
+
+        if window_start is None or window_end is None:
+            raise DAOException(
+                'Invalid window. Both a start and an end are required.'
+            )
+
+        window_start = self._to_naive_utc(window_start)
+        window_end = self._to_naive_utc(window_end)
 
-        time_now = time_now + relativedelta.relativedelta(
-            months=time_period_offset
-        )
+        if window_start >= window_end:
+            raise DAOException(
+                'Invalid start time. Start must be before the end.'
+            )
+
+        if window_end - window_start > MAX_QUERY_WINDOW:
+            raise DAOException(
+                'Invalid window. At most {0} days can be requested at a '
+                'time.'.format(MAX_QUERY_WINDOW.days)
+            )
+
+        return window_start, window_end
+
+    @staticmethod
+    def _to_naive_utc(time):
+        """
+        Converts a datetime to a naive UTC datetime.
+
+        :param datetime.datetime time: A naive (assumed UTC) or aware time.
+        :rtype: datetime.datetime
+        :return: The naive UTC time.
+        """
+        if time.tzinfo is None:
+            return time
 
-        return time_now
+        return time.astimezone(pytz.utc).replace(tzinfo=None)
 
@@ -1,14 +1,15 @@
 import logging
 
-from braintree import WebhookNotification
 from flask import current_app
 
 from almanac.DAOs.base_dao import BaseDAO
 from almanac.exc.exceptions import DAOException
+from almanac.integrations.braintree.sdk import braintree
 from almanac.models import db
 from almanac.models import MasterMerchantTable as MasterMerchant
 from almanac.models import SubmerchantTable as SubMerchant
 from almanac.utils.database_utils import exec_and_commit
+from almanac.utils.profile_cache import invalidate_profile
 
 
 class MerchantDAO(BaseDAO):
@@ -80,6 +81,7 @@ class MerchantDAO(BaseDAO):
             new_submerchant,
             skip_commit=skip_commit
         )
+        invalidate_profile(user_id)
 
         return submerchant_info
 
@@ -116,7 +118,9 @@ class MerchantDAO(BaseDAO):
         :param WebhookNotification notify: The parsed notifcation received
         from an endpoint
         """
-        if notify.kind == WebhookNotification.Kind.SubMerchantAccountApproved:
+        approved = braintree.WebhookNotification.Kind.SubMerchantAccountApproved
+
+        if notify.kind == approved:
             db.session.query(
                 SubMerchant
             ).filter_by(
@@ -136,3 +140,10 @@ class MerchantDAO(BaseDAO):
                 'is_approved': False,
             })
             db.session.commit()
+
+        for submerchant_user_id, in db.session.query(
+            SubMerchant.user_id
+        ).filter_by(
+            braintree_account_id=notify.merchant_account.id,
+        ):
+            invalidate_profile(submerchant_user_id)
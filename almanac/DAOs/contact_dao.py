@@ -9,13 +9,16 @@ class ContactUsDAO(BaseDAO):
     Handles "contact us" form.
     """
 
-    def add_new_contact_message(self, name, message, email):
+    def add_new_contact_message(self, name, message, email, *,
+                                skip_commit=False):
         """
         Handles arhciving a contact us email.
 
         :param str name: The user's name.
         :param str message: The user's message.
         :param str email: The user's email.
+        :param bool skip_commit: Add the message to the session, but leave
+        committing it to the caller.
         :rtype: ContactTable
         :return: The new contact message.
         """
@@ -25,6 +28,10 @@ class ContactUsDAO(BaseDAO):
             message
         )
 
-        exec_and_commit(db.session.add, new_submission)
+        exec_and_commit(
+            db.session.add,
+            new_submission,
+            skip_commit=skip_commit
+        )
 
         return new_submission
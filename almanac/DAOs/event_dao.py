@@ -1,16 +1,39 @@
+import base64
 import dateutil
 import logging
 import pytz
+from http import HTTPStatus
 
-from sqlalchemy import or_, extract
+from psycopg2.extras import DateTimeTZRange
+from sqlalchemy import or_, extract, func, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import aliased
 
 from almanac.DAOs.base_dao import BaseDAO
-from almanac.exc.exceptions import DAOException
+from almanac.exc.exceptions import DAOException, SQLException
 from almanac.models import UserTable as User
 from almanac.models import db
 from almanac.models import EventTable as Event
-from almanac.utils.database_utils import exec_and_commit
+from almanac.models import SubmerchantTable as Submerchant
+from almanac.utils.database_utils import (
+    advisory_xact_lock,
+    exec_and_commit,
+    is_exclusion_violation,
+)
+from almanac.utils.schedule_index import get_schedule_index
+from almanac.utils.user_loader import get_user_loader
+
+MAX_BULK_EVENTS = 50
+DEFAULT_HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+HISTORY_CHUNK_SIZE = 100
+
+# Rejects events overlapping another of the scheduled user's events. See
+# migration e1a6c3f08d27.
+OVERLAP_CONSTRAINT = 'excl_events_scheduled_user_overlap'
+
+# Advisory lock namespace serializing bookings against a scheduled user.
+BOOKING_LOCK_NAMESPACE = 1
 
 
 class EventDAO(BaseDAO):
@@ -18,39 +41,99 @@ class EventDAO(BaseDAO):
     Handles event management.
     """
 
-    def get_for_scheduling_user(self, user_id, time_offset=0):
+    def get_for_scheduling_user(self, user_id, time_offset=0, *,
+                                window_start=None, window_end=None):
         """
-        Returns all booked events for a scheduling user.
+        Returns the booked events for a scheduling user overlapping the
+        requested month (or explicit window).
 
         :param str user_id: The user to retrieve scheduled events for.
+        :param int time_offset: The offset from the current month.
+        :param datetime.datetime window_start: The start of an explicit
+        `[start, end)` window, used instead of the month.
+        :param datetime.datetime window_end: The end of the explicit window.
+        :raises: DAOException
         :rtype: list[EventTable]
-        :return: All booked events for a user.
+        :return: The booked events ordered by start time.
         """
-        current_timeperiod = self._add_time_period(
-            time_offset
-        )
-
-        return db.session.query(Event).filter(
+        return self._get_in_window(
             Event.scheduling_user_id == user_id,
-            Event.month_number == current_timeperiod.month,
-        ).all()
+            time_offset,
+            window_start,
+            window_end,
+        )
 
-    def get_for_scheduled_user(self, user_id, time_offset=0):
+    def get_for_scheduled_user(self, user_id, time_offset=0, *,
+                               window_start=None, window_end=None):
         """
-        Returns all booked events for a scheduled user.
+        Returns the booked events for a scheduled user overlapping the
+        requested month (or explicit window).
 
         :param str user_id: The user to retrieve scheduled events for.
+        :param int time_offset: The offset from the current month.
+        :param datetime.datetime window_start: The start of an explicit
+        `[start, end)` window, used instead of the month.
+        :param datetime.datetime window_end: The end of the explicit window.
+        :raises: DAOException
         :rtype: list[EventTable]
-        :return: All booked events for a user.
+        :return: The booked events ordered by start time.
         """
-        current_timeperiod = self._add_time_period(
-            time_offset
+        return self._get_in_window(
+            Event.scheduled_user_id == user_id,
+            time_offset,
+            window_start,
+            window_end,
         )
 
-        return Event.query.filter(
-            Event.scheduled_user_id == user_id,
-            Event.month_number == current_timeperiod.month,
-        ).all()
+    def get_history_page(self, user_id, is_scheduling, *, cursor=None,
+                         limit=DEFAULT_HISTORY_PAGE_SIZE):
+        """
+        Returns one page of a user's events, newest first. Pages are keyed on
+        (start time, id) rather than offsets, so every page costs the same no
+        matter how deep into the history it is.
+
+        :param str user_id: The user to retrieve events for.
+        :param bool is_scheduling: Whether the user booked the events (True)
+        or was booked (False).
+        :param str cursor: The cursor returned with the previous page.
+        :param int limit: The most events to return.
+        :raises: DAOException
+        :rtype: tuple
+        :return: The events and the cursor of the next page (None if this was
+        the last page).
+        """
+        events = self._history_query(
+            user_id,
+            is_scheduling,
+            cursor,
+        ).limit(limit + 1).all()
+
+        if len(events) <= limit:
+            return events, None
+
+        events = events[:limit]
+        return events, self._encode_history_cursor(events[-1])
+
+    def iter_history(self, user_id, is_scheduling, *, cursor=None,
+                     chunk_size=HISTORY_CHUNK_SIZE):
+        """
+        Iterates over a user's events, newest first, fetching `chunk_size`
+        rows at a time through a server-side cursor.
+
+        :param str user_id: The user to retrieve events for.
+        :param bool is_scheduling: Whether the user booked the events (True)
+        or was booked (False).
+        :param str cursor: Resume after the event this cursor points at.
+        :param int chunk_size: The number of rows fetched per round trip.
+        :raises: DAOException
+        :rtype: generator
+        :return: The user's events.
+        """
+        return self._history_query(
+            user_id,
+            is_scheduling,
+            cursor,
+        ).yield_per(chunk_size)
 
     def get_by_event_id(self, user_id, event_id):
         """
@@ -93,6 +176,18 @@ class EventDAO(BaseDAO):
 
         return event
 
+    def lock_scheduled_user(self, scheduled_user_id):
+        """
+        Makes bookings against a scheduled user wait for each other until
+        this transaction commits or rolls back. Bookings against other users
+        aren't held up.
+
+        :param str scheduled_user_id: The user whose time is being booked.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        advisory_xact_lock(BOOKING_LOCK_NAMESPACE, scheduled_user_id)
+
     def create_new_event(
             self,
             scheduling_user_id,
@@ -121,15 +216,45 @@ class EventDAO(BaseDAO):
         :rtype: EventTable
         :return: The newly created event.
         """
-        start_time = pytz.timezone(local_tz).localize(
-            dateutil.parser.parse(localized_start_time)
-        )
-        end_time = pytz.timezone(local_tz).localize(
-            dateutil.parser.parse(localized_end_time)
+        new_event = self.build_new_event(
+            scheduling_user_id,
+            scheduled_user_id,
+            localized_start_time,
+            localized_end_time,
+            local_tz,
+            notes,
         )
 
-        start_time = start_time.astimezone(pytz.timezone('UTC'))
-        end_time = end_time.astimezone(pytz.timezone('UTC'))
+        self.insert_events([new_event], skip_commit=skip_commit)
+
+        return new_event
+
+    def build_new_event(
+            self,
+            scheduling_user_id,
+            scheduled_user_id,
+            localized_start_time,
+            localized_end_time,
+            local_tz,
+            notes=None,
+    ):
+        """
+        Validates and prices a new event for the scheduled user, without
+        adding it to the session.
+
+        :param str scheduling_user_id: The user creating the event.
+        :param str scheduled_user_id: The user who's time is being purchased
+        :param datetime.datetime localized_start_time: The localized start.
+          Converted to UTC for insert.
+        :param datetime.datetime localized_end_time: The localized end
+        :param str local_tz: The timezone in which the event was created.
+        :param str notes: Any notes written by the scheduling user.
+        :raises: DAOException
+        :rtype: EventTable
+        :return: The new (not yet inserted) event.
+        """
+        start_time = self._localized_to_utc(localized_start_time, local_tz)
+        end_time = self._localized_to_utc(localized_end_time, local_tz)
 
         self._assert_not_in_past(start_time, end_time)
 
@@ -141,7 +266,7 @@ class EventDAO(BaseDAO):
 
         self._assert_valid_duration(start_time, end_time)
 
-        new_event = Event(
+        return Event(
             start_time,
             end_time,
             scheduling_user_id,
@@ -149,9 +274,130 @@ class EventDAO(BaseDAO):
             notes
         )
 
-        exec_and_commit(db.session.add, new_event, skip_commit=skip_commit)
+    def create_events_bulk(
+            self,
+            scheduling_user_id,
+            scheduled_user_id,
+            events,
+            local_tz,
+            *,
+            skip_commit=False
+    ):
+        """
+        Creates several events against one scheduled user at once. The batch
+        is inserted in a single transaction.
 
-        return new_event
+        :param str scheduling_user_id: The user creating the events.
+        :param str scheduled_user_id: The user who's time is being purchased
+        :param list[dict] events: Each event's `localized_start_time`,
+        `localized_end_time` and (optionally) `notes`.
+        :param str local_tz: The timezone in which the events were created.
+        :param bool skip_commit: An optional flag used to indicate if we want
+        to create the objects and add to DB delta, but not commit them just
+        yet.
+        :raises: DAOException
+        :rtype: list[EventTable]
+        :return: The newly created events, in the order requested.
+        """
+        new_events = self.build_events_bulk(
+            scheduling_user_id,
+            scheduled_user_id,
+            events,
+            local_tz,
+        )
+
+        self.insert_events(new_events, skip_commit=skip_commit)
+
+        return new_events
+
+    def build_events_bulk(
+            self,
+            scheduling_user_id,
+            scheduled_user_id,
+            events,
+            local_tz,
+    ):
+        """
+        Validates and prices several events against one scheduled user,
+        without adding them to the session. The users, the submerchant and
+        the scheduled user's schedules are loaded once for the whole batch.
+
+        :param str scheduling_user_id: The user creating the events.
+        :param str scheduled_user_id: The user who's time is being purchased
+        :param list[dict] events: Each event's `localized_start_time`,
+        `localized_end_time` and (optionally) `notes`.
+        :param str local_tz: The timezone in which the events were created.
+        :raises: DAOException
+        :rtype: list[EventTable]
+        :return: The new (not yet inserted) events, in the order requested.
+        """
+        if not events:
+            raise DAOException('At least one event must be supplied.')
+
+        if len(events) > MAX_BULK_EVENTS:
+            raise DAOException(
+                'Too many events requested. At most {0} events can be '
+                'booked at once.'.format(MAX_BULK_EVENTS)
+            )
+
+        durations = []
+        for i, event in enumerate(events):
+            start_time = self._localized_to_utc(
+                event['localized_start_time'],
+                local_tz,
+            )
+            end_time = self._localized_to_utc(
+                event['localized_end_time'],
+                local_tz,
+            )
+
+            try:
+                self._assert_not_in_past(start_time, end_time)
+                self._assert_valid_duration(start_time, end_time)
+            except DAOException as e:
+                raise DAOException('Event {0}: {1}'.format(i + 1, e.msg))
+
+            durations.append((start_time, end_time))
+
+        self._assert_no_batch_overlap(durations)
+
+        schedule_index = get_schedule_index(scheduled_user_id)
+        for i, (start_time, end_time) in enumerate(durations):
+            if not schedule_index.covers(
+                    start_time.replace(tzinfo=None),
+                    end_time.replace(tzinfo=None),
+            ):
+                raise DAOException(
+                    'Event {0}: Invalid event. User does not have an open '
+                    'schedule time slot for the requested booking.'.format(
+                        i + 1,
+                    )
+                )
+
+        scheduling_user, scheduled_user = get_user_loader().load_many([
+            scheduling_user_id,
+            scheduled_user_id,
+        ])
+
+        submerchant = db.session.query(
+            Submerchant
+        ).filter_by(
+            user_id=scheduled_user_id
+        ).first()
+
+        return [
+            Event(
+                start_time,
+                end_time,
+                scheduling_user_id,
+                scheduled_user_id,
+                event.get('notes'),
+                scheduling_user_info=scheduling_user,
+                scheduled_user_info=scheduled_user,
+                submerchant_info=submerchant,
+            )
+            for (start_time, end_time), event in zip(durations, events)
+        ]
 
     def eradicate_event(self, event_public_id):
         """
@@ -175,3 +421,129 @@ class EventDAO(BaseDAO):
         exec_and_commit(db.session.delete, found_event)
 
         return found_event
+
+    def insert_events(self, new_events, *, skip_commit=False):
+        """
+        Inserts new events. They're flushed straight away, even when the
+        commit is skipped, so a slot which has already been booked is caught
+        here by the overlap constraint rather than after payment.
+
+        :param list[EventTable] new_events: The events to insert.
+        :param bool skip_commit: Insert the events, but leave committing
+        them to the caller.
+        :raises: DAOException, SQLException
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        try:
+            db.session.add_all(new_events)
+            db.session.flush()
+        except IntegrityError as e:
+            db.session.rollback()
+
+            if is_exclusion_violation(e, OVERLAP_CONSTRAINT):
+                raise DAOException(
+                    'Invalid event. The requested time slot has already '
+                    'been booked.',
+                    HTTPStatus.CONFLICT,
+                )
+
+            logging.error(
+                'Failed to insert events {0} due to exception {1}'.format(
+                    new_events,
+                    e,
+                )
+            )
+            raise SQLException('Error processing request.')
+
+        if not skip_commit:
+            db.session.commit()
+
+    def _get_in_window(self, user_filter, time_offset, window_start,
+                       window_end):
+        window_start, window_end = self._get_query_window(
+            time_offset,
+            window_start,
+            window_end,
+        )
+
+        return db.session.query(Event).filter(
+            user_filter,
+            Event.utc_duration.op('&&')(
+                DateTimeTZRange(
+                    pytz.utc.localize(window_start),
+                    pytz.utc.localize(window_end),
+                )
+            ),
+        ).order_by(
+            func.lower(Event.utc_duration),
+        ).all()
+
+    def _history_query(self, user_id, is_scheduling, cursor):
+        start = func.lower(Event.utc_duration)
+
+        query = db.session.query(Event).filter(
+            (
+                Event.scheduling_user_id
+                if is_scheduling
+                else Event.scheduled_user_id
+            ) == user_id,
+        )
+
+        if cursor is not None:
+            cursor_start, cursor_id = self._decode_history_cursor(cursor)
+            query = query.filter(
+                tuple_(start, Event.id) < tuple_(cursor_start, cursor_id)
+            )
+
+        return query.order_by(start.desc(), Event.id.desc())
+
+    @staticmethod
+    def _encode_history_cursor(event):
+        return base64.urlsafe_b64encode(
+            '{0}|{1}'.format(
+                event.utc_duration.lower.isoformat(),
+                event.id,
+            ).encode('utf-8')
+        ).decode('ascii')
+
+    @staticmethod
+    def _decode_history_cursor(cursor):
+        try:
+            start, event_id = base64.urlsafe_b64decode(
+                cursor.encode('ascii')
+            ).decode('utf-8').rsplit('|', 1)
+
+            return dateutil.parser.parse(start), int(event_id)
+        except ValueError:
+            raise DAOException('Invalid cursor. Please refresh and try again.')
+
+    def _assert_no_batch_overlap(self, durations):
+        """
+        Asserts that none of the events requested together overlap.
+
+        :param list[tuple] durations: `(start_time, end_time)` pairs.
+        :raises: DAOException
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        ordered = sorted(durations)
+
+        for previous, current in zip(ordered, ordered[1:]):
+            if current[0] < previous[1]:
+                raise DAOException(
+                    'Invalid events. Requested events overlap each other.'
+                )
+
+    def _localized_to_utc(self, localized_time, local_tz):
+        """
+        Parses a localized time string and converts it to UTC.
+
+        :param str localized_time: The time, local to `local_tz`.
+        :param str local_tz: The timezone the time was created in.
+        :rtype: datetime.datetime
+        :return: The time converted to UTC.
+        """
+        return pytz.timezone(local_tz).localize(
+            dateutil.parser.parse(localized_time)
+        ).astimezone(pytz.timezone('UTC'))
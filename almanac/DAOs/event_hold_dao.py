@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+from http import HTTPStatus
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from almanac.DAOs.base_dao import BaseDAO
+from almanac.DAOs.event_dao import EventDAO
+from almanac.exc.exceptions import DAOException, SQLException
+from almanac.models import db
+from almanac.models import EventTable as Event
+from almanac.models import EventHoldTable as EventHold
+from almanac.utils.database_utils import is_exclusion_violation
+
+# Rejects holds overlapping another of the scheduled user's holds. See
+# migration f3b9d2e6a104.
+HOLD_OVERLAP_CONSTRAINT = 'excl_event_holds_scheduled_user_overlap'
+
+
+class EventHoldDAO(BaseDAO):
+    """
+    Handles holding time slots while their events are being paid for.
+
+    Every method runs under the scheduled user's booking lock and ends its
+    own (short) transaction, so no lock or connection is kept for the
+    duration of a payment.
+    """
+
+    def place(self, events, ttl):
+        """
+        Holds the slots of new events, all against the same scheduled user,
+        and commits. Any of the user's expired holds are cleared out first.
+
+        :param list[EventTable] events: The (not yet inserted) events.
+        :param int ttl: Seconds until the holds expire.
+        :raises: DAOException, SQLException
+        :rtype: list[str]
+        :return: The holds' public IDs, in the order of `events`.
+        """
+        scheduled_user_id = events[0].scheduled_user_id
+
+        EventDAO().lock_scheduled_user(scheduled_user_id)
+
+        now = datetime.utcnow()
+
+        db.session.query(EventHold).filter(
+            EventHold.scheduled_user_id == scheduled_user_id,
+            EventHold.expires_at <= now,
+        ).delete(synchronize_session=False)
+
+        if self._is_taken(scheduled_user_id, events, now):
+            db.session.rollback()
+            raise DAOException(
+                'Invalid event. The requested time slot has already '
+                'been booked.',
+                HTTPStatus.CONFLICT,
+            )
+
+        holds = [EventHold(event, ttl) for event in events]
+        hold_ids = [hold.public_id for hold in holds]
+
+        try:
+            db.session.add_all(holds)
+            db.session.flush()
+        except IntegrityError as e:
+            db.session.rollback()
+
+            if is_exclusion_violation(e, HOLD_OVERLAP_CONSTRAINT):
+                raise DAOException(
+                    'Invalid event. The requested time slot has already '
+                    'been booked.',
+                    HTTPStatus.CONFLICT,
+                )
+
+            logging.error(
+                'Failed to place holds {0} due to exception {1}'.format(
+                    holds,
+                    e,
+                )
+            )
+            raise SQLException('Error processing request.')
+
+        db.session.commit()
+
+        return hold_ids
+
+    def claim(self, hold_ids, scheduled_user_id):
+        """
+        Takes the scheduled user's booking lock and removes the holds, ready
+        for their events to be inserted in the same transaction. A hold which
+        has expired is still honored until someone else's booking or the
+        sweeper clears it out.
+
+        :param list[str] hold_ids: The holds' public IDs.
+        :param str scheduled_user_id: The user the holds were placed against.
+        :raises: DAOException
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        EventDAO().lock_scheduled_user(scheduled_user_id)
+
+        claimed = db.session.query(EventHold).filter(
+            EventHold.public_id.in_(hold_ids),
+        ).delete(synchronize_session=False)
+
+        if claimed != len(hold_ids):
+            db.session.rollback()
+
+            logging.error(
+                'Lost {0} of holds {1} for user {2} before payment '
+                'finished.'.format(
+                    len(hold_ids) - claimed,
+                    hold_ids,
+                    scheduled_user_id,
+                )
+            )
+            raise DAOException(
+                'Invalid event. The hold on the requested time slot expired '
+                'before payment finished.',
+                HTTPStatus.CONFLICT,
+            )
+
+    def release(self, hold_ids):
+        """
+        Removes holds whose events won't be booked, and commits.
+
+        :param list[str] hold_ids: The holds' public IDs.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        db.session.query(EventHold).filter(
+            EventHold.public_id.in_(hold_ids),
+        ).delete(synchronize_session=False)
+
+        db.session.commit()
+
+    def _is_taken(self, scheduled_user_id, events, now):
+        """
+        Tells if any of the events overlap one of the scheduled user's booked
+        events or live holds.
+
+        :param str scheduled_user_id: The user whose time is being booked.
+        :param list[EventTable] events: The (not yet inserted) events.
+        :param datetime.datetime now: Holds expiring before this are ignored.
+        :rtype: bool
+        :return: Whether any of the slots are taken.
+        """
+        booked = db.session.query(Event).filter(
+            Event.scheduled_user_id == scheduled_user_id,
+            or_(*[
+                Event.utc_duration.op('&&')(event.utc_duration)
+                for event in events
+            ]),
+        ).exists()
+
+        held = db.session.query(EventHold).filter(
+            EventHold.scheduled_user_id == scheduled_user_id,
+            EventHold.expires_at > now,
+            or_(*[
+                EventHold.utc_duration.op('&&')(event.utc_duration)
+                for event in events
+            ]),
+        ).exists()
+
+        return db.session.query(or_(booked, held)).scalar()
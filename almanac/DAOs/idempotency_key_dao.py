@@ -0,0 +1,204 @@
+import logging
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+from sqlalchemy.dialects.postgresql import insert
+
+from almanac.DAOs.base_dao import BaseDAO
+from almanac.exc.exceptions import DAOException
+from almanac.models import db
+from almanac.models import IdempotencyKeyTable as IdempotencyKey
+
+# Times `begin` tries to insert a key whose row keeps vanishing under it.
+MAX_INSERT_ATTEMPTS = 3
+
+
+class IdempotencyKeyDAO(BaseDAO):
+    """
+    Handles the stored responses of requests sent with an `Idempotency-Key`.
+    Every method ends its own transaction.
+    """
+
+    def begin(self, user_id, key, request_hash, *, ttl, lease):
+        """
+        Claims a key for a request about to run, unless a response for it
+        has already been stored. A replayed retry costs a single lookup on
+        `(user_id, key)`.
+
+        :param str user_id: The user sending the request.
+        :param str key: The request's `Idempotency-Key` header.
+        :param str request_hash: Identifies the request's method, path and
+        body.
+        :param int ttl: Seconds a stored response is kept for.
+        :param int lease: Seconds after which a request still in flight is
+        presumed dead, and its key handed to a retry.
+        :raises: DAOException
+        :rtype: IdempotencyKeyTable
+        :return: The stored response to replay, or None if the caller now
+        holds the key and must run the request.
+        """
+        record = self._get(user_id, key)
+
+        attempts = 0
+        while record is None:
+            if attempts == MAX_INSERT_ATTEMPTS:
+                db.session.rollback()
+                raise DAOException(
+                    'A request with this Idempotency-Key is still being '
+                    'processed. Please retry shortly.',
+                    HTTPStatus.CONFLICT,
+                )
+            attempts += 1
+
+            if self._insert(user_id, key, request_hash, ttl):
+                return None
+
+            # Lost the race to another request with the same key. Its row
+            # may already be gone again if that request failed and released
+            # the key, in which case try again.
+            record = self._get(user_id, key)
+
+        now = datetime.utcnow()
+
+        if record.expires_at <= now:
+            self._take_over(record, request_hash, ttl)
+            return None
+
+        if record.request_hash != request_hash:
+            db.session.rollback()
+            raise DAOException(
+                'Invalid Idempotency-Key. It has already been used for a '
+                'different request.',
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+            )
+
+        if record.is_complete:
+            # Kept readable once the transaction ends.
+            db.session.expunge(record)
+            db.session.rollback()
+            return record
+
+        if record.locked_at > now - timedelta(seconds=lease):
+            db.session.rollback()
+            raise DAOException(
+                'A request with this Idempotency-Key is still being '
+                'processed. Please retry shortly.',
+                HTTPStatus.CONFLICT,
+            )
+
+        logging.error(
+            'Taking over idempotency key {0} for user {1}, in flight since '
+            '{2}.'.format(
+                key,
+                user_id,
+                record.locked_at,
+            )
+        )
+        self._take_over(record, request_hash, ttl)
+
+        return None
+
+    def complete(self, user_id, key, status_code, response_body):
+        """
+        Stores the response to a request holding the key, and commits.
+
+        :param str user_id: The user who sent the request.
+        :param str key: The request's `Idempotency-Key` header.
+        :param int status_code: The response's status code.
+        :param str response_body: The response's (JSON) body.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        db.session.query(IdempotencyKey).filter_by(
+            user_id=user_id,
+            key=key,
+        ).update({
+            'status_code': status_code,
+            'response_body': response_body,
+            'locked_at': None,
+        }, synchronize_session=False)
+
+        db.session.commit()
+
+    def release(self, user_id, key):
+        """
+        Gives up a key whose request failed without a response worth
+        replaying, so a retry runs the request again. Commits.
+
+        :param str user_id: The user who sent the request.
+        :param str key: The request's `Idempotency-Key` header.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        db.session.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        ).delete(synchronize_session=False)
+
+        db.session.commit()
+
+    def _get(self, user_id, key):
+        return db.session.query(IdempotencyKey).filter_by(
+            user_id=user_id,
+            key=key,
+        ).first()
+
+    def _insert(self, user_id, key, request_hash, ttl):
+        """
+        Inserts a claimed key, unless the key already exists. Commits.
+
+        :rtype: bool
+        :return: Whether the key was inserted.
+        """
+        record = IdempotencyKey(user_id, key, request_hash, ttl)
+
+        inserted = db.session.execute(
+            insert(IdempotencyKey.__table__).values(
+                public_id=record.public_id,
+                created_at=record.locked_at,
+                user_id=record.user_id,
+                key=record.key,
+                request_hash=record.request_hash,
+                locked_at=record.locked_at,
+                expires_at=record.expires_at,
+            ).on_conflict_do_nothing(
+                index_elements=['user_id', 'key'],
+            ).returning(
+                IdempotencyKey.id,
+            )
+        ).first()
+
+        db.session.commit()
+
+        return inserted is not None
+
+    def _take_over(self, record, request_hash, ttl):
+        """
+        Claims an expired key, or one whose request died in flight, unless
+        another retry gets there first. Commits.
+
+        :raises: DAOException
+        """
+        now = datetime.utcnow()
+
+        claimed = db.session.query(IdempotencyKey).filter(
+            IdempotencyKey.id == record.id,
+            IdempotencyKey.locked_at == record.locked_at,
+            IdempotencyKey.expires_at == record.expires_at,
+        ).update({
+            'request_hash': request_hash,
+            'status_code': None,
+            'response_body': None,
+            'locked_at': now,
+            'expires_at': now + timedelta(seconds=ttl),
+        }, synchronize_session=False)
+
+        db.session.commit()
+
+        if not claimed:
+            raise DAOException(
+                'A request with this Idempotency-Key is still being '
+                'processed. Please retry shortly.',
+                HTTPStatus.CONFLICT,
+            )
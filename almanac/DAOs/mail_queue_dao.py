@@ -1,8 +1,17 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
 from almanac.DAOs.base_dao import BaseDAO
 from almanac.models import db
 from almanac.models.email_queue_table import EmailQueueTable as Email
+from almanac.models.email_queue_table import STATUS_PENDING
 from almanac.utils.database_utils import exec_and_commit
 
+OUTBOX_KEY = 'mail_outbox'
+
 
 class MailQueueDAO(BaseDAO):
     """
@@ -11,7 +20,10 @@ class MailQueueDAO(BaseDAO):
 
     def push_to_queue(self, email_to, email_from, subject, body):
         """
-        Handles adding a new email to the mail queue.
+        Handles adding a new email to the mail queue, committing straight
+        away along with anything else pending in the session. Facades should
+        use `push_to_outbox` so the email is only sent if their own
+        transaction commits; this is kept for scripts which queue mail alone.
 
         :param str email_to: The email we'll be mailing.
         :param str email_from: The origin email.
@@ -30,3 +42,47 @@ class MailQueueDAO(BaseDAO):
         exec_and_commit(db.session.add, new_email)
 
         return new_email
+
+    def push_to_outbox(self, email_to, email_from, subject, body):
+        """
+        Queues an email as part of the current transaction. Nothing is written
+        until the caller commits, at which point every email in the outbox is
+        inserted with a single statement. If the transaction is rolled back
+        the emails are dropped along with it.
+
+        :param str email_to: The email we'll be mailing.
+        :param str email_from: The origin email.
+        :param str subject: The subject line of the email.
+        :param str body: The body of the email message.
+        """
+        db.session.info.setdefault(OUTBOX_KEY, []).append({
+            'public_id': str(uuid.uuid4()),
+            'email_to': email_to,
+            'email_from': email_from,
+            'subject': subject,
+            'body': body,
+        })
+
+
+@event.listens_for(Session, 'before_commit')
+def _flush_outbox(session):
+    outbox = session.info.pop(OUTBOX_KEY, None)
+
+    if not outbox:
+        return
+
+    now = datetime.utcnow()
+    for row in outbox:
+        row.update(
+            created_at=now,
+            status=STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=now,
+        )
+
+    session.execute(Email.__table__.insert().values(outbox))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_outbox(session, previous_transaction):
+    session.info.pop(OUTBOX_KEY, None)
@@ -1,15 +1,22 @@
 from psycopg2._range import DateTimeRange
-from sqlalchemy import func
 
+import logging
 import pytz
 import enum
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
-from almanac.exc.exceptions import DAOException
+from almanac.exc.exceptions import DAOException, SQLException
 from almanac.DAOs.base_dao import BaseDAO
 from almanac.models import db
 from almanac.models import ScheduleTable as Schedule
 from almanac.models import UserTable as User
-from almanac.utils.database_utils import exec_and_commit
+from almanac.utils.database_utils import is_exclusion_violation
+from almanac.utils.schedule_index import invalidate_schedule_index
+
+# Rejects schedules overlapping another of the user's schedules. See
+# migration e1a6c3f08d27.
+OVERLAP_CONSTRAINT = 'excl_schedules_user_overlap'
 
 
 class TimePeriodEnum(enum.Enum):
@@ -40,24 +47,35 @@ class ScheduleDAO(BaseDAO):
     """
 
     def get(self, user_id, time_period=TimePeriodEnum.MONTH,
-            time_period_offset=0, detected_timezone='UTC'):
+            time_period_offset=0, detected_timezone='UTC', *,
+            window_start=None, window_end=None):
         """
-        Retrieves a user's schedule for the specified time period.
+        Retrieves a user's schedules overlapping the specified time period.
 
         :param str user_id: The user id to retrieve the schedule for.
         :param TimePeriodEnum time_period: The time period to retrieve.
         Typically month.
         :param int time_period_offset: The offset for teh current time period.
-        :rtype: ScheduleTable
-        :return: A schedule row (or None) corresponding to the request.
+        :param datetime.datetime window_start: The start of an explicit
+        `[start, end)` window, used instead of the time period.
+        :param datetime.datetime window_end: The end of the explicit window.
+        :raises: DAOException
+        :rtype: list[ScheduleTable]
+        :return: The schedules ordered by start time.
         """
-        current_timeperiod = self._add_time_period(
-            time_period_offset
+        window_start, window_end = self._get_query_window(
+            time_period_offset,
+            window_start,
+            window_end,
         )
 
         return db.session.query(Schedule).filter(
             Schedule.user_id == user_id,
-            Schedule.month_number == current_timeperiod.month,
+            Schedule.utc_duration.op('&&')(
+                DateTimeRange(window_start, window_end)
+            ),
+        ).order_by(
+            func.lower(Schedule.utc_duration),
         ).all()
 
     def get_by_schedule_id(self, schedule_id):
@@ -85,7 +103,6 @@ class ScheduleDAO(BaseDAO):
         :return: The newly scheduled table.
         """
         self._assert_valid_duration(start_time, end_time)
-        self._assert_no_duration_overlap(start_time, end_time, user_id)
         self._assert_not_in_past(start_time, end_time)
 
         user_info = db.session.query(User).filter(
@@ -102,7 +119,13 @@ class ScheduleDAO(BaseDAO):
             user_info.local_tz
         )
 
-        exec_and_commit(db.session.add, new_schedule)
+        try:
+            db.session.add(new_schedule)
+            db.session.commit()
+        except IntegrityError as e:
+            self._raise_for_integrity_error(e, new_schedule)
+
+        invalidate_schedule_index(user_id)
 
         return new_schedule
 
@@ -126,17 +149,19 @@ class ScheduleDAO(BaseDAO):
         if schedule is None:
             raise DAOException('Requested schedule is invalid. Try again.')
 
-        if start_time < schedule.utc_open.replace(tzinfo=None) or end_time > schedule.utc_end.replace(tzinfo=None):
-            self._assert_no_duration_overlap(start_time, end_time, user_id)
+        try:
+            rows_affected = Schedule.query.filter(
+                Schedule.user_id == user_id,
+                Schedule.public_id == schedule_id
+            ).update({
+                'utc_duration': DateTimeRange(start_time, end_time),
+            })
 
-        rows_affected = Schedule.query.filter(
-            Schedule.user_id == user_id,
-            Schedule.public_id == schedule_id
-        ).update({
-            'utc_duration': DateTimeRange(start_time, end_time),
-        })
+            db.session.commit()
+        except IntegrityError as e:
+            self._raise_for_integrity_error(e, schedule)
 
-        db.session.commit()
+        invalidate_schedule_index(user_id)
 
         if rows_affected == 0:
             raise DAOException(
@@ -158,39 +183,39 @@ class ScheduleDAO(BaseDAO):
         ).delete()
 
         db.session.commit()
+        invalidate_schedule_index(user_id)
 
         if rows_affected == 0:
             raise DAOException(
                 'Failed to delete schedule. Schedule not found.'
             )
 
-    def _assert_no_duration_overlap(self, start_time, end_time, user_id):
+    def _raise_for_integrity_error(self, e, schedule):
         """
-        Retrieves all of a users schedules and asserts that there is no
-        schedule overlap.
+        Rolls back a schedule write rejected by the database. An overlap
+        with another of the user's schedules is caught by the overlap
+        constraint, so it holds however many writes race each other.
 
-        :param datetime.datetime start_time: The date at which the schedule
-        opens.
-        :param datetime.datetime end_time: The date at which the schedule
-        closes.
-        :param str user_id: The user ID to filter by.
-        :raises: DAOException
+        :param sqlalchemy.exc.IntegrityError e: The error raised on write.
+        :param ScheduleTable schedule: The schedule being written.
+        :raises: DAOException, SQLException
         :rtype: NoneType
         :returns: Nothing
         """
-        schedules = db.session.query(Schedule).filter(
-            func.lower(Schedule.utc_duration) <= start_time,
-            func.upper(Schedule.utc_duration) >= end_time,
-            Schedule.user_id == user_id,
-            Schedule.day_number == end_time.day,
-        ).all()
+        db.session.rollback()
 
-        if not schedules:
-            return
+        if is_exclusion_violation(e, OVERLAP_CONSTRAINT):
+            raise DAOException(
+                "Invalid schedule. This overlaps with a previous schedule."
+            )
 
-        raise DAOException(
-            "Invalid schedule. This overlaps with a previous schedule."
+        logging.error(
+            'Failed to write schedule {0} due to exception {1}'.format(
+                schedule,
+                e,
+            )
         )
+        raise SQLException('Error processing request.')
 
     def _assert_valid_duration(self, start_time, end_time):
         """
@@ -12,6 +12,8 @@ from almanac.models import UserTable
 from almanac.models import db
 from almanac.models import UserTable as User
 from almanac.utils.database_utils import exec_and_commit
+from almanac.utils.profile_cache import invalidate_profile
+from almanac.utils.user_loader import get_user_loader
 
 
 class UserDAO(BaseDAO):
@@ -27,12 +29,9 @@ class UserDAO(BaseDAO):
         :rtype: UserTable
         :return: The UserTable row or None.
         """
-        found_user = User.query.filter(
-            User.public_id == str(user_id),
-            User.is_deleted == False
-        ).limit(1).first()
+        found_user = get_user_loader().load(user_id)
 
-        if found_user is None:
+        if found_user is None or found_user.is_deleted:
             logging.error(
                 'Failed to find requested user by id {0}.'.format(user_id)
             )
@@ -52,9 +51,7 @@ class UserDAO(BaseDAO):
         :rtype: UserTable
         :return: The UserTable row or None
         """
-        found_user = db.session.query(
-            User
-        ).filter_by(email=email).first()
+        found_user = get_user_loader().load_by_email(email)
 
         if found_user is None:
             logging.error(
@@ -191,6 +188,7 @@ class UserDAO(BaseDAO):
         if len(_update.keys()) != 0:
             User.query.filter_by(public_id=str(user_id)).update(_update)
             db.session.commit()
+            invalidate_profile(user_id)
 
         return self.get(user_id)
 
@@ -208,6 +206,7 @@ class UserDAO(BaseDAO):
             "is_deleted": True
         })
         db.session.commit()
+        invalidate_profile(user_id)
 
         return True
 
@@ -231,6 +230,7 @@ class UserDAO(BaseDAO):
         })
 
         db.session.commit()
+        invalidate_profile(found_user.public_id)
 
         return self.get(found_user.public_id)
 
@@ -1,17 +1,17 @@
-import braintree
 from os import environ
+from threading import Lock
+
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.contrib.fixers import ProxyFix
+from werkzeug.local import LocalProxy
 
+from almanac.integrations.braintree.sdk import braintree
 from almanac.models import db
-from almanac.api.v1.schedules import export_routes as exp_schedules
-from almanac.api.v1.addresses import export_routes as exp_addresses
-from almanac.api.v1.users import export_routes as exp_users
-from almanac.api.v1.users_reset_password import export_routes as exp_reset_pw
-from almanac.api.v1.events import export_routes as exp_events
-from almanac.api.v1.auth import export_routes as exp_auth
-from almanac.api.v1.contact_form import export_routes as exp_contact_form
-from almanac.api.v1.braintree import export_all_routes as exp_braintree
+
+_app = None
+_app_lock = Lock()
+
 
 def create_app(config_filename):
     app = Flask(__name__)
@@ -19,17 +19,158 @@ def create_app(config_filename):
     app.config['JWT_KEY'] = environ['KRONIKL_JWT_KEY'] or 'testsecretkey'
     app.config['JWT_EXPIRATION'] = environ['KRONIKL_JWT_EXPIRATION'] or 10
     app.config['TESTING'] = False
+    app.config['JWT_CACHE_SIZE'] = int(
+        environ.get('KRONIKL_JWT_CACHE_SIZE', 10000)
+    )
     app.config['ENVIRONMENT'] = 'Dev'
 
+    # Seconds a worker trusts its in-memory schedule index before rebuilding
+    # it. Writes made by other workers become visible after this window.
+    app.config['SCHEDULE_INDEX_TTL'] = int(
+        environ.get('KRONIKL_SCHEDULE_INDEX_TTL', 30)
+    )
+
+    # Marshalled user profiles. Set KRONIKL_PROFILE_CACHE_URL to a redis://
+    # URL to share the cache (and its invalidations) between workers.
+    app.config['PROFILE_CACHE_TTL'] = int(
+        environ.get('KRONIKL_PROFILE_CACHE_TTL', 60)
+    )
+    app.config['PROFILE_CACHE_URL'] = environ.get('KRONIKL_PROFILE_CACHE_URL')
+
+    # Seconds a booking's slot stays held while its payment goes through.
+    # Must comfortably exceed the gateway's timeout; stale holds are cleared
+    # by `almanac.workers.hold_sweeper`.
+    app.config['BOOKING_HOLD_TTL'] = int(
+        environ.get('KRONIKL_BOOKING_HOLD_TTL', 300)
+    )
+
+    # Responses to requests sent with an `Idempotency-Key` are replayed to
+    # retries for IDEMPOTENCY_KEY_TTL seconds. A request still in flight
+    # after IDEMPOTENCY_KEY_LEASE seconds is presumed dead and may be rerun.
+    app.config['IDEMPOTENCY_KEY_TTL'] = int(
+        environ.get('KRONIKL_IDEMPOTENCY_KEY_TTL', 86400)
+    )
+    app.config['IDEMPOTENCY_KEY_LEASE'] = int(
+        environ.get('KRONIKL_IDEMPOTENCY_KEY_LEASE', 300)
+    )
+
+    # bcrypt runs on a per-worker process pool (`process`) or on the request
+    # thread (`inline`). Past WORKERS + QUEUE hashes in flight, or after
+    # TIMEOUT seconds, logins fail fast with a 503.
+    app.config['PASSWORD_HASHER'] = environ.get(
+        'KRONIKL_PASSWORD_HASHER',
+        'process'
+    )
+    app.config['PASSWORD_HASHER_WORKERS'] = int(
+        environ.get('KRONIKL_PASSWORD_HASHER_WORKERS', 2)
+    )
+    app.config['PASSWORD_HASHER_QUEUE'] = int(
+        environ.get('KRONIKL_PASSWORD_HASHER_QUEUE', 8)
+    )
+    app.config['PASSWORD_HASHER_TIMEOUT'] = float(
+        environ.get('KRONIKL_PASSWORD_HASHER_TIMEOUT', 5)
+    )
+
+    # Sliding window login limits, per account and per client IP. Set
+    # KRONIKL_LOGIN_LIMITER_URL to a redis:// URL to count attempts across
+    # every worker instead of per worker.
+    app.config['LOGIN_LIMIT_ATTEMPTS'] = int(
+        environ.get('KRONIKL_LOGIN_LIMIT_ATTEMPTS', 10)
+    )
+    app.config['LOGIN_LIMIT_WINDOW'] = int(
+        environ.get('KRONIKL_LOGIN_LIMIT_WINDOW', 300)
+    )
+    app.config['LOGIN_LIMIT_IP_ATTEMPTS'] = int(
+        environ.get('KRONIKL_LOGIN_LIMIT_IP_ATTEMPTS', 30)
+    )
+    app.config['LOGIN_LIMIT_IP_WINDOW'] = int(
+        environ.get('KRONIKL_LOGIN_LIMIT_IP_WINDOW', 60)
+    )
+    app.config['LOGIN_LIMITER_URL'] = environ.get('KRONIKL_LOGIN_LIMITER_URL')
+
+    # Reverse proxies (nginx) in front of gunicorn. The client address is
+    # taken from the PROXY_COUNT-th X-Forwarded-For entry from the right, so
+    # entries a client sends itself are ignored. 0 when serving directly.
+    app.config['PROXY_COUNT'] = int(environ.get('KRONIKL_PROXY_COUNT', 1))
+    if app.config['PROXY_COUNT'] > 0:
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app,
+            num_proxies=app.config['PROXY_COUNT']
+        )
+
+    # Warm mappers, schemas and timezones when the app is loaded through
+    # wsgi.py (in the gunicorn master when preloading), not on first request.
+    app.config['PRELOAD_WARM_UP'] = environ.get(
+        'KRONIKL_PRELOAD_WARM_UP',
+        'true'
+    ).lower() == 'true'
+
+    # Per-worker connection pool. Size it so that GUNICORN_WORKERS *
+    # (POOL_SIZE + MAX_OVERFLOW) stays under postgres' max_connections; the
+    # `db pool` log lines (every POOL_METRICS_INTERVAL seconds, 0 disables)
+    # show how much of it is used and how long checkouts wait.
+    app.config['SQLALCHEMY_POOL_SIZE'] = int(
+        environ.get('KRONIKL_DB_POOL_SIZE', 5)
+    )
+    app.config['SQLALCHEMY_MAX_OVERFLOW'] = int(
+        environ.get('KRONIKL_DB_MAX_OVERFLOW', 10)
+    )
+    app.config['SQLALCHEMY_POOL_TIMEOUT'] = int(
+        environ.get('KRONIKL_DB_POOL_TIMEOUT', 30)
+    )
+    app.config['SQLALCHEMY_POOL_RECYCLE'] = int(
+        environ.get('KRONIKL_DB_POOL_RECYCLE', 1800)
+    )
+    app.config['DB_POOL_PRE_PING'] = environ.get(
+        'KRONIKL_DB_POOL_PRE_PING',
+        'true'
+    ).lower() == 'true'
+    app.config['DB_POOL_METRICS_INTERVAL'] = int(
+        environ.get('KRONIKL_DB_POOL_METRICS_INTERVAL', 60)
+    )
+
+    # Set when KRONIKL_POSTGRES_FQDN points at PgBouncer in transaction
+    # pooling mode. PgBouncer then does all the pooling, and nothing may rely
+    # on session level state (SET, LISTEN, session advisory locks) since
+    # consecutive transactions can land on different server connections.
+    app.config['DB_PGBOUNCER'] = environ.get(
+        'KRONIKL_DB_PGBOUNCER',
+        'false'
+    ).lower() == 'true'
+
+    # Every Braintree call goes through one kept alive connection pool per
+    # worker. Timeouts are in seconds; the `braintree gateway` log lines
+    # (every METRICS_INTERVAL seconds, 0 disables) show each call's latency.
+    app.config['BRAINTREE_CONNECT_TIMEOUT'] = float(
+        environ.get('KRONIKL_BRAINTREE_CONNECT_TIMEOUT', 3.05)
+    )
+    app.config['BRAINTREE_READ_TIMEOUT'] = float(
+        environ.get('KRONIKL_BRAINTREE_READ_TIMEOUT', 30)
+    )
+    app.config['BRAINTREE_POOL_SIZE'] = int(
+        environ.get('KRONIKL_BRAINTREE_POOL_SIZE', 10)
+    )
+    app.config['BRAINTREE_METRICS_INTERVAL'] = int(
+        environ.get('KRONIKL_BRAINTREE_METRICS_INTERVAL', 60)
+    )
+
+    gateway_options = {
+        'connect_timeout': app.config['BRAINTREE_CONNECT_TIMEOUT'],
+        'read_timeout': app.config['BRAINTREE_READ_TIMEOUT'],
+        'pool_size': app.config['BRAINTREE_POOL_SIZE'],
+        'metrics_interval': app.config['BRAINTREE_METRICS_INTERVAL'],
+    }
+
     if app.config['ENVIRONMENT'] == 'Dev':
         app.config['SQLALCHEMY_DATABASE_URI'] = environ['KRONIKL_POSTGRES_FQDN']
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-        braintree.Configuration.configure(
-            environment=braintree.Environment.Sandbox,
+        braintree.configure(
+            environment='sandbox',
             merchant_id='<merchant_id>',
             public_key='<public_key>',
             private_key='<private_key>',
+            **gateway_options
         )
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = environ['KRONIKL_POSTGRES_FQDN']
@@ -37,15 +178,17 @@ def create_app(config_filename):
 
         environment = None
         if environ['KRONIKL_BRAINTREE_ENVIRONMENT'] == 'sandbox':
-            environment = braintree.Environment.Sandbox
+            environment = 'sandbox'
         else:
-            environment = braintree.Environment.Production
+            environment = 'production'
 
-        braintree.Configuration.configure(
+        # The SDK itself is only imported once a request needs it.
+        braintree.configure(
             environment=environment,
             merchant_id=environ['KRONIKL_BRAINTREE_MERCHANT_ID'],
             public_key=environ['KRONIKL_BRAINTREE_PUBLIC_KEY'],
             private_key=environ['KRONIKL_BRAINTREE_PRIVATE_KEY'],
+            **gateway_options
         )
 
     # Unit test variable that dictates if we tear down database tables after
@@ -55,6 +198,19 @@ def create_app(config_filename):
     with app.app_context():
         from almanac.api.error_handlers import register_error_handlers
         from almanac.api.lifecycle_handlers import start_lifecycle_hooks
+        from almanac.api.v1.schedules import export_routes as exp_schedules
+        from almanac.api.v1.addresses import export_routes as exp_addresses
+        from almanac.api.v1.availability import \
+            export_routes as exp_availability
+        from almanac.api.v1.users import export_routes as exp_users
+        from almanac.api.v1.users_reset_password import \
+            export_routes as exp_reset_pw
+        from almanac.api.v1.events import export_routes as exp_events
+        from almanac.api.v1.auth import export_routes as exp_auth
+        from almanac.api.v1.contact_form import \
+            export_routes as exp_contact_form
+        from almanac.api.v1.braintree import \
+            export_all_routes as exp_braintree
 
         register_error_handlers(app)
         start_lifecycle_hooks(app)
@@ -66,6 +222,7 @@ def create_app(config_filename):
         exp_contact_form(app)
         exp_addresses(app)
         exp_reset_pw(app)
+        exp_availability(app)
 
         # Execute routes for nested directories.
         exp_braintree(app)
@@ -75,4 +232,26 @@ def create_app(config_filename):
 
     return app
 
-app = create_app(None)
+
+def get_app():
+    """
+    Retrieves the process' app, building it on first use. Importing this
+    module doesn't build anything, so gunicorn's master (with `--preload`)
+    or each worker (without) builds exactly one app.
+
+    :rtype: flask.Flask
+    :return: The app.
+    """
+    global _app
+
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = create_app(None)
+
+    return _app
+
+
+# Kept for scripts and tests which import `app` directly; the app is only
+# built once something is accessed on it.
+app = LocalProxy(get_app)
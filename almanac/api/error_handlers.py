@@ -10,4 +10,9 @@ def register_error_handlers(_app):
     def handle_all_errors(e):
         response = jsonify({'msg': e.msg})
         response.status_code = e.status_code
+
+        retry_after = getattr(e, 'retry_after', None)
+        if retry_after is not None:
+            response.headers['Retry-After'] = str(retry_after)
+
         return response
\ No newline at end of file
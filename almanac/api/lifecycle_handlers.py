@@ -6,21 +6,13 @@ import jwt
 from flask import current_app as app, request, g
 
 from almanac.exc.exceptions import HookException
+from almanac.utils.security import decode_token, is_public_endpoint
 
 
 def start_lifecycle_hooks(_app):
     @_app.before_request
     def process_jwt_token():
-        logging.info('{0}-{1}-2'.format(request.url_rule, request.method, request.url))
-        if 'authentication/login' in request.url:
-            pass
-        elif request.url.endswith('/users/') and request.method == 'POST':
-            pass
-        elif '/users/reset_password' in request.url:
-            pass
-        elif '/users/verify' in request.url:
-            pass
-        elif 'webhook' in request.url and request.method == 'POST':
+        if is_public_endpoint(app.config, request.endpoint, request.method):
             pass
         elif request.method not in ['POST', 'GET', 'PUT', 'DELETE']:
             pass
@@ -37,7 +29,7 @@ def start_lifecycle_hooks(_app):
                 )
 
             try:
-                g.user_info = jwt.decode(token, app.config['JWT_KEY'])
+                g.user_info = decode_token(token, app.config)
 
             except jwt.ExpiredSignatureError as e:
                 logging.error(e)
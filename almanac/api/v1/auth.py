@@ -1,14 +1,16 @@
 import logging
 
-from flask import Response, jsonify
+from flask import Response, g, jsonify, request
 from flask.views import MethodView
-from flask import current_app as app
 from marshmallow.fields import String
 from webargs.flaskparser import parser
 
 from almanac.DAOs.auth_dao import AuthDAO
+from almanac.DAOs.user_dao import UserDAO
+from almanac.facades.user_facade import UserFacade
 from almanac.schemas.return_schemas import UserMarshal
-from almanac.utils.security import create_token
+from almanac.utils.login_limiter import admit_login, reset_login_attempts
+from almanac.utils.security import public_endpoint
 
 
 class Authentication(MethodView):
@@ -21,7 +23,10 @@ class Authentication(MethodView):
         }
         args = parser.parse(arg_fields)
 
+        admit_login(args['user_challenge'], request.remote_addr)
+
         user_info = AuthDAO().login(**args)
+        reset_login_attempts(args['user_challenge'])
 
         logging.info('Succesfully validated incoming user {0}'.format(
             args['user_challenge']
@@ -30,10 +35,7 @@ class Authentication(MethodView):
         # type: Response
         response = jsonify(
             {
-                'new_jwt': create_token(
-                    str(user_info.public_id),
-                    app.config
-                ).decode('utf-8'),
+                'new_jwt': UserFacade().create_session_token(user_info),
                 'user_info': UserMarshal().dump(user_info).data,
             }
         )
@@ -41,8 +43,37 @@ class Authentication(MethodView):
         return response
 
 
+class TokenRefresh(MethodView):
+    """
+    Reissues the requesting user's JWT with up to date claims. Clients call
+    this after changing anything carried in the token (timezone, premium or
+    submerchant status).
+    """
+
+    def post(self):
+        user_info = UserDAO().get(g.user_info['user_id'])
+
+        logging.info('Refreshed token for user {0}'.format(
+            g.user_info['user_id']
+        ))
+
+        return jsonify(
+            {
+                'new_jwt': UserFacade().create_session_token(user_info),
+                'user_info': UserMarshal().dump(user_info).data,
+            }
+        )
+
+
 def export_routes(_app):
     _app.add_url_rule(
         '/authentication/login',
         view_func=Authentication.as_view('api_v1_authentication')
-    )
\ No newline at end of file
+    )
+    public_endpoint(_app, 'api_v1_authentication')
+
+    _app.add_url_rule(
+        '/authentication/refresh',
+        view_func=TokenRefresh.as_view('api_v1_authentication_refresh'),
+        methods=['POST']
+    )
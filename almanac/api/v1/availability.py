@@ -0,0 +1,55 @@
+import logging
+
+from flask import jsonify
+from flask.views import MethodView
+from marshmallow import validate
+from marshmallow.fields import DateTime, Int
+from webargs.flaskparser import parser
+
+from almanac.DAOs.availability_dao import AvailabilityDAO, VALID_SLOT_DURATIONS
+from almanac.schemas.return_schemas import AvailableSlotMarshal
+
+
+class Availability(MethodView):
+    """Houses retrieval of a user's bookable time."""
+
+    def get(self, user_id):
+        arg_fields = {
+            'window_start': DateTime(required=True),
+            'window_end': DateTime(required=True),
+            'duration': Int(
+                required=True,
+                validate=validate.OneOf(VALID_SLOT_DURATIONS)
+            ),
+        }
+        args = parser.parse(arg_fields)
+
+        slots = AvailabilityDAO().get_bookable_slots(
+            user_id,
+            args['window_start'],
+            args['window_end'],
+            args['duration'],
+        )
+
+        logging.info(
+            'Retrieved {0} bookable slots for user {1} between {2} '
+            'and {3}'.format(
+                len(slots),
+                user_id,
+                args['window_start'],
+                args['window_end'],
+            )
+        )
+
+        return jsonify({
+            'slots': AvailableSlotMarshal(many=True).dump([
+                {'utc_start': start, 'utc_end': end} for start, end in slots
+            ]).data
+        })
+
+
+def export_routes(_app):
+    _app.add_url_rule(
+        '/availability/<string:user_id>',
+        view_func=Availability.as_view('api_v1_availability')
+    )
@@ -1,7 +1,6 @@
 import logging
 from http import HTTPStatus
 
-from braintree import WebhookNotification
 from flask import jsonify, request
 from flask.views import MethodView
 from marshmallow import validate
@@ -14,7 +13,8 @@ from almanac.DAOs.braintree.merchant_dao import MerchantDAO
 from almanac.api.v1.utils.webhooks import bt_webhook_parser
 from almanac.exc.exceptions import EndpointException
 from almanac.facades.braintree.submerchant_facade import SubmerchantFacade
-from almanac.utils.security import authentication_required
+from almanac.utils.security import authentication_required, \
+    public_endpoint
 
 
 class Submerchants(MethodView):
@@ -115,3 +115,4 @@ def export_routes(_app):
         '/braintree/submerchant/webhook',
         view_func=WebhookHandler.as_view('api_v1_submerchant_webhook')
     )
+    public_endpoint(_app, 'api_v1_submerchant_webhook', ['POST'])
@@ -11,6 +11,7 @@ from almanac.DAOs.braintree.subscription_dao import SubscriptionDAO
 from almanac.exc.exceptions import EndpointException
 from almanac.facades.braintree.subscription_facade import SubscriptionFacade
 from almanac.schemas.return_schemas import SubscriptionMarshal
+from almanac.utils.idempotency import idempotent
 from almanac.utils.security import authentication_required
 
 
@@ -35,6 +36,7 @@ class Subscriptions(MethodView):
         return jsonify(SubscriptionMarshal().dump(found_sub).data)
 
     @authentication_required
+    @idempotent
     def post(self, user_id):
         arg_fields = {
             'nonce': String(required=False),
@@ -68,6 +70,7 @@ class Subscriptions(MethodView):
         return jsonify(SubscriptionMarshal().dump(new_sub).data)
 
     @authentication_required
+    @idempotent
     def delete(self, user_id):
         sub_info = self.sub_facade.cancel_subscription(user_id)
 
@@ -1,9 +1,7 @@
 from flask import jsonify
 from flask.views import MethodView
-from braintree import ClientToken
-
-import braintree
 
+from almanac.integrations.braintree.sdk import braintree
 from almanac.utils.security import authentication_required
 
 
@@ -14,13 +12,8 @@ class GenerateClientToken(MethodView):
 
     @authentication_required
     def _generate_token(self):
-        braintree.Configuration.configure(
-            braintree.Environment.Sandbox,
-            'sgppp5zt6vjkd3nx',
-            'jbbsgnnp7dfk3yt7',
-            'd8a1a6ce8de596691be3d0d18678d095'
-        )
-        return ClientToken.generate()
+        # Uses the gateway configured in `create_app`.
+        return braintree.ClientToken.generate()
 
 
 def export_routes(_app):
@@ -2,17 +2,23 @@ import logging
 import pytz
 
 from flask.views import MethodView
-from flask import jsonify, current_app, g
+from flask import jsonify, current_app, g, json, Response, \
+    stream_with_context
 from marshmallow import validate
-from marshmallow.fields import Boolean, Int, String
+from marshmallow.fields import Boolean, DateTime, Int, String
+from webargs.fields import Nested
 from webargs.flaskparser import parser
 
-from almanac.DAOs.event_dao import EventDAO
+from almanac.DAOs.event_dao import EventDAO, MAX_BULK_EVENTS, \
+    DEFAULT_HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE
 from almanac.exc.exceptions import EndpointException
 from almanac.facades.paid_event_facade import EventFacade
-from almanac.schemas.return_schemas import EventMarshal, UserMarshal, \
-    UserSanitizedMarshal
-from almanac.utils.security import authentication_required
+from almanac.schemas.fast_serializers import event_marshal, user_marshal, \
+    user_sanitized_marshal
+from almanac.schemas.return_schemas import EventMarshal
+from almanac.utils.idempotency import idempotent
+from almanac.utils.security import authentication_required, \
+    get_user_claims
 
 
 class Events(MethodView):
@@ -22,19 +28,25 @@ class Events(MethodView):
     def get(self, user_id):
         arg_fields = {
             'is_scheduling': Boolean(required=True),
-            'time_period_offset': Int(missing=0)
+            'time_period_offset': Int(missing=0),
+            'window_start': DateTime(missing=None),
+            'window_end': DateTime(missing=None),
         }
         args = parser.parse(arg_fields)
 
         if args['is_scheduling']:
             event_info = EventDAO().get_for_scheduling_user(
                 user_id,
-                args['time_period_offset']
+                args['time_period_offset'],
+                window_start=args['window_start'],
+                window_end=args['window_end'],
             )
         else:
             event_info = EventDAO().get_for_scheduled_user(
                 user_id,
-                args['time_period_offset']
+                args['time_period_offset'],
+                window_start=args['window_start'],
+                window_end=args['window_end'],
             )
 
         logging.info('Retrieved all events for user {0} as a {1}'.format(
@@ -42,18 +54,75 @@ class Events(MethodView):
             'scheduler.' if args['is_scheduling'] else 'scheduling user.'
         ))
 
-        return jsonify({'events': EventMarshal(many=True).dump(event_info).data})
+        return jsonify({'events': event_marshal.dump_many(event_info)})
+
+
+class EventHistory(MethodView):
+    """Pages (or streams) through a user's entire event history."""
+
+    @authentication_required
+    def get(self, user_id):
+        arg_fields = {
+            'is_scheduling': Boolean(required=True),
+            'cursor': String(missing=None),
+            'limit': Int(
+                missing=DEFAULT_HISTORY_PAGE_SIZE,
+                validate=validate.Range(1, MAX_HISTORY_PAGE_SIZE)
+            ),
+            'stream': Boolean(missing=False),
+        }
+        args = parser.parse(arg_fields)
+
+        if args['stream']:
+            events = EventDAO().iter_history(
+                user_id,
+                args['is_scheduling'],
+                cursor=args['cursor'],
+            )
+
+            logging.info('Streaming event history for user {0}'.format(
+                user_id
+            ))
+
+            return Response(
+                stream_with_context(self._as_ndjson(events)),
+                mimetype='application/x-ndjson',
+            )
+
+        events, next_cursor = EventDAO().get_history_page(
+            user_id,
+            args['is_scheduling'],
+            cursor=args['cursor'],
+            limit=args['limit'],
+        )
+
+        logging.info('Retrieved {0} historic events for user {1}'.format(
+            len(events),
+            user_id,
+        ))
+
+        return jsonify({
+            'events': event_marshal.dump_many(events),
+            'next_cursor': next_cursor,
+        })
+
+    @staticmethod
+    def _as_ndjson(events):
+        for event in events:
+            yield json.dumps(event_marshal.dump(event)) + '\n'
 
 
 class EventCreate(MethodView):
     @staticmethod
+    @idempotent
     def post():
         arg_fields = {
             'scheduled_user_id': String(required=True),
             'localized_start_time': String(required=True),
             'localized_end_time': String(required=True),
+            # Defaults to the requesting user's timezone from their JWT.
             'local_tz': String(
-                required=True,
+                missing=None,
                 validate=validate.OneOf(pytz.all_timezones)
             ),
             'notes': String(
@@ -74,6 +143,8 @@ class EventCreate(MethodView):
         }
         args = parser.parse(arg_fields)
         args['scheduling_user_id'] = g.user_info['user_id']
+        if args['local_tz'] is None:
+            args['local_tz'] = get_user_claims()['local_tz']
 
         if args['is_paid']:
             if args.get('nonce') is None or args.get('nonce') == '':
@@ -113,6 +184,84 @@ class EventCreate(MethodView):
         return jsonify(EventMarshal().dump(event_info).data)
 
 
+class EventBatchCreate(MethodView):
+    """Books several events against one user in a single request."""
+
+    @staticmethod
+    @idempotent
+    def post():
+        arg_fields = {
+            'scheduled_user_id': String(required=True),
+            # Defaults to the requesting user's timezone from their JWT.
+            'local_tz': String(
+                missing=None,
+                validate=validate.OneOf(pytz.all_timezones)
+            ),
+            'events': Nested(
+                {
+                    'localized_start_time': String(required=True),
+                    'localized_end_time': String(required=True),
+                    'notes': String(
+                        required=False,
+                        validate=validate.Length(max=512),
+                        missing=None,
+                        default=None
+                    ),
+                },
+                many=True,
+                required=True,
+                validate=validate.Length(min=1, max=MAX_BULK_EVENTS),
+            ),
+            'is_paid': Boolean(default=True, missing=True),
+            'nonce': String(
+                required=False,
+                default='',
+                missing='',
+            ),
+            'address_id': String(
+                required=False,
+            )
+        }
+        args = parser.parse(arg_fields)
+        args['scheduling_user_id'] = g.user_info['user_id']
+        if args['local_tz'] is None:
+            args['local_tz'] = get_user_claims()['local_tz']
+
+        if args['is_paid']:
+            if args.get('nonce') is None or args.get('nonce') == '':
+                raise EndpointException(
+                    'For paid scheduling, a payment nonce must be supplied.'
+                )
+
+            del args['is_paid']
+            event_info = EventFacade().create_new_events_bulk(**args)
+        else:
+            if not current_app.config.get('TESTING'):
+                logging.error(
+                    'Attempted to create unpaid events in prod: {0}'.format(
+                        args
+                    )
+                )
+                raise EndpointException(
+                    'Non-paid events are not allowed.'
+                )
+
+            del args['is_paid']
+            del args['nonce']
+            args.pop('address_id', None)
+            event_info = EventDAO().create_events_bulk(**args)
+
+        logging.info(
+            'Created {0} events for user {1} with user {2}.'.format(
+                len(event_info),
+                args['scheduling_user_id'],
+                args['scheduled_user_id'],
+            )
+        )
+
+        return jsonify({'events': event_marshal.dump_many(event_info)})
+
+
 class Event(MethodView):
     """Allows retrieval of a single event."""
 
@@ -129,9 +278,9 @@ class Event(MethodView):
         scheduling = [x for x in event_info if x.public_id == event_info.EventTable.scheduling_user_id]
 
         return jsonify({
-            'event': EventMarshal().dump(event_info.EventTable).data,
-            'scheduled_user': UserSanitizedMarshal().dump(scheduled[0]).data,
-            'scheduling_user': UserMarshal().dump(scheduling[0]).data,
+            'event': event_marshal.dump(event_info.EventTable),
+            'scheduled_user': user_sanitized_marshal.dump(scheduled[0]),
+            'scheduling_user': user_marshal.dump(scheduling[0]),
         })
 
 
@@ -141,11 +290,21 @@ def export_routes(_app):
         view_func=Events.as_view('api_v1_events')
     )
 
+    _app.add_url_rule(
+        '/events/<string:user_id>/history',
+        view_func=EventHistory.as_view('api_v1_event_history')
+    )
+
     _app.add_url_rule(
         '/events/',
         view_func=EventCreate.as_view('api_v1_event_create')
     )
 
+    _app.add_url_rule(
+        '/events/batch',
+        view_func=EventBatchCreate.as_view('api_v1_event_batch_create')
+    )
+
     _app.add_url_rule(
         '/event/<string:user_id>/<string:event_id>',
         view_func=Event.as_view('api_v1_event')
@@ -8,6 +8,7 @@ from marshmallow.fields import Boolean, Int, DateTime, String
 from webargs.flaskparser import parser
 
 from almanac.DAOs.schedule_dao import ScheduleDAO
+from almanac.schemas.fast_serializers import schedule_marshal
 from almanac.schemas.return_schemas import ScheduleMarshal
 
 
@@ -16,13 +17,17 @@ class Schedules(MethodView):
 
     def get(self, user_id):
         arg_fields = {
-            'time_period_offset': Int(missing=0)
+            'time_period_offset': Int(missing=0),
+            'window_start': DateTime(missing=None),
+            'window_end': DateTime(missing=None),
         }
         args = parser.parse(arg_fields)
 
         schedule_info = ScheduleDAO().get(
             user_id,
-            time_period_offset=args.get('time_period_offset', 0)
+            time_period_offset=args.get('time_period_offset', 0),
+            window_start=args['window_start'],
+            window_end=args['window_end'],
         )
 
         logging.info(
@@ -32,7 +37,7 @@ class Schedules(MethodView):
         )
 
         return jsonify({
-            'schedules': ScheduleMarshal(many=True).dump(schedule_info).data
+            'schedules': schedule_marshal.dump_many(schedule_info)
             }
         )
 
@@ -11,7 +11,8 @@ from almanac.DAOs.user_dao import UserDAO
 from almanac.exc.exceptions import EndpointException
 from almanac.facades.user_facade import UserFacade
 from almanac.schemas.return_schemas import UserMarshal
-from almanac.utils.security import authentication_required
+from almanac.utils.security import authentication_required, \
+    public_endpoint
 
 
 class Users(MethodView):
@@ -19,11 +20,11 @@ class Users(MethodView):
 
     @authentication_required
     def get(self, user_id):
-        user_info = UserFacade().get_user_by_id(user_id)
+        user_info = UserFacade().get_user_profile_by_id(user_id)
 
         logging.info('Retrieved user info for {0}'.format(user_id))
 
-        return jsonify(UserMarshal().dump(user_info).data)
+        return jsonify(user_info)
 
     def post(self):
         arg_fields = {
@@ -168,6 +169,7 @@ def export_routes(_app):
         view_func=Users.as_view('api_v1_users_new_user'),
         methods=['POST']
     )
+    public_endpoint(_app, 'api_v1_users_new_user', ['POST'])
 
     _app.add_url_rule(
         '/users/email/<string:email>',
@@ -180,4 +182,5 @@ def export_routes(_app):
         view_func=VerificationToken.as_view('api_v1_users_verification'),
         methods=['POST', 'PUT']
     )
+    public_endpoint(_app, 'api_v1_users_verification')
 
@@ -8,6 +8,7 @@ from webargs.flaskparser import parser
 from almanac.DAOs.user_dao import UserDAO
 from almanac.facades.user_facade import UserFacade
 from almanac.schemas.return_schemas import UserMarshal
+from almanac.utils.security import public_endpoint
 
 
 class ResetPassword(MethodView):
@@ -57,4 +58,5 @@ def export_routes(_app):
         '/users/reset_password',
         view_func=ResetPassword.as_view('api_v1_users_reset'),
         methods=['POST', 'PUT']
-    )
\ No newline at end of file
+    )
+    public_endpoint(_app, 'api_v1_users_reset')
\ No newline at end of file
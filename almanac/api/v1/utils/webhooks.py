@@ -1,4 +1,4 @@
-from braintree import WebhookNotification
+from almanac.integrations.braintree.sdk import braintree
 
 
 def bt_webhook_parser(request):
@@ -9,7 +9,7 @@ def bt_webhook_parser(request):
     :rtype: WebhookNotification
     :return: The parsed webhook notification.
     """
-    return WebhookNotification.parse(
+    return braintree.WebhookNotification.parse(
         str(request.form['bt_signature']),
         str(request.form['bt_payload']),
     )
\ No newline at end of file
@@ -46,3 +46,13 @@ class FacadeException(BaseAlmanacException):
 class SecurityException(BaseAlmanacException):
     def __init__(self, msg):
         super().__init__(msg, HTTPStatus.UNAUTHORIZED)
+
+
+class PasswordHashingException(BaseAlmanacException):
+    pass
+
+
+class LoginThrottledException(BaseAlmanacException):
+    def __init__(self, msg, retry_after):
+        super().__init__(msg, HTTPStatus.TOO_MANY_REQUESTS)
+        self.retry_after = retry_after
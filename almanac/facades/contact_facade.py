@@ -2,6 +2,7 @@ import os
 
 from almanac.DAOs.contact_dao import ContactUsDAO
 from almanac.DAOs.mail_queue_dao import MailQueueDAO
+from almanac.models import db
 
 
 class ContactFacade(object):
@@ -12,7 +13,7 @@ class ContactFacade(object):
     def add_new_contact_message(self, name, email, message):
         """
         Handles adding a new "contact us" form message and adding it to our
-        email queue.
+        email queue. Both are committed together.
 
         :param str name: The user's name.
         :param str message: The user's message.
@@ -20,15 +21,24 @@ class ContactFacade(object):
         :rtype: ContactTable
         :return: The newly created contact message.
         """
-        new_message = ContactUsDAO().add_new_contact_message(
-            name,
-            message,
-            email
-        )
-
-        MailQueueDAO().push_to_queue(
-            os.environ["KRONIKL_EMAIL_FORWARD_TO"],
-            new_message.email,
-            "New contact form submission - {0}".format(new_message.email),
-            new_message.message
-        )
\ No newline at end of file
+        try:
+            new_message = ContactUsDAO().add_new_contact_message(
+                name,
+                message,
+                email,
+                skip_commit=True
+            )
+
+            MailQueueDAO().push_to_outbox(
+                os.environ["KRONIKL_EMAIL_FORWARD_TO"],
+                new_message.email,
+                "New contact form submission - {0}".format(new_message.email),
+                new_message.message
+            )
+
+            db.session.commit()
+
+            return new_message
+        except Exception as e:
+            db.session.rollback()
+            raise e
\ No newline at end of file
@@ -1,13 +1,19 @@
 import logging
 
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
 from almanac.DAOs.address_dao import AddressDAO
 from almanac.DAOs.event_dao import EventDAO
+from almanac.DAOs.event_hold_dao import EventHoldDAO
 from almanac.facades.payment_facade import BraintreePaymentFacade
 from almanac.exc.exceptions import (
     IntegrationException,
     FacadeException,
-    DAOException)
+    DAOException,
+    SQLException)
 from almanac.models import db
+from almanac.utils.user_loader import get_user_loader
 
 
 class EventFacade(object):
@@ -43,43 +49,173 @@ class EventFacade(object):
         :rtype: EventTable
         :return: The newly created event.
         """
-        if address_id is None:
-            address = AddressDAO().get_default_for_user(
-                scheduling_user_id
+        address = self._get_billing_address(scheduling_user_id, address_id)
+
+        new_event = EventDAO().build_new_event(
+            scheduling_user_id,
+            scheduled_user_id,
+            localized_start_time,
+            localized_end_time,
+            local_tz,
+            notes,
+        )
+
+        return self._book([new_event], nonce, address)[0]
+
+    def create_new_events_bulk(
+            self,
+            scheduling_user_id,
+            scheduled_user_id,
+            events,
+            local_tz,
+            nonce,
+            address_id=None,
+    ):
+        """
+        Handles creation of several events against one user, charged as a
+        single sale. Either every event is booked or none are.
+
+        :param str scheduling_user_id: The user who is booking another's time
+        :param str scheduled_user_id: Their time is being booked.
+        :param list[dict] events: Each event's `localized_start_time`,
+        `localized_end_time` and (optionally) `notes`.
+        :param str local_tz: The timezone which these were booked in.
+        :param str nonce: The nonce which determines the payment method
+        being used.
+        :param str address_id: An address to be used whenever billing. If not
+        provided, then we attempt to find a default address.
+        :rtype: list[EventTable]
+        :return: The newly created events.
+        """
+        address = self._get_billing_address(scheduling_user_id, address_id)
+
+        new_events = EventDAO().build_events_bulk(
+            scheduling_user_id,
+            scheduled_user_id,
+            events,
+            local_tz,
+        )
+
+        return self._book(new_events, nonce, address)
+
+    def _book(self, new_events, nonce, address):
+        """
+        Books new events against one user, paid for by a single sale. The
+        slots are held (and committed) first, then charged for outside of any
+        DB transaction, and finally the holds are swapped for the events. A
+        failed sale releases the holds; a sale whose events can't be booked
+        after all (e.g. its holds were lost in the meantime) is voided and
+        releases them too.
+
+        :param list[EventTable] new_events: The (not yet inserted) events.
+        :param str nonce: The nonce which determines the payment method
+        being used.
+        :param AddressTable address: The address to bill against.
+        :rtype: list[EventTable]
+        :return: The newly created events.
+        """
+        scheduled_user_id = new_events[0].scheduled_user_id
+        payment_facade = BraintreePaymentFacade()
+
+        submerchant = payment_facade.get_submerchant(scheduled_user_id)
+        billed_user = get_user_loader().load(new_events[0].scheduling_user_id)
+
+        # Committing the holds would otherwise expire these, and reloading
+        # them during the sale would open a transaction for its duration.
+        db.session.expunge(address)
+        db.session.expunge(submerchant)
+
+        hold_dao = EventHoldDAO()
+        hold_ids = hold_dao.place(
+            new_events,
+            current_app.config['BOOKING_HOLD_TTL'],
+        )
+
+        try:
+            result = payment_facade.charge(
+                submerchant,
+                new_events,
+                nonce,
+                billed_user,
+                address,
             )
-        else:
-            address = AddressDAO().get_by_public_id(
-                address_id,
-                scheduling_user_id
+        except (IntegrationException, FacadeException) as e:
+            hold_dao.release(hold_ids)
+            logging.error(
+                'Failed to create new transaction with exc of {0}. '
+                'Released holds {1}.'.format(
+                    e,
+                    hold_ids,
+                )
             )
+            raise FacadeException('Failed to finish sale.')
 
         try:
-            new_event = EventDAO().create_new_event(
-                scheduling_user_id,
-                scheduled_user_id,
-                localized_start_time,
-                localized_end_time,
-                local_tz,
-                notes,
-                skip_commit=True
-            )
+            hold_dao.claim(hold_ids, scheduled_user_id)
+            EventDAO().insert_events(new_events, skip_commit=True)
+            payment_facade.record_payments(submerchant, new_events)
 
-            BraintreePaymentFacade().issue_new_payment(
-                new_event,
-                nonce,
-                address
+            db.session.commit()
+        except (DAOException, SQLException, SQLAlchemyError) as e:
+            db.session.rollback()
+            self._undo_sale(payment_facade, result, hold_dao, hold_ids)
+            raise e
+
+        return new_events
+
+    def _undo_sale(self, payment_facade, result, hold_dao, hold_ids):
+        """
+        Voids a sale whose events couldn't be booked and releases their holds,
+        which the rollback restored, so the slots are free again right away.
+        Failures are only logged, leaving the booking's own error to be
+        raised.
+
+        :param BraintreePaymentFacade payment_facade: The facade which charged.
+        :param braintree.SuccessfulResult result: The result of the sale.
+        :param EventHoldDAO hold_dao: The DAO which placed the holds.
+        :param list[str] hold_ids: The holds' public IDs.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        try:
+            payment_facade.void(result)
+        except Exception as e:
+            logging.critical(
+                'Failed to void sale {0} for unbooked events with exc of '
+                '{1}. It must be refunded by hand.'.format(
+                    result.transaction.id,
+                    e,
+                )
             )
-        except IntegrationException as e:
+
+        try:
+            hold_dao.release(hold_ids)
+        except SQLAlchemyError as e:
             db.session.rollback()
             logging.error(
-                'Failed to create new transaction with exc of {0}.'
-                'Rolling back event creation for event {1}'.format(
+                'Failed to release holds {0} with exc of {1}. They block '
+                'their slots until the sweeper clears them.'.format(
+                    hold_ids,
                     e,
-                    new_event.public_id
                 )
             )
-            raise FacadeException('Failed to finish sale.')
-        except DAOException as e:
-            raise e
 
-        return new_event
+    def _get_billing_address(self, scheduling_user_id, address_id=None):
+        """
+        Retrieves the address to bill against.
+
+        :param str scheduling_user_id: The user who is booking another's time
+        :param str address_id: An address to be used whenever billing. If not
+        provided, then we attempt to find a default address.
+        :rtype: AddressTable
+        :return: The billing address.
+        """
+        if address_id is None:
+            return AddressDAO().get_default_for_user(
+                scheduling_user_id
+            )
+
+        return AddressDAO().get_by_public_id(
+            address_id,
+            scheduling_user_id
+        )
@@ -1,18 +1,10 @@
-from braintree import ErrorResult
 import logging
 
-from flask import g
-
 from almanac.DAOs.braintree.merchant_dao import MerchantDAO
 from almanac.DAOs.braintree.payments_dao import BraintreePaymentsDAO
-from almanac.DAOs.event_dao import EventDAO
-from almanac.DAOs.user_dao import UserDAO
+from almanac.integrations.braintree.sdk import braintree
 from almanac.integrations.braintree.transactions import BraintreeTransactions
-from almanac.models import EventTable, PaymentTable, db
-from almanac.exc.exceptions import (
-    FacadeException,
-    DAOException,
-)
+from almanac.exc.exceptions import FacadeException, IntegrationException
 
 
 class BraintreePaymentFacade(object):
@@ -20,79 +12,109 @@ class BraintreePaymentFacade(object):
     Handles creating a new payment within braintree + our DB.
     """
 
-    def issue_new_payment(self, event, nonce, address):
+    def get_submerchant(self, scheduled_user_id):
         """
-        Issues a new payment w/in Braintree.
+        Retrieves the submerchant paid for the scheduled user's time.
 
-        :param EventTable event: The event that must be paid for.
-        :param str nonce: The nonce which signifies which payment method
-        is to be used.
-        :param AddressTable address: The address information to be used
-        whenever issuing a payment.
-        :rtype: PaymentTable
-        :return: The newly created payment.
+        :param str scheduled_user_id: The user whose time is being booked.
+        :raises: FacadeException
+        :rtype: SubmerchantTable
+        :return: The scheduled user's submerchant.
         """
-        try:
-            submerchant = MerchantDAO().get_submerchant_by_id(
-                event.scheduled_user_id
-            )
-        except DAOException as e:
-            logging.error(
-                'Invalid event ({0}) issued, no submerchant '
-                '({1}). Exception of: {2}.'.format(
-                    event.public_id,
-                    event.scheduled_user_id,
-                    e,
-                )
-            )
-            raise DAOException(e)
+        submerchant = MerchantDAO().get_submerchant_by_id(scheduled_user_id)
 
         if submerchant is None:
             logging.error(
-                'Failed to retrieve submerchant by public ID {0} for a new '
-                'event.'.format(
-                    event.scheduled_user_id
+                'Failed to retrieve submerchant by public ID {0} for new '
+                'events.'.format(
+                    scheduled_user_id
                 )
             )
             raise FacadeException(
                 'Invalid requested user. Contact support.'
             )
 
-        try:
-            # TODO(ian): This can be refactored to use
-            # EventDAO().get_event_by_id and retrieve all the info in 1 query.
-            new_transaction = BraintreeTransactions().create_transaction(
-                submerchant,
-                event.calculate_total_price(
-                    event.duration,
-                    UserDAO().get(event.scheduled_user_id),
-                ),
-                nonce,
-                UserDAO().get(event.scheduling_user_id),
-                address,
-            )
+        return submerchant
+
+    def charge(self, submerchant, events, nonce, billed_user, address):
+        """
+        Issues a single sale w/in Braintree covering one or more events
+        booked against the same user. Nothing is read from or written to the
+        DB, so no connection is held while the gateway responds.
+
+        :param SubmerchantTable submerchant: The scheduled user's submerchant.
+        :param list[EventTable] events: The events that must be paid for.
+        :param str nonce: The nonce which signifies which payment method
+        is to be used.
+        :param UserTable billed_user: The user who is being charged.
+        :param AddressTable address: The address information to be used
+        whenever issuing a payment.
+        :raises: FacadeException, IntegrationException
+        :rtype: braintree.SuccessfulResult
+        :return: The result of the sale.
+        """
+        result = BraintreeTransactions().create_transaction(
+            submerchant,
+            sum(event.total_price for event in events),
+            nonce,
+            billed_user,
+            address,
+        )
 
-            if isinstance(new_transaction, ErrorResult):
-                logging.error(
-                    'Received error result {0} when creating new '
-                    'transaction for event {1}'.format(
-                        new_transaction,
-                        event
-                    )
+        if isinstance(result, braintree.ErrorResult):
+            logging.error(
+                'Received error result {0} when creating new '
+                'transaction for events {1}'.format(
+                    result,
+                    events,
                 )
-                raise FacadeException('Failed to complete transaction.')
+            )
+            raise FacadeException('Failed to complete transaction.')
+
+        return result
+
+    def record_payments(self, submerchant, events):
+        """
+        Logs a payment row per event for a completed sale. Nothing is
+        committed.
+
+        :param SubmerchantTable submerchant: The scheduled user's submerchant.
+        :param list[EventTable] events: The events that were paid for.
+        :rtype: list[PaymentTable]
+        :return: The newly created payments.
+        """
+        payments_dao = BraintreePaymentsDAO()
 
-            return BraintreePaymentsDAO().insert_new_transaction(
+        return [
+            payments_dao.insert_new_transaction(
                 submerchant,
                 event.total_price,
                 event.calculate_service_fee(submerchant),
                 event,
                 skip_commit=True,
             )
-        except Exception as e:
-            db.session.rollback()
-            logging.error(
-                'Exception encountered while creating and inserting '
-                'transaction: {0}.'.format(e),
+            for event in events
+        ]
+
+    def void(self, result):
+        """
+        Voids a sale whose events couldn't be booked after all. Failing to do
+        so is logged for a manual refund rather than raised, so the booking's
+        own error reaches the user.
+
+        :param braintree.SuccessfulResult result: The result of the sale.
+        :rtype: NoneType
+        :returns: Nothing
+        """
+        transaction_id = result.transaction.id
+
+        try:
+            BraintreeTransactions().void_transaction(transaction_id)
+        except IntegrationException as e:
+            logging.critical(
+                'Failed to void transaction {0} for unbooked events with '
+                'exc of {1}. It must be refunded by hand.'.format(
+                    transaction_id,
+                    e,
+                )
             )
-            raise FacadeException(e)
@@ -11,6 +11,9 @@ from almanac.DAOs.user_dao import UserDAO
 from almanac.exc.exceptions import FacadeException, DAOException
 from almanac.facades.braintree.submerchant_facade import SubmerchantFacade
 from almanac.models import db, SubmerchantTable
+from almanac.schemas.fast_serializers import user_marshal
+from almanac.utils.profile_cache import get_profile_cache
+from almanac.utils.security import build_user_claims, create_token
 
 
 class UserFacade(object):
@@ -43,6 +46,43 @@ class UserFacade(object):
         found_user = UserDAO().get(user_id)
         return self._add_submerchant_to_user(found_user)
 
+    def get_user_profile_by_id(self, user_id):
+        """
+        Retrieves a user's marshalled profile (prices and submerchant status
+        included), served from the profile cache whenever possible.
+
+        :param str user_id: The User ID to look up.
+        :rtype: dict
+        :return: The user dumped through `UserMarshal`.
+        """
+        profile_cache = get_profile_cache()
+
+        profile = profile_cache.get(str(user_id))
+        if profile is not None:
+            return profile
+
+        profile = user_marshal.dump(self.get_user_by_id(user_id))
+        profile_cache.set(str(user_id), profile)
+
+        return profile
+
+    def create_session_token(self, user):
+        """
+        Issues a JWT carrying the user's current identity claims (timezone,
+        premium and submerchant status).
+
+        :param UserTable user: The user signing in.
+        :rtype: str
+        :return: The encoded JWT.
+        """
+        user = self._add_submerchant_to_user(user)
+
+        return create_token(
+            str(user.public_id),
+            current_app.config,
+            build_user_claims(user),
+        ).decode('utf-8')
+
     def create_user_as_submerchant(self, email, password, local_tz,
                                    submerchant):
         """
@@ -104,7 +144,7 @@ class UserFacade(object):
                 )
             )
 
-            MailQueueDAO().push_to_queue(
+            MailQueueDAO().push_to_outbox(
                 new_user.email,
                 'contact@kronikl.io',
                 'New Kronikl.io account verification',
@@ -177,17 +217,17 @@ class UserFacade(object):
             found_user.email,
             token
         )
+        db.session.commit()
 
     def _send_verification_email(self, new_user_email, new_user_token):
         """
-        Handles sending a verification email containing the verify token.
+        Handles queueing a verification email containing the verify token.
+        The email is only written once the caller commits.
 
         :param new_user_email:
         :param new_user_token:
-        :rtype: EmailQueueTable
-        :return: The newly created email queue item.
         """
-        return MailQueueDAO().push_to_queue(
+        MailQueueDAO().push_to_outbox(
             new_user_email,
             'contact@kronikl.io',
             'New Kronikl.io account verification',
@@ -213,9 +253,9 @@ class UserFacade(object):
         try:
             new_token, user = UserDAO().regenerate_token(email, 'reset_token')
 
-            MailQueueDAO().push_to_queue(
-                'contact@kronikl.io',
+            MailQueueDAO().push_to_outbox(
                 user.email,
+                'contact@kronikl.io',
                 'Please verify your account',
                 """
                 Your new account at Kronikl.io is now available. Please go to
@@ -228,6 +268,7 @@ class UserFacade(object):
                     new_token
                 )
             )
+            db.session.commit()
 
             return new_token
         except DAOException as e:
@@ -1,9 +1,8 @@
-import braintree
 import logging
 from flask import current_app
-from braintree import MerchantAccount, Transaction
 
 from almanac.exc.exceptions import IntegrationException
+from almanac.integrations.braintree.sdk import braintree
 from almanac.models.braintree.submerchant_table import SubmerchantTable
 
 MINIMUM_AMOUNT_THRESHOLD = 15.0
@@ -0,0 +1,248 @@
+"""
+The HTTP client every Braintree gateway call goes through.
+
+The SDK's default client calls `requests.post` and friends, which open (and
+TLS handshake) a new connection for every call. `KeepAliveHttp` sends them
+all through one `requests.Session` per worker instead, so connections to the
+gateway are kept alive and reused between bookings, and times each call into
+`gateway_metrics`.
+
+Imported along with the SDK (see `LazyBraintree`), since it extends it.
+"""
+import bisect
+import logging
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+import requests
+from braintree.util.http import Http
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_METRICS_INTERVAL = 60
+
+# Upper bounds (in ms) of the latency histogram's buckets. Slower calls land
+# in a final, unbounded bucket.
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class GatewayMetrics(object):
+    """
+    Per-worker latency histograms of gateway calls, one per operation (e.g.
+    `POST transactions`). Logged every `interval` seconds, by whichever call
+    finishes first once that's due.
+    """
+
+    def __init__(self, interval=DEFAULT_METRICS_INTERVAL):
+        self.interval = interval
+        self._lock = Lock()
+        self._reset(time.monotonic())
+
+    def record(self, operation, elapsed, *, failed=False):
+        """
+        :param str operation: See `operation_name`.
+        :param float elapsed: The call's duration in seconds.
+        :param bool failed: Whether the call errored or timed out.
+        """
+        now = time.monotonic()
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)
+
+        with self._lock:
+            histogram = self._operations.get(operation)
+            if histogram is None:
+                histogram = self._operations[operation] = {
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    'calls': 0,
+                    'failures': 0,
+                    'max': 0,
+                }
+
+            histogram['buckets'][bucket] += 1
+            histogram['calls'] += 1
+            histogram['failures'] += int(failed)
+            histogram['max'] = max(histogram['max'], elapsed)
+
+            if not self.interval or now - self._since < self.interval:
+                return
+
+            snapshot = self._snapshot()
+            self._reset(now)
+
+        for operation, gauges in snapshot.items():
+            logging.info(
+                'braintree gateway (pid {pid}): {operation} {calls} calls, '
+                '{failures} failures, p50 <{p50_ms}ms p99 <{p99_ms}ms '
+                'max {max_ms:.1f}ms'.format(
+                    pid=os.getpid(),
+                    operation=operation,
+                    **gauges
+                )
+            )
+
+    def snapshot(self):
+        """
+        :rtype: dict
+        :return: Each operation's gauges since they were last logged.
+        """
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return OrderedDict(
+            (
+                operation,
+                {
+                    'calls': histogram['calls'],
+                    'failures': histogram['failures'],
+                    'p50_ms': self._percentile(histogram, 0.5),
+                    'p99_ms': self._percentile(histogram, 0.99),
+                    'max_ms': histogram['max'] * 1000,
+                    'buckets': list(histogram['buckets']),
+                },
+            )
+            for operation, histogram in sorted(self._operations.items())
+        )
+
+    @staticmethod
+    def _percentile(histogram, quantile):
+        """
+        The upper bound of the bucket holding the quantile, or `inf` if it's
+        past the last bound.
+        """
+        rank = quantile * histogram['calls']
+        seen = 0
+
+        for bound, count in zip(
+                LATENCY_BUCKETS_MS + (float('inf'),),
+                histogram['buckets'],
+        ):
+            seen += count
+            if seen >= rank:
+                return bound
+
+        return float('inf')
+
+    def _reset(self, now):
+        self._since = now
+        self._operations = {}
+
+
+gateway_metrics = GatewayMetrics()
+
+_session = None
+_session_pid = None
+_session_lock = Lock()
+_pool_size = DEFAULT_POOL_SIZE
+
+
+def configure_session(pool_size):
+    """
+    Sizes the pool of kept alive connections. Applies to sessions created
+    after this is called.
+
+    :param int pool_size: The most idle connections kept per worker. With
+    gevent workers, more concurrent calls than this still go through, but
+    the extra connections are closed afterwards.
+    """
+    global _pool_size
+
+    _pool_size = pool_size
+
+
+def get_session():
+    """
+    The worker's `requests.Session`. A forked worker builds its own, rather
+    than sharing its parent's sockets.
+
+    :rtype: requests.Session
+    :return: The session.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+
+                # Gateway calls aren't idempotent, so they're never retried.
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=_pool_size,
+                    max_retries=0,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+
+                _session = session
+                _session_pid = pid
+
+    return _session
+
+
+def operation_name(http_verb, path):
+    """
+    Names a gateway call for its histogram, without merchant or object IDs:
+    `/merchants/<id>/transactions/<id>/void` is `POST transactions/void`.
+
+    :param str http_verb: The HTTP method.
+    :param str path: The request's path (or full URL).
+    :rtype: str
+    :return: The operation's name.
+    """
+    segments = [
+        segment
+        for segment in path.split('?', 1)[0].split('/')
+        if segment
+    ]
+
+    if 'merchants' in segments:
+        segments = segments[segments.index('merchants') + 2:]
+
+    name = segments[0] if segments else ''
+    if len(segments) >= 3:
+        name += '/' + segments[2]
+
+    return '{0} {1}'.format(http_verb, name)
+
+
+class KeepAliveHttp(Http):
+    """
+    The SDK's HTTP strategy, sending every call through the worker's shared
+    session with the configured (connect, read) timeouts.
+    """
+
+    def http_do(self, http_verb, path, headers, request_body):
+        if not path.startswith(self.config.base_url()):
+            path = self.config.base_url() + path
+
+        operation = operation_name(http_verb, path)
+        started = time.monotonic()
+
+        try:
+            response = get_session().request(
+                http_verb,
+                path,
+                headers=headers,
+                data=request_body,
+                verify=self.environment.ssl_certificate,
+                timeout=self.config.timeout,
+            )
+        except Exception:
+            gateway_metrics.record(
+                operation,
+                time.monotonic() - started,
+                failed=True,
+            )
+            raise
+
+        gateway_metrics.record(
+            operation,
+            time.monotonic() - started,
+            failed=response.status_code >= 500,
+        )
+
+        return [response.status_code, response.text]
@@ -0,0 +1,119 @@
+import importlib
+from threading import Lock
+
+ENVIRONMENTS = {
+    'sandbox': 'Sandbox',
+    'production': 'Production',
+}
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30
+
+
+class LazyBraintree(object):
+    """
+    Stands in for the `braintree` package, which is only imported the first
+    time anything is read off this object. Workers that never take a payment
+    never pay for the SDK's import time or memory.
+
+    Use it exactly like the package (`braintree.Transaction.sale(...)`), but
+    configure it through `configure` so configuring doesn't load it either.
+    """
+
+    def __init__(self):
+        self._sdk = None
+        self._config = None
+        self._lock = Lock()
+
+    @property
+    def is_loaded(self):
+        return self._sdk is not None
+
+    def configure(self, environment, merchant_id, public_key, private_key, *,
+                  connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                  read_timeout=DEFAULT_READ_TIMEOUT, pool_size=None,
+                  metrics_interval=None):
+        """
+        `braintree.Configuration.configure`, applied once the SDK loads (or
+        straight away if it already has). Gateway calls go through
+        `http_client.KeepAliveHttp`.
+
+        :param str environment: `sandbox` or `production`.
+        :param str merchant_id: The Braintree merchant ID.
+        :param str public_key: The Braintree public key.
+        :param str private_key: The Braintree private key.
+        :param float connect_timeout: Seconds to wait for a connection to the
+        gateway.
+        :param float read_timeout: Seconds to wait for the gateway's response.
+        :param int pool_size: Kept alive connections per worker. Defaults to
+        `http_client.DEFAULT_POOL_SIZE`.
+        :param int metrics_interval: Seconds between gateway latency log
+        lines, 0 disables. Defaults to
+        `http_client.DEFAULT_METRICS_INTERVAL`.
+        """
+        if environment not in ENVIRONMENTS:
+            raise ValueError(
+                'Unknown Braintree environment {0}'.format(environment)
+            )
+
+        with self._lock:
+            self._config = {
+                'environment': environment,
+                'merchant_id': merchant_id,
+                'public_key': public_key,
+                'private_key': private_key,
+                'timeout': (connect_timeout, read_timeout),
+                'pool_size': pool_size,
+                'metrics_interval': metrics_interval,
+            }
+
+            if self._sdk is not None:
+                self._apply_config(self._sdk)
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def _load(self):
+        if self._sdk is None:
+            with self._lock:
+                if self._sdk is None:
+                    sdk = importlib.import_module('braintree')
+
+                    if self._config is not None:
+                        self._apply_config(sdk)
+
+                    self._sdk = sdk
+
+        return self._sdk
+
+    def _apply_config(self, sdk):
+        http_client = self._load_http_client()
+
+        if self._config['pool_size'] is not None:
+            http_client.configure_session(self._config['pool_size'])
+
+        if self._config['metrics_interval'] is not None:
+            http_client.gateway_metrics.interval = \
+                self._config['metrics_interval']
+
+        sdk.Configuration.configure(
+            environment=getattr(
+                sdk.Environment,
+                ENVIRONMENTS[self._config['environment']],
+            ),
+            merchant_id=self._config['merchant_id'],
+            public_key=self._config['public_key'],
+            private_key=self._config['private_key'],
+            http_strategy=http_client.KeepAliveHttp,
+            timeout=self._config['timeout'],
+        )
+
+    @staticmethod
+    def _load_http_client():
+        # Extends the SDK, so it's only imported along with it.
+        return importlib.import_module(
+            'almanac.integrations.braintree.http_client'
+        )
+
+
+braintree = LazyBraintree()
@@ -1,9 +1,8 @@
-import braintree
 import logging
 from flask import current_app
-from braintree import MerchantAccount, Transaction
 
 from almanac.exc.exceptions import IntegrationException
+from almanac.integrations.braintree.sdk import braintree
 from almanac.models.braintree.submerchant_table import SubmerchantTable
 
 MINIMUM_AMOUNT_THRESHOLD = 15.0
@@ -23,6 +22,6 @@ class BraintreeSubmerchant(object):
         :rtype: dict
         :return: The submerchant's information
         """
-        submerchant['funding']['destination'] = MerchantAccount.FundingDestination.Bank
+        submerchant['funding']['destination'] = braintree.MerchantAccount.FundingDestination.Bank
         del submerchant['register_as_business']
         return braintree.MerchantAccount.create(submerchant)
\ No newline at end of file
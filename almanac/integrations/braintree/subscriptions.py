@@ -1,8 +1,7 @@
 import logging
-from braintree import Subscription
-from braintree.exceptions import NotFoundError
 
 from almanac.exc.exceptions import IntegrationException
+from almanac.integrations.braintree.sdk import braintree
 
 
 class BraintreeSubscription(object):
@@ -21,7 +20,7 @@ class BraintreeSubscription(object):
         :param str plan_id: The plan we want the user to subscribe under
         :return: The result from starting the subscription
         """
-        result = Subscription.create({
+        result = braintree.Subscription.create({
             'id': unique_id,
             'payment_method_token': payment_method_token,
             'plan_id': plan_id,
@@ -46,8 +45,8 @@ class BraintreeSubscription(object):
         :return: The result of stopping the subscription.
         """
         try:
-            result = Subscription.cancel(subscription_id)
-        except NotFoundError as e:
+            result = braintree.Subscription.cancel(subscription_id)
+        except braintree.exceptions.NotFoundError as e:
             logging.error('Subscription ID {0} not found.')
             raise IntegrationException(
                 'Failed to cancel subscription. '
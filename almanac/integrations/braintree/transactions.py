@@ -1,7 +1,7 @@
 import logging
-from braintree import Transaction
 
 from almanac.exc.exceptions import IntegrationException
+from almanac.integrations.braintree.sdk import braintree
 from almanac.models.braintree.submerchant_table import SubmerchantTable
 
 MINIMUM_AMOUNT_THRESHOLD = 15.0
@@ -39,7 +39,7 @@ class BraintreeTransactions(object):
             )
 
         try:
-            return Transaction.sale({
+            return braintree.Transaction.sale({
                 'merchant_account_id': submerchant.braintree_account_id,
                 'payment_method_nonce': nonce,
                 'amount': amount,
@@ -69,6 +69,38 @@ class BraintreeTransactions(object):
             )
             raise IntegrationException('Failed to create transaction.')
 
+    def void_transaction(self, transaction_id):
+        """
+        Handles voiding a transaction which hasn't settled yet.
+
+        :param str transaction_id: The braintree transaction ID.
+        :raises: IntegrationException
+        :return: The result of voiding the transaction.
+        """
+        try:
+            result = braintree.Transaction.void(transaction_id)
+        except Exception as e:
+            logging.error(
+                'Failed to void transaction {0} with exception of '
+                '{1}'.format(
+                    transaction_id,
+                    e,
+                )
+            )
+            raise IntegrationException('Failed to void transaction.')
+
+        if not result.is_success:
+            logging.error(
+                'Received error result {0} when voiding transaction '
+                '{1}'.format(
+                    result,
+                    transaction_id,
+                )
+            )
+            raise IntegrationException('Failed to void transaction.')
+
+        return result
+
     # TODO(ian): Refactor this to use event_table's implementation.
     def _calculate_service_fee(self, amount, submerchant):
         try:
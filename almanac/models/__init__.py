@@ -1,6 +1,6 @@
-from flask_sqlalchemy import SQLAlchemy
+from almanac.utils.db_pool import AlmanacSQLAlchemy
 
-db = SQLAlchemy()
+db = AlmanacSQLAlchemy()
 
 from .base_table import BaseTable
 
@@ -13,8 +13,10 @@ from .braintree.subscription_table import SubscriptionTable
 from .user_table import UserTable
 from .schedule_table import ScheduleTable
 from .event_table import EventTable
+from .event_hold_table import EventHoldTable
 from .contact_table import ContactTable
 from .payment_table import PaymentTable
 from .address_table import AddressTable
 from .email_queue_table import EmailQueueTable
+from .idempotency_key_table import IdempotencyKeyTable
 
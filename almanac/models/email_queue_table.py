@@ -1,6 +1,13 @@
+from datetime import datetime
+
 from almanac.models import BaseTable
 from almanac.models import db
 
+STATUS_PENDING = 'pending'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
 
 class EmailQueueTable(BaseTable):
     """
@@ -13,6 +20,20 @@ class EmailQueueTable(BaseTable):
     subject = db.Column(db.TEXT, nullable=False)
     body = db.Column(db.String(256), nullable=False)
 
+    # Delivery bookkeeping, owned by `almanac.workers.mail_worker`.
+    status = db.Column(db.String(16), nullable=False, default=STATUS_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(
+        db.TIMESTAMP,
+        nullable=False,
+        default=datetime.utcnow
+    )
+    locked_at = db.Column(db.TIMESTAMP, nullable=True)
+    sent_at = db.Column(db.TIMESTAMP, nullable=True)
+    last_error = db.Column(db.TEXT, nullable=True)
+
+    db.Index('idx_email_queue_status', status, next_attempt_at)
+
     def __init__(self, email_to, email_from, subject, body):
         super().__init__()
 
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects.postgresql.ranges import TSTZRANGE
+
+from almanac.models import BaseTable
+from almanac.models import db
+
+
+class EventHoldTable(BaseTable):
+    """
+    Reserves a slot for an event while it's being paid for. Holds expire
+    after a few minutes, so one abandoned mid-payment frees its slot again.
+    """
+    __tablename__ = 'event_holds'
+
+    scheduling_user_id = db.Column(
+        db.String(36),
+        db.ForeignKey('users.public_id'),
+        nullable=False
+    )
+
+    scheduled_user_id = db.Column(
+        db.String(36),
+        db.ForeignKey('users.public_id'),
+        nullable=False,
+        index=True
+    )
+
+    utc_duration = db.Column(TSTZRANGE, nullable=False)
+
+    expires_at = db.Column(db.TIMESTAMP, nullable=False, index=True)
+
+    # Overlapping holds for the same scheduled user are rejected by the
+    # `excl_event_holds_scheduled_user_overlap` exclusion constraint, which
+    # is created by the migrations.
+
+    def __init__(self, event, ttl):
+        """
+        :param EventTable event: The (not yet inserted) event to hold the
+        slot for.
+        :param int ttl: Seconds until the hold expires.
+        """
+        super().__init__()
+
+        self.scheduling_user_id = event.scheduling_user_id
+        self.scheduled_user_id = event.scheduled_user_id
+        self.utc_duration = event.utc_duration
+        self.expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+
+    def __repr__(self):
+        return 'Hold {0} on {1} for user {2} until {3}'.format(
+            self.public_id,
+            self.utc_duration,
+            self.scheduled_user_id,
+            self.expires_at,
+        )
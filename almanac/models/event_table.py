@@ -1,5 +1,4 @@
 from sqlalchemy.dialects.postgresql.ranges import TSTZRANGE
-from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from psycopg2.extras import DateTimeTZRange
 
 import logging
@@ -9,7 +8,7 @@ from almanac.exc.exceptions import TableException, ModelException
 from almanac.models import BaseTable
 from almanac.models import SubmerchantTable
 from almanac.models import db
-from almanac.models import UserTable as User
+from almanac.utils.user_loader import get_user_loader
 
 
 class EventTable(BaseTable):
@@ -50,9 +49,9 @@ class EventTable(BaseTable):
 
     notes = db.Column(db.String(512), nullable=True)
 
-    ExcludeConstraint(('utc_duration', '&&'))
-    ExcludeConstraint(('scheduled_tz_duration', '&&'))
-    ExcludeConstraint(('scheduling_tz_duration', '&&'))
+    # Overlapping events for the same scheduled user are rejected by the
+    # `excl_events_scheduled_user_overlap` exclusion constraint, which (like
+    # the table's GiST indexes) is created by the migrations.
 
     @property
     def utc_start(self): return self.utc_duration.lower
@@ -73,16 +72,20 @@ class EventTable(BaseTable):
     def scheduling_tz_end(self): return self.scheduling_tz_duration.upper
 
     def __init__(self, start_time, end_time, scheduling, scheduled,
-                 notes=None):
+                 notes=None, *, scheduling_user_info=None,
+                 scheduled_user_info=None, submerchant_info=None):
         super().__init__()
 
-        scheduling_user_info = db.session.query(
-            User
-        ).filter_by(public_id=scheduling).first()
+        # Both users come back from one query and stay cached for the rest
+        # of the request (the payment facade reloads them).
+        user_loader = get_user_loader()
+        user_loader.prime(scheduling, scheduled)
 
-        scheduled_user_info = db.session.query(
-            User
-        ).filter_by(public_id=scheduled).first()
+        if scheduling_user_info is None:
+            scheduling_user_info = user_loader.load(scheduling)
+
+        if scheduled_user_info is None:
+            scheduled_user_info = user_loader.load(scheduled)
 
         self.utc_duration = DateTimeTZRange(start_time, end_time)
         self._set_duration_for_user(scheduling_user_info, is_scheduling=True)
@@ -109,11 +112,12 @@ class EventTable(BaseTable):
             scheduled_user_info,
         )
 
-        submerchant_info = db.session.query(
-            SubmerchantTable
-        ).filter_by(
-            user_id=scheduled
-        ).first()
+        if submerchant_info is None:
+            submerchant_info = db.session.query(
+                SubmerchantTable
+            ).filter_by(
+                user_id=scheduled
+            ).first()
 
         self.service_fee = self.calculate_service_fee(submerchant_info)
 
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from almanac.models import BaseTable
+from almanac.models import db
+
+
+class IdempotencyKeyTable(BaseTable):
+    """
+    The stored response to a request sent with an `Idempotency-Key` header,
+    replayed to retries of the same request. Owned by
+    `almanac.utils.idempotency`.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    user_id = db.Column(
+        db.String(36),
+        db.ForeignKey('users.public_id'),
+        nullable=False
+    )
+
+    key = db.Column(db.String(255), nullable=False)
+
+    # sha256 of the method, path and body, so a key can't be reused for a
+    # different request.
+    request_hash = db.Column(db.String(64), nullable=False)
+
+    # Both NULL while the request is in flight.
+    status_code = db.Column(db.SmallInteger, nullable=True)
+    response_body = db.Column(db.TEXT, nullable=True)
+
+    locked_at = db.Column(db.TIMESTAMP, nullable=True)
+    expires_at = db.Column(db.TIMESTAMP, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            'user_id',
+            'key',
+            name='uq_idempotency_keys_user_key',
+        ),
+    )
+
+    def __init__(self, user_id, key, request_hash, ttl):
+        """
+        :param str user_id: The user sending the request.
+        :param str key: The request's `Idempotency-Key` header.
+        :param str request_hash: See `request_hash`.
+        :param int ttl: Seconds the response is kept for.
+        """
+        super().__init__()
+
+        now = datetime.utcnow()
+
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+        self.locked_at = now
+        self.expires_at = now + timedelta(seconds=ttl)
+
+    @property
+    def is_complete(self):
+        return self.status_code is not None
+
+    def __repr__(self):
+        return 'Idempotency key {0} for user {1} ({2})'.format(
+            self.key,
+            self.user_id,
+            self.status_code or 'in flight',
+        )
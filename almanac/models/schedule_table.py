@@ -1,6 +1,5 @@
 from psycopg2._range import DateTimeRange
 from sqlalchemy.dialects.postgresql.ranges import TSTZRANGE, TSRANGE
-from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from psycopg2.extras import DateTimeTZRange
 
 from almanac.models import BaseTable
@@ -17,7 +16,8 @@ class ScheduleTable(BaseTable):
     user_id = db.Column(
         db.String(36),
         db.ForeignKey('users.public_id'),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # Actual schedule stuff.
@@ -30,8 +30,9 @@ class ScheduleTable(BaseTable):
     # tz stuff
     local_tz = db.Column(db.String, nullable=False)
 
-    ExcludeConstraint(('utc_duration', '&&'))
-    ExcludeConstraint(('local_duration', '&&'))
+    # Overlapping schedules for the same user are rejected by the
+    # `excl_schedules_user_overlap` exclusion constraint, which (like the
+    # table's GiST indexes) is created by the migrations.
 
     @property
     def local_tz_open(self): return self.local_duration.lower
@@ -1,10 +1,10 @@
 import uuid
-import bcrypt
 import pytz
 
 from almanac.exc.exceptions import ModelException, SQLException
 from almanac.models import SubmerchantTable
 from almanac.models import db, BaseTable
+from almanac.utils.password_hasher import get_password_hasher
 
 
 class UserTable(BaseTable):
@@ -55,12 +55,12 @@ class UserTable(BaseTable):
         :return: True if valid password--False otherwise.
         """
         if isinstance(self.password, bytes):
-            return bcrypt.checkpw(
+            return get_password_hasher().check(
                 plaintext_password.encode('utf-8'),
                 self.password.decode('utf-8').encode('utf-8')
             )
         else:
-            return bcrypt.checkpw(
+            return get_password_hasher().check(
                 plaintext_password.encode('utf-8'),
                 self.password.encode('utf-8')
             )
@@ -97,9 +97,9 @@ class UserTable(BaseTable):
         :rtype: str
         :return: The bcrypt hash of the password.
         """
-        return bcrypt.hashpw(
+        return get_password_hasher().hash(
             plaintext_password.encode('utf-8'),
-            bcrypt.gensalt(work_factor, b'2b')
+            work_factor
         )
 
     @staticmethod
@@ -111,7 +111,10 @@ class UserTable(BaseTable):
         :param str stored_password: The password currently stored for the user.
         :return:
         """
-        return bcrypt.checkpw(plaintext.encode('utf-8'), stored_password)
+        return get_password_hasher().check(
+            plaintext.encode('utf-8'),
+            stored_password
+        )
 
     def __add__(self, submerchant):
         if not isinstance(submerchant, SubmerchantTable):
@@ -0,0 +1,240 @@
+"""
+Pre-compiled equivalents of the marshmallow schemas in `return_schemas`.
+
+marshmallow walks every field through several layers of indirection (field
+lookup, accessor, error store, post-dump hooks) for every object it dumps.
+For the list endpoints that's most of the request. Here each schema is
+turned into a single generated function once at import, which reads the
+attributes and formats them inline while producing exactly what the schema's
+`dump(...).data` would.
+
+Objects the generated code can't handle identically are handed to the
+original schema instead: anything subscriptable (such as dicts), and any
+object with a value marshmallow fails to format, since marshmallow then skips
+the post-dump hooks for the whole dump.
+"""
+from datetime import timezone
+
+from marshmallow import fields, missing
+
+from almanac.schemas.return_schemas import _BaseSchema
+from almanac.schemas.return_schemas import EventMarshal
+from almanac.schemas.return_schemas import ScheduleMarshal
+from almanac.schemas.return_schemas import UserMarshal
+from almanac.schemas.return_schemas import UserSanitizedMarshal
+
+_BOOL_TRUTHY = fields.Boolean.truthy
+_BOOL_FALSY = fields.Boolean.falsy
+
+# Templates rendering the formatted value of `v` into `r`.
+_FORMATTERS = {
+    'string': (
+        "if v is None:\n"
+        "    r = None\n"
+        "else:\n"
+        "    r = v if type(v) is str else _text(v)\n"
+    ),
+    'integer': (
+        "try:\n"
+        "    r = None if v is None else int(v)\n"
+        "except (TypeError, ValueError):\n"
+        "    raise _Fallback\n"
+    ),
+    'float': (
+        "try:\n"
+        "    r = None if v is None else float(v)\n"
+        "except (TypeError, ValueError):\n"
+        "    raise _Fallback\n"
+    ),
+    'boolean': (
+        "if v is None:\n"
+        "    r = None\n"
+        "elif v in _BOOL_TRUTHY:\n"
+        "    r = True\n"
+        "elif v in _BOOL_FALSY:\n"
+        "    r = False\n"
+        "else:\n"
+        "    r = bool(v)\n"
+    ),
+    'datetime': (
+        "if v is None:\n"
+        "    r = None\n"
+        "else:\n"
+        "    try:\n"
+        "        r = _isoformat(v)\n"
+        "    except (AttributeError, ValueError):\n"
+        "        raise _Fallback\n"
+    ),
+}
+
+
+class _Fallback(Exception):
+    """
+    Raised by generated code for values it can't dump like marshmallow.
+    """
+
+
+class CompiledMarshal(object):
+    """
+    A schema compiled down to a plain function.
+    """
+
+    def __init__(self, schema_cls):
+        self.schema_cls = schema_cls
+        self._schema = schema_cls()
+        self._dump = _compile(schema_cls)
+
+    def dump(self, obj):
+        """
+        Dumps a single object.
+
+        :param object obj: The object to dump.
+        :rtype: dict
+        :return: What `schema_cls().dump(obj).data` returns.
+        """
+        if not hasattr(type(obj), '__getitem__'):
+            try:
+                return self._dump(obj)
+            except _Fallback:
+                pass
+
+        return self._schema.dump(obj).data
+
+    def dump_many(self, objs):
+        """
+        Dumps every object in an iterable.
+
+        :param iterable objs: The objects to dump.
+        :rtype: list[dict]
+        :return: What `schema_cls(many=True).dump(objs).data` returns.
+        """
+        objs = list(objs)
+        dump = self._dump
+
+        try:
+            return [
+                dump(obj)
+                for obj in objs
+                if not hasattr(type(obj), '__getitem__') or _raise_fallback()
+            ]
+        except _Fallback:
+            return self.schema_cls(many=True).dump(objs).data
+
+
+def _compile(schema_cls):
+    processors = {
+        tag: names
+        for tag, names in schema_cls.__processors__.items()
+        if names
+    }
+
+    if issubclass(schema_cls, _BaseSchema):
+        if processors != {('post_dump', False): ['replace_with_none']}:
+            raise TypeError(
+                'Cannot compile {0}, it has custom hooks.'.format(schema_cls)
+            )
+        collapse_falsy = True
+    elif processors:
+        raise TypeError(
+            'Cannot compile {0}, it has custom hooks.'.format(schema_cls)
+        )
+    else:
+        collapse_falsy = False
+
+    opts = schema_cls.OPTIONS_CLASS(schema_cls.Meta)
+    if opts.fields or opts.additional or opts.exclude or opts.dateformat:
+        raise TypeError(
+            'Cannot compile {0}, it customises its Meta.'.format(schema_cls)
+        )
+
+    lines = ['def dump(obj):', '    data = {}']
+    for name, field in schema_cls._declared_fields.items():
+        # Defaults are dumped unformatted and `dump_to` renames the key,
+        # neither of which the generated code reproduces.
+        has_default = field.default is not missing and not (
+            collapse_falsy and field.default is False
+        )
+        if has_default or field.dump_to:
+            raise TypeError('Cannot compile {0}'.format(field))
+
+        lines.append('    v = getattr(obj, {0!r}, missing)'.format(
+            field.attribute or name
+        ))
+        lines.append('    if v is missing:')
+        lines.append('        r = missing')
+        lines.append('    else:')
+        lines.append('        if callable(v):')
+        lines.append('            v = v()')
+        lines.extend(
+            '        ' + line
+            for line in _FORMATTERS[_field_kind(field)].splitlines()
+        )
+
+        if collapse_falsy:
+            # `_BaseSchema.replace_with_none`
+            lines.append('    data[{0!r}] = r or None'.format(name))
+        else:
+            lines.append('    if r is not missing:')
+            lines.append('        data[{0!r}] = r'.format(name))
+
+    if schema_cls is UserMarshal or issubclass(schema_cls, UserMarshal):
+        lines.append("    if data['user_id'] is None:")
+        lines.append("        data['user_id'] = data['public_id']")
+
+    lines.append('    return data')
+
+    namespace = {
+        'missing': missing,
+        '_Fallback': _Fallback,
+        '_text': _text,
+        '_isoformat': _isoformat,
+        '_BOOL_TRUTHY': _BOOL_TRUTHY,
+        '_BOOL_FALSY': _BOOL_FALSY,
+    }
+    exec('\n'.join(lines), namespace)
+
+    return namespace['dump']
+
+
+def _field_kind(field):
+    if getattr(field, 'as_string', False):
+        raise TypeError('Cannot compile {0}'.format(field))
+
+    if isinstance(field, fields.DateTime):
+        if field.dateformat not in (None, 'iso') or field.localtime:
+            raise TypeError('Cannot compile {0}'.format(field))
+        return 'datetime'
+    elif isinstance(field, fields.Boolean):
+        return 'boolean'
+    elif isinstance(field, fields.Integer):
+        return 'integer'
+    elif type(field) in (fields.Float, fields.Number):
+        return 'float'
+    elif type(field) is fields.String:
+        return 'string'
+
+    raise TypeError('Cannot compile {0}'.format(field))
+
+
+def _raise_fallback():
+    raise _Fallback
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+
+    return str(value)
+
+
+def _isoformat(dt):
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc).isoformat()
+
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+event_marshal = CompiledMarshal(EventMarshal)
+schedule_marshal = CompiledMarshal(ScheduleMarshal)
+user_marshal = CompiledMarshal(UserMarshal)
+user_sanitized_marshal = CompiledMarshal(UserSanitizedMarshal)
@@ -89,3 +89,8 @@ class CustomerMarshal(_BaseSchema):
     last_name = fields.String()
     is_default = fields.Boolean()
     credit_card_token = fields.String()
+
+
+class AvailableSlotMarshal(Schema):
+    utc_start = fields.DateTime()
+    utc_end = fields.DateTime()
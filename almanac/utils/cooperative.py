@@ -0,0 +1,48 @@
+"""
+Support for running under gunicorn's gevent workers
+(`GUNICORN_WORKER_CLASS=gevent`), where each request is a greenlet and
+blocking I/O yields to the others instead of holding up the whole worker.
+
+Monkey patching makes the stdlib's sockets, ssl and threads cooperative,
+which covers the Braintree SDK's HTTPS calls (made through `requests`).
+psycopg2 talks to postgres from C, so it's made cooperative separately
+through its wait callback.
+"""
+import psycopg2
+import psycopg2.extensions
+
+
+def make_cooperative():
+    """
+    Patches the process for gevent. Call before anything else is imported
+    (see `build/gunicorn.conf.py`).
+    """
+    from gevent import monkey
+
+    monkey.patch_all()
+    patch_psycopg2()
+
+
+def patch_psycopg2():
+    """
+    Has psycopg2 wait on the gevent hub rather than block in libpq.
+    """
+    psycopg2.extensions.set_wait_callback(gevent_wait_callback)
+
+
+def gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+
+        if state == psycopg2.extensions.POLL_OK:
+            break
+        elif state == psycopg2.extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(
+                'Bad result from poll: {0!r}'.format(state)
+            )
@@ -1,5 +1,6 @@
 import logging
 import sqlalchemy
+from psycopg2 import errorcodes
 from sqlalchemy.exc import IntegrityError
 
 from almanac.exc.exceptions import SQLException
@@ -29,3 +30,41 @@ def exec_and_commit(f, obj, *, skip_commit=False):
         ))
 
         raise SQLException('Error processing request.')
+
+
+def is_exclusion_violation(e, constraint_name):
+    """
+    Tells if an IntegrityError was raised by the given exclusion constraint.
+
+    :param sqlalchemy.exc.IntegrityError e: The error raised on flush.
+    :param str constraint_name: The exclusion constraint's name.
+    :rtype: bool
+    :return: Whether the constraint rejected the row.
+    """
+    orig = getattr(e, 'orig', None)
+
+    return (
+        getattr(orig, 'pgcode', None) == errorcodes.EXCLUSION_VIOLATION and
+        orig.diag.constraint_name == constraint_name
+    )
+
+
+def advisory_xact_lock(namespace, key):
+    """
+    Waits for, then takes, a transaction scoped advisory lock. It's released
+    when the transaction commits or rolls back, so it's safe behind
+    PgBouncer's transaction pooling.
+
+    :param int namespace: Keeps apart locks taken for different purposes.
+    :param str key: What's being locked. Hashed into the lock's key, so
+    unrelated keys can (rarely) share a lock.
+    :rtype: NoneType
+    :return: Nothing
+    """
+    db.session.execute(
+        'SELECT pg_advisory_xact_lock(:namespace, hashtext(:key))',
+        {
+            'namespace': namespace,
+            'key': str(key),
+        },
+    )
@@ -0,0 +1,189 @@
+import logging
+import os
+import time
+from threading import Lock
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+DEFAULT_METRICS_INTERVAL = 60
+
+
+class PoolMetrics(object):
+    """
+    Per-worker gauges for the engine's connection pool: how many
+    connections are checked out and how long checkouts wait for one.
+    Logged every `interval` seconds, by whichever request returns a
+    connection first once that's due.
+    """
+
+    def __init__(self, interval=DEFAULT_METRICS_INTERVAL):
+        self.interval = interval
+        self.in_use = 0
+        self._lock = Lock()
+        self._reset(time.monotonic())
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.in_use += 1
+            self._checkouts += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._in_use_max = max(self._in_use_max, self.in_use)
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def record_checkin(self):
+        now = time.monotonic()
+
+        with self._lock:
+            self.in_use -= 1
+
+            if not self.interval or now - self._since < self.interval:
+                return
+
+            snapshot = self._snapshot()
+            self._reset(now)
+
+        logging.info(
+            'db pool (pid {pid}): in use {in_use} (max {in_use_max}), '
+            '{checkouts} checkouts, wait avg {wait_avg_ms:.1f}ms '
+            'max {wait_max_ms:.1f}ms, {timeouts} timeouts'.format(**snapshot)
+        )
+
+    def snapshot(self):
+        """
+        :rtype: dict
+        :return: The gauges since they were last logged.
+        """
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'in_use': self.in_use,
+            'in_use_max': self._in_use_max,
+            'checkouts': self._checkouts,
+            'wait_avg_ms': (
+                self._wait_total / self._checkouts * 1000
+                if self._checkouts else 0
+            ),
+            'wait_max_ms': self._wait_max * 1000,
+            'timeouts': self._timeouts,
+        }
+
+    def _reset(self, now):
+        self._since = now
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0
+        self._wait_max = 0
+        self._in_use_max = self.in_use
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin(object):
+    """
+    Times every checkout into `pool_metrics` and, with `pre_ping` set,
+    checks a pooled connection is still alive before handing it out.
+    """
+
+    pre_ping = False
+
+    def connect(self):
+        return self._instrumented_checkout(super().connect)
+
+    def unique_connection(self):
+        return self._instrumented_checkout(super().unique_connection)
+
+    def _instrumented_checkout(self, checkout):
+        fairy = self._timed_checkout(checkout)
+
+        if self.pre_ping and not _is_alive(fairy.connection):
+            # The connection died while idle in the pool (a DB restart or
+            # an idle timeout in between). Anything pooled before now is
+            # likely dead too, so have the pool reconnect all of them.
+            self._invalidate(fairy)
+            fairy = self._timed_checkout(checkout)
+
+        return fairy
+
+    def _timed_checkout(self, checkout):
+        started = time.monotonic()
+
+        try:
+            fairy = checkout()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+
+        pool_metrics.record_checkout(time.monotonic() - started)
+        return fairy
+
+    def _do_return_conn(self, conn):
+        try:
+            super()._do_return_conn(conn)
+        finally:
+            pool_metrics.record_checkin()
+
+
+def _is_alive(dbapi_connection):
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute('SELECT 1')
+        cursor.close()
+        dbapi_connection.rollback()
+    except Exception:
+        return False
+
+    return True
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class PingingQueuePool(InstrumentedQueuePool):
+    pre_ping = True
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    pass
+
+
+class AlmanacSQLAlchemy(SQLAlchemy):
+    """
+    Picks the engine's pool from the app config:
+
+    * `DB_PGBOUNCER`: PgBouncer (in transaction pooling mode) does the
+      pooling, so each checkout opens a fresh connection to it and closes
+      it on checkin. Sizes, timeouts and pings are left to PgBouncer.
+    * Otherwise a QueuePool sized by `SQLALCHEMY_POOL_*`, pinging each
+      connection on checkout if `DB_POOL_PRE_PING` is set.
+    """
+
+    def apply_driver_hacks(self, app, info, options):
+        super().apply_driver_hacks(app, info, options)
+
+        pool_metrics.interval = app.config.get(
+            'DB_POOL_METRICS_INTERVAL',
+            DEFAULT_METRICS_INTERVAL,
+        )
+
+        if not info.drivername.startswith('postgres'):
+            return
+
+        if app.config.get('DB_PGBOUNCER'):
+            options['poolclass'] = InstrumentedNullPool
+            for option in ('pool_size', 'pool_timeout', 'max_overflow'):
+                options.pop(option, None)
+        elif app.config.get('DB_POOL_PRE_PING'):
+            options['poolclass'] = PingingQueuePool
+        else:
+            options['poolclass'] = InstrumentedQueuePool
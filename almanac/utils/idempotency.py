@@ -0,0 +1,128 @@
+import hashlib
+import logging
+from functools import wraps
+from http import HTTPStatus
+
+from flask import current_app, g, json, make_response, request, Response
+
+from almanac.DAOs.idempotency_key_dao import IdempotencyKeyDAO
+from almanac.exc.exceptions import BaseAlmanacException, EndpointException
+from almanac.models import db
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(f):
+    """
+    Lets clients safely retry a view by sending an `Idempotency-Key` header.
+    The first request with a key runs the view and stores its response
+    (including client errors); retries with the same key and body get the
+    stored response back without running the view again. Server errors
+    aren't stored, so the request can be retried. Requests without the header
+    run as usual.
+
+    Must be applied inside `authentication_required`, as keys are scoped to
+    the requesting user.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+
+        if key is None:
+            return f(*args, **kwargs)
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise EndpointException(
+                'Invalid Idempotency-Key. Keys must be between 1 and {0} '
+                'characters.'.format(MAX_KEY_LENGTH)
+            )
+
+        user_id = g.user_info['user_id']
+        dao = IdempotencyKeyDAO()
+
+        stored = dao.begin(
+            user_id,
+            key,
+            _request_hash(),
+            ttl=current_app.config['IDEMPOTENCY_KEY_TTL'],
+            lease=current_app.config['IDEMPOTENCY_KEY_LEASE'],
+        )
+
+        if stored is not None:
+            return _replay(stored)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except BaseAlmanacException as e:
+            _finish(
+                dao,
+                user_id,
+                key,
+                e.status_code,
+                json.dumps({'msg': e.msg}),
+            )
+            raise
+        except Exception:
+            _finish(dao, user_id, key, HTTPStatus.INTERNAL_SERVER_ERROR)
+            raise
+
+        _finish(
+            dao,
+            user_id,
+            key,
+            response.status_code,
+            response.get_data(as_text=True),
+        )
+
+        return response
+
+    return wrapper
+
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode('utf-8'))
+    digest.update(request.path.encode('utf-8'))
+    digest.update(request.get_data())
+
+    return digest.hexdigest()
+
+
+def _replay(stored):
+    response = Response(
+        stored.response_body,
+        status=stored.status_code,
+        mimetype='application/json',
+    )
+    response.headers[REPLAYED_HEADER] = 'true'
+
+    return response
+
+
+def _finish(dao, user_id, key, status_code, response_body=None):
+    """
+    Stores the response to a request holding a key, or releases the key if
+    the request failed with a server error. The response itself has already
+    been decided, so failing to record it is only logged; the key is then
+    handed to a retry once its lease runs out.
+    """
+    # Whatever the view left behind mustn't be committed along with this.
+    db.session.rollback()
+
+    try:
+        if status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            dao.release(user_id, key)
+        else:
+            dao.complete(user_id, key, status_code, response_body)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(
+            'Failed to record the response to idempotency key {0} for user '
+            '{1} w/ exc {2}'.format(
+                key,
+                user_id,
+                e,
+            )
+        )
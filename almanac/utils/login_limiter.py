@@ -0,0 +1,230 @@
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from threading import Lock
+
+from flask import current_app
+
+from almanac.exc.exceptions import LoginThrottledException
+
+DEFAULT_IDENTITY_ATTEMPTS = 10
+DEFAULT_IDENTITY_WINDOW = 300
+DEFAULT_IP_ATTEMPTS = 30
+DEFAULT_IP_WINDOW = 60
+DEFAULT_LIMITER_SIZE = 50000
+
+_limiter = None
+_limiter_lock = Lock()
+
+
+class LocalLoginLimiter(object):
+    """
+    In-process sliding window log of login attempts. Each gunicorn worker
+    counts on its own, so with N workers a client can get up to N times the
+    limit through before every worker has turned it away.
+    """
+
+    def __init__(self, max_size=DEFAULT_LIMITER_SIZE):
+        self.max_size = max_size
+        self._windows = OrderedDict()
+        self._lock = Lock()
+
+    def hit(self, key, limit, window):
+        """
+        Records an attempt against `key` unless it has already made `limit`
+        attempts in the last `window` seconds.
+
+        :param str key: What's being limited.
+        :param int limit: The most attempts allowed in the window.
+        :param int window: The window's length in seconds.
+        :rtype: float
+        :return: 0 if the attempt was allowed, otherwise the seconds until
+        the oldest attempt leaves the window.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            attempts = self._windows.get(key)
+            if attempts is None:
+                attempts = self._windows[key] = deque()
+
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+
+            self._windows.move_to_end(key)
+
+            if len(attempts) >= limit:
+                return attempts[0] + window - now
+
+            attempts.append(now)
+
+            while len(self._windows) > self.max_size:
+                self._windows.popitem(last=False)
+
+        return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._windows.pop(key, None)
+
+
+class RedisLoginLimiter(object):
+    """
+    Sliding window log shared by every worker through a Redis sorted set per
+    key, scored by the attempt's time.
+    """
+
+    KEY_PREFIX = 'kronikl:login:'
+
+    def __init__(self, url, *, client=None):
+        """
+        :param str url: The redis:// URL.
+        :param redis.StrictRedis client: Used instead of connecting to `url`.
+        """
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                'KRONIKL_LOGIN_LIMITER_URL is set but the `redis` package '
+                'is not installed.'
+            )
+
+        # Only an unreachable or failing Redis fails open. Anything else is
+        # a bug and mustn't quietly turn the limiter off.
+        self._backend_errors = redis.RedisError
+        self._client = client or redis.StrictRedis.from_url(url)
+
+    def hit(self, key, limit, window):
+        redis_key = self.KEY_PREFIX + key
+        now = time.time()
+
+        try:
+            pipe = self._client.pipeline()
+            pipe.zremrangebyscore(redis_key, 0, now - window)
+            pipe.zadd(
+                redis_key,
+                {'{0}:{1}'.format(now, uuid.uuid4().hex): now},
+            )
+            pipe.zcard(redis_key)
+            pipe.expire(redis_key, int(math.ceil(window)))
+            _, _, attempts, _ = pipe.execute()
+
+            if attempts <= limit:
+                return 0
+
+            # Over the limit, so take this attempt back out again. Rejected
+            # attempts mustn't keep the window full forever.
+            pipe = self._client.pipeline()
+            pipe.zremrangebyrank(redis_key, -1, -1)
+            pipe.zrange(redis_key, 0, 0, withscores=True)
+            _, oldest = pipe.execute()
+        except self._backend_errors as e:
+            # Fail open; a cache outage shouldn't lock every user out. Logins
+            # aren't throttled at all until it's back, though.
+            logging.critical(
+                'Login limiter backend unavailable, NOT throttling login for '
+                '{0} w/ exc {1}'.format(
+                    key,
+                    e,
+                )
+            )
+            return 0
+
+        if not oldest:
+            return 0
+
+        return max(oldest[0][1] + window - now, 0.001)
+
+    def reset(self, key):
+        try:
+            self._client.delete(self.KEY_PREFIX + key)
+        except self._backend_errors as e:
+            logging.error(
+                'Failed to reset login limit for {0} w/ exc {1}'.format(
+                    key,
+                    e,
+                )
+            )
+
+
+def get_login_limiter():
+    """
+    Retrieves the worker's login limiter, creating it from the app config on
+    first use. A Redis backend is used whenever `LOGIN_LIMITER_URL` is set,
+    otherwise attempts are counted in-process.
+
+    :rtype: LocalLoginLimiter|RedisLoginLimiter
+    :return: The login limiter.
+    """
+    global _limiter
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                url = current_app.config.get('LOGIN_LIMITER_URL')
+
+                if url:
+                    _limiter = RedisLoginLimiter(url)
+                else:
+                    _limiter = LocalLoginLimiter(
+                        current_app.config.get(
+                            'LOGIN_LIMITER_SIZE',
+                            DEFAULT_LIMITER_SIZE,
+                        )
+                    )
+
+    return _limiter
+
+
+def admit_login(user_challenge, client_ip):
+    """
+    Counts a login attempt against both the account being signed in to and
+    the client's IP. Call before anything touches the database or bcrypt.
+
+    :param str user_challenge: The email/username being signed in to.
+    :param str client_ip: The client's IP address.
+    :raises: LoginThrottledException
+    """
+    config = current_app.config
+    limiter = get_login_limiter()
+
+    # The IP is checked first so a single client spraying many accounts
+    # doesn't also use up each account's allowance.
+    retry_after = limiter.hit(
+        _ip_key(client_ip),
+        config.get('LOGIN_LIMIT_IP_ATTEMPTS', DEFAULT_IP_ATTEMPTS),
+        config.get('LOGIN_LIMIT_IP_WINDOW', DEFAULT_IP_WINDOW),
+    ) or limiter.hit(
+        _identity_key(user_challenge),
+        config.get('LOGIN_LIMIT_ATTEMPTS', DEFAULT_IDENTITY_ATTEMPTS),
+        config.get('LOGIN_LIMIT_WINDOW', DEFAULT_IDENTITY_WINDOW),
+    )
+
+    if retry_after:
+        logging.warning(
+            'Throttled login for {0} from {1}'.format(user_challenge, client_ip)
+        )
+        raise LoginThrottledException(
+            'Too many sign in attempts. Please try again later.',
+            int(math.ceil(retry_after)),
+        )
+
+
+def reset_login_attempts(user_challenge):
+    """
+    Clears an account's attempts after a successful sign in, so earlier
+    typos don't count against the user's next session.
+
+    :param str user_challenge: The email/username that was signed in to.
+    """
+    get_login_limiter().reset(_identity_key(user_challenge))
+
+
+def _identity_key(user_challenge):
+    return 'user:' + user_challenge.strip().lower()
+
+
+def _ip_key(client_ip):
+    return 'ip:' + (client_ip or 'unknown')
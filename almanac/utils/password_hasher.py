@@ -0,0 +1,165 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from threading import BoundedSemaphore, Lock
+
+import bcrypt
+from flask import current_app, has_app_context
+
+from almanac.exc.exceptions import PasswordHashingException
+
+DEFAULT_WORK_FACTOR = 10
+DEFAULT_HASHER_WORKERS = 2
+DEFAULT_HASHER_QUEUE = 8
+DEFAULT_HASHER_TIMEOUT = 5
+
+_hasher = None
+_hasher_lock = Lock()
+
+
+def _hashpw(plaintext, work_factor):
+    return bcrypt.hashpw(plaintext, bcrypt.gensalt(work_factor, b'2b'))
+
+
+def _checkpw(plaintext, hashed):
+    return bcrypt.checkpw(plaintext, hashed)
+
+
+class InlineHasher(object):
+    """
+    Runs bcrypt on the calling thread.
+    """
+
+    def hash(self, plaintext, work_factor=DEFAULT_WORK_FACTOR):
+        """
+        Bcrypt hashes a password.
+
+        :param bytes plaintext: The password to hash.
+        :param int work_factor: The bcrypt cost.
+        :rtype: bytes
+        :return: The bcrypt hash of the password.
+        """
+        return _hashpw(plaintext, work_factor)
+
+    def check(self, plaintext, hashed):
+        """
+        Compares a password to a bcrypt hash.
+
+        :param bytes plaintext: The password to check.
+        :param bytes hashed: The stored hash.
+        :rtype: bool
+        :return: True if the password matches.
+        """
+        return _checkpw(plaintext, hashed)
+
+
+class ProcessPoolHasher(InlineHasher):
+    """
+    Runs bcrypt on a pool of worker processes so a burst of logins can't
+    starve the web worker.
+
+    At most `max_workers + max_pending` hashes are in flight at once. Past
+    that, or if a hash doesn't finish within `timeout` seconds, a 503 is
+    raised right away instead of queueing up behind the burst.
+    """
+
+    def __init__(self, max_workers=DEFAULT_HASHER_WORKERS,
+                 max_pending=DEFAULT_HASHER_QUEUE,
+                 timeout=DEFAULT_HASHER_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self._slots = BoundedSemaphore(max_workers + max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = Lock()
+
+    def hash(self, plaintext, work_factor=DEFAULT_WORK_FACTOR):
+        return self._submit(_hashpw, plaintext, work_factor)
+
+    def check(self, plaintext, hashed):
+        return self._submit(_checkpw, plaintext, hashed)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            logging.warning('Password hashing pool is saturated.')
+            raise PasswordHashingException(
+                'Too many sign in attempts at once. Please try again.',
+                HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        # The slot is only freed once the hash actually finishes, so hashes
+        # which timed out still count against the pool.
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            logging.error(
+                'Password hashing timed out after {0}s.'.format(self.timeout)
+            )
+            raise PasswordHashingException(
+                'Sign in is taking longer than expected. Please try again.',
+                HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+    def _get_pool(self):
+        # Pools don't survive a fork, so gunicorn workers forked from a
+        # preloaded master each start their own.
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                self._pool_pid = os.getpid()
+
+            return self._pool
+
+
+def get_password_hasher():
+    """
+    Retrieves the worker's password hasher, creating it from the app config
+    on first use. `PASSWORD_HASHER` picks the backend: `process` (the
+    default) or `inline`. Outside of an app context hashing runs inline.
+
+    :rtype: InlineHasher|ProcessPoolHasher
+    :return: The password hasher.
+    """
+    global _hasher
+
+    if not has_app_context():
+        return InlineHasher()
+
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = _create_hasher(current_app.config)
+
+    return _hasher
+
+
+def _create_hasher(config):
+    backend = config.get('PASSWORD_HASHER', 'process')
+
+    if backend == 'inline':
+        return InlineHasher()
+    elif backend == 'process':
+        return ProcessPoolHasher(
+            config.get('PASSWORD_HASHER_WORKERS', DEFAULT_HASHER_WORKERS),
+            config.get('PASSWORD_HASHER_QUEUE', DEFAULT_HASHER_QUEUE),
+            config.get('PASSWORD_HASHER_TIMEOUT', DEFAULT_HASHER_TIMEOUT),
+        )
+
+    raise ValueError('Unknown password hasher {0}'.format(backend))
@@ -0,0 +1,87 @@
+import gc
+import logging
+
+import pytz
+from marshmallow import Schema
+from sqlalchemy.orm import configure_mappers
+
+from almanac.models import db
+from almanac.models import UserTable as User
+
+
+def warm_up(app):
+    """
+    Does the work every worker would otherwise do lazily on its first few
+    requests: configuring the mappers, building the schemas and loading the
+    timezones users are in. Run in gunicorn's master with `--preload` so the
+    workers fork with it done and share the memory it used.
+
+    :param flask.Flask app: The app to warm up.
+    """
+    # fast_serializers compiles its dump functions on import.
+    import almanac.schemas.fast_serializers
+    import almanac.schemas.return_schemas as return_schemas
+
+    configure_mappers()
+
+    for schema_cls in _schemas(return_schemas):
+        schema_cls().dump({})
+        schema_cls(many=True).dump([])
+
+    # Materialises pytz's lazy zone lists, which the endpoints validate
+    # `local_tz` against.
+    len(pytz.all_timezones)
+    len(pytz.all_timezones_set)
+
+    zones = _load_user_zones(app)
+    logging.info('Warmed up mappers, schemas and {0} timezones.'.format(
+        len(zones)
+    ))
+
+    _freeze_gc()
+
+
+def _schemas(module):
+    return [
+        value
+        for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, Schema) and
+        value.__module__ == module.__name__
+    ]
+
+
+def _load_user_zones(app):
+    with app.app_context():
+        try:
+            zones = [
+                local_tz
+                for local_tz, in db.session.query(User.local_tz).distinct()
+            ]
+        except Exception as e:
+            logging.warning(
+                'Failed to load user timezones to warm up w/ exc {0}'.format(e)
+            )
+            zones = []
+        finally:
+            db.session.remove()
+            # Nothing opened here may leak into forked workers.
+            db.get_engine(app).dispose()
+
+    loaded = []
+    for local_tz in zones:
+        try:
+            loaded.append(pytz.timezone(local_tz))
+        except pytz.UnknownTimeZoneError:
+            logging.warning('Unknown user timezone {0}'.format(local_tz))
+
+    return loaded
+
+
+def _freeze_gc():
+    gc.collect()
+
+    # Python 3.7+. Moves everything allocated so far out of the collector's
+    # reach, so collections in the workers don't write to (and un-share) the
+    # master's pages.
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
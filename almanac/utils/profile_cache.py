@@ -0,0 +1,180 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+DEFAULT_PROFILE_TTL = 60
+DEFAULT_PROFILE_CACHE_SIZE = 4096
+
+# Marshalled fields which never leave the worker, see `RedisProfileCache`.
+PRIVATE_PROFILE_FIELDS = ('email',)
+
+_cache = None
+
+
+class LocalProfileCache(object):
+    """
+    In-process LRU of marshalled user profiles. Each gunicorn worker keeps
+    its own copy, so writes made through another worker are only picked up
+    once the entry expires.
+    """
+
+    def __init__(self, ttl=DEFAULT_PROFILE_TTL,
+                 max_size=DEFAULT_PROFILE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, public_id):
+        entry = self._entries.get(public_id)
+
+        if entry is None:
+            return None
+
+        expires_at, profile = entry
+        if expires_at <= time.monotonic():
+            del self._entries[public_id]
+            return None
+
+        self._entries.move_to_end(public_id)
+        return profile
+
+    def set(self, public_id, profile):
+        self._entries[public_id] = (time.monotonic() + self.ttl, profile)
+        self._entries.move_to_end(public_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, public_id):
+        self._entries.pop(public_id, None)
+
+
+class RedisProfileCache(object):
+    """
+    Profile cache shared by every worker through Redis, so an invalidation
+    from one worker is seen by all of them. `PRIVATE_PROFILE_FIELDS` are
+    kept out of Redis, in an in-process LRU next to it; a profile is only
+    served when both are cached, so a hit never touches Postgres.
+    """
+
+    KEY_PREFIX = 'kronikl:profile:'
+
+    def __init__(self, url, ttl=DEFAULT_PROFILE_TTL,
+                 max_size=DEFAULT_PROFILE_CACHE_SIZE, *, client=None):
+        """
+        :param str url: The redis:// URL.
+        :param int ttl: Seconds a profile is cached for.
+        :param int max_size: Profiles whose private fields are kept per worker.
+        :param redis.StrictRedis client: Used instead of connecting to `url`.
+        """
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                'KRONIKL_PROFILE_CACHE_URL is set but the `redis` package '
+                'is not installed.'
+            )
+
+        self.ttl = ttl
+        self._private = LocalProfileCache(ttl, max_size)
+        self._client = client or redis.StrictRedis.from_url(url)
+
+    def get(self, public_id):
+        private = self._private.get(public_id)
+        if private is None:
+            return None
+
+        try:
+            cached = self._client.get(self.KEY_PREFIX + public_id)
+        except Exception as e:
+            logging.error(
+                'Failed to read profile {0} from cache w/ exc {1}'.format(
+                    public_id,
+                    e,
+                )
+            )
+            return None
+
+        if cached is None:
+            return None
+
+        profile = json.loads(cached.decode('utf-8'))
+        profile.update(private)
+
+        return profile
+
+    def set(self, public_id, profile):
+        public = dict(profile)
+        private = {
+            field: public.pop(field)
+            for field in PRIVATE_PROFILE_FIELDS
+            if field in public
+        }
+        self._private.set(public_id, private)
+
+        try:
+            self._client.setex(
+                self.KEY_PREFIX + public_id,
+                self.ttl,
+                json.dumps(public),
+            )
+        except Exception as e:
+            logging.error(
+                'Failed to write profile {0} to cache w/ exc {1}'.format(
+                    public_id,
+                    e,
+                )
+            )
+
+    def delete(self, public_id):
+        self._private.delete(public_id)
+
+        try:
+            self._client.delete(self.KEY_PREFIX + public_id)
+        except Exception as e:
+            logging.critical(
+                'Failed to invalidate cached profile {0} w/ exc {1}'.format(
+                    public_id,
+                    e,
+                )
+            )
+
+
+def get_profile_cache():
+    """
+    Retrieves the worker's profile cache, creating it from the app config on
+    first use. A Redis backend is used whenever `PROFILE_CACHE_URL` is set,
+    otherwise profiles are cached in-process.
+
+    :rtype: LocalProfileCache|RedisProfileCache
+    :return: The profile cache.
+    """
+    global _cache
+
+    if _cache is None:
+        ttl = current_app.config.get('PROFILE_CACHE_TTL', DEFAULT_PROFILE_TTL)
+        url = current_app.config.get('PROFILE_CACHE_URL')
+        max_size = current_app.config.get(
+            'PROFILE_CACHE_SIZE',
+            DEFAULT_PROFILE_CACHE_SIZE,
+        )
+
+        if url:
+            _cache = RedisProfileCache(url, ttl, max_size)
+        else:
+            _cache = LocalProfileCache(ttl, max_size)
+
+    return _cache
+
+
+def invalidate_profile(public_id):
+    """
+    Drops a user's cached profile. Call after anything which changes the
+    user or their submerchant.
+
+    :param str public_id: The user's public ID.
+    """
+    get_profile_cache().delete(str(public_id))
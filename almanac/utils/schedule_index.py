@@ -0,0 +1,207 @@
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from psycopg2.extras import DateTimeRange
+from sqlalchemy import event, func
+
+DEFAULT_INDEX_TTL = 30
+MAX_CACHED_INDEXES = 2048
+
+SCHEDULE_WRITE_EVENTS = ('after_insert', 'after_update', 'after_delete')
+
+# user public ID -> (built at (monotonic), IntervalIndex)
+_indexes = OrderedDict()
+_listening = False
+
+
+class IntervalIndex(object):
+    """
+    A static interval tree over a set of half-open `[lower, upper)` ranges.
+
+    The intervals are kept sorted by their lower bound and the tree is
+    implicit over that array (the middle element of every slice is the node),
+    with each node storing the greatest upper bound in its subtree. A running
+    maximum of the upper bounds lets `covers` answer in O(log n), while
+    `overlapping` walks only the subtrees which can still overlap, which is
+    O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        """
+        :param iterable intervals: `(lower, upper, key)` tuples. The key is
+        handed back from `overlapping` to identify the interval.
+        """
+        self._intervals = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self._lowers = [i[0] for i in self._intervals]
+
+        self._prefix_max = []
+        for lower, upper, key in self._intervals:
+            if not self._prefix_max or upper > self._prefix_max[-1]:
+                self._prefix_max.append(upper)
+            else:
+                self._prefix_max.append(self._prefix_max[-1])
+
+        self._subtree_max = [None] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def covers(self, start, end):
+        """
+        Checks if a single interval fully contains `[start, end)`.
+
+        :param datetime.datetime start: The start of the range.
+        :param datetime.datetime end: The end of the range.
+        :rtype: bool
+        :return: True if an interval contains the range.
+        """
+        idx = bisect_right(self._lowers, start)
+        return idx > 0 and self._prefix_max[idx - 1] >= end
+
+    def overlaps(self, start, end, *, exclude=None):
+        """
+        Checks if any interval overlaps `[start, end)`.
+
+        :param datetime.datetime start: The start of the range.
+        :param datetime.datetime end: The end of the range.
+        :param exclude: An interval key to ignore (an interval being edited).
+        :rtype: bool
+        :return: True if any interval other than `exclude` overlaps.
+        """
+        for key in self.overlapping(start, end):
+            if key != exclude:
+                return True
+
+        return False
+
+    def overlapping(self, start, end):
+        """
+        Yields the keys of every interval overlapping `[start, end)`.
+
+        :param datetime.datetime start: The start of the range.
+        :param datetime.datetime end: The end of the range.
+        :rtype: generator
+        :return: The keys of the overlapping intervals, ordered by lower bound.
+        """
+        return self._search(0, len(self._intervals), start, end)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+
+        mid = (lo + hi) // 2
+        highest = self._intervals[mid][1]
+
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > highest:
+                highest = child
+
+        self._subtree_max[mid] = highest
+        return highest
+
+    def _search(self, lo, hi, start, end):
+        if lo >= hi:
+            return
+
+        mid = (lo + hi) // 2
+        if self._subtree_max[mid] <= start:
+            return
+
+        yield from self._search(lo, mid, start, end)
+
+        lower, upper, key = self._intervals[mid]
+        if lower >= end:
+            return
+
+        if upper > start:
+            yield key
+
+        yield from self._search(mid + 1, hi, start, end)
+
+
+def get_schedule_index(user_id):
+    """
+    Retrieves the availability index for a user, building it from the
+    user's schedules if it isn't cached or has outlived its TTL.
+
+    :param str user_id: The user to retrieve the index for.
+    :rtype: IntervalIndex
+    :return: The index of the user's schedules keyed by schedule public ID.
+    """
+    # Imported here: the models import the DAOs, which import this module.
+    from almanac.models import db
+    from almanac.models import ScheduleTable as Schedule
+
+    _listen_for_schedule_writes(Schedule)
+
+    user_id = str(user_id)
+    ttl = current_app.config.get('SCHEDULE_INDEX_TTL', DEFAULT_INDEX_TTL)
+
+    cached = _indexes.get(user_id)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        _indexes.move_to_end(user_id)
+        return cached[1]
+
+    # Only bookings in the future are checked against the index, so
+    # schedules which have already closed are left out. Filtering on the
+    # range (rather than its bounds) lets the (user_id, utc_duration) GiST
+    # index answer this.
+    rows = db.session.query(
+        func.lower(Schedule.utc_duration),
+        func.upper(Schedule.utc_duration),
+        Schedule.public_id,
+    ).filter(
+        Schedule.user_id == user_id,
+        Schedule.utc_duration.op('&&')(
+            DateTimeRange(datetime.utcnow(), None)
+        ),
+    ).all()
+
+    index = IntervalIndex(rows)
+
+    _indexes[user_id] = (time.monotonic(), index)
+    _indexes.move_to_end(user_id)
+    while len(_indexes) > MAX_CACHED_INDEXES:
+        _indexes.popitem(last=False)
+
+    return index
+
+
+def invalidate_schedule_index(user_id):
+    """
+    Drops the cached availability index for a user.
+
+    :param str user_id: The user whose schedules changed.
+    """
+    _indexes.pop(str(user_id), None)
+
+
+def _listen_for_schedule_writes(schedule_table):
+    """
+    Registers `_invalidate_on_flush` on the schedule mapper. Done on the
+    first index build rather than at import, since nothing is cached (or
+    needs invalidating) before then.
+
+    :param type schedule_table: `ScheduleTable`.
+    """
+    global _listening
+
+    if _listening:
+        return
+
+    for identifier in SCHEDULE_WRITE_EVENTS:
+        if not event.contains(schedule_table, identifier, _invalidate_on_flush):
+            event.listen(schedule_table, identifier, _invalidate_on_flush)
+
+    _listening = True
+
+
+def _invalidate_on_flush(mapper, connection, target):
+    # Catches schedules written through the session directly. Bulk
+    # `Query.update`/`Query.delete` calls bypass these, so the DAO
+    # invalidates explicitly for those.
+    invalidate_schedule_index(target.user_id)
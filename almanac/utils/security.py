@@ -1,42 +1,227 @@
 from flask import g
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
+from threading import Lock
 
+import hashlib
 import jwt
 import logging
+import time
 
-from almanac.DAOs.user_dao import UserDAO
 from almanac.exc.exceptions import SecurityException
+from almanac.utils.user_loader import get_user_loader
 
+DEFAULT_TOKEN_CACHE_SIZE = 10000
 
-def create_token(user_id, app_config):
-    return jwt.encode({
+# Bumped whenever the user claims written by `build_user_claims` change.
+# Tokens from older versions have their claims filled in from the DB by
+# `get_user_claims` until they expire.
+TOKEN_CLAIMS_VERSION = 2
+
+SUBMERCHANT_NONE = 'none'
+SUBMERCHANT_PENDING = 'pending'
+SUBMERCHANT_APPROVED = 'approved'
+SUBMERCHANT_REJECTED = 'rejected'
+
+# sha256(token) -> (expires at (unix time), verified claims)
+_verified_tokens = OrderedDict()
+_verified_tokens_lock = Lock()
+
+
+def create_token(user_id, app_config, user_claims=None):
+    """
+    Issues a JWT for a user.
+
+    :param str user_id: The user's public ID.
+    :param dict app_config: The app config holding `JWT_KEY` and
+    `JWT_EXPIRATION`.
+    :param dict user_claims: Claims from `build_user_claims` to embed.
+    :rtype: bytes
+    :return: The encoded JWT.
+    """
+    claims = {
         'user_id': user_id,
         'issuance': str(datetime.utcnow()),
         'expiration': str(datetime.utcnow() + timedelta(
             minutes=int(app_config['JWT_EXPIRATION'])
-        ))},
-        app_config['JWT_KEY']
+        )),
+    }
+
+    if user_claims is not None:
+        claims.update(user_claims)
+        claims['version'] = TOKEN_CLAIMS_VERSION
+
+    return jwt.encode(claims, app_config['JWT_KEY'])
+
+
+def build_user_claims(user):
+    """
+    Builds the identity claims embedded in a user's JWT, so requests can
+    read them off `g.user_info` instead of loading the user.
+
+    :param UserTable user: The user, with its submerchant attached (see
+    `UserFacade.get_user_by_id`).
+    :rtype: dict
+    :return: The user's claims.
+    """
+    if getattr(user, 'is_approved', None) is None:
+        submerchant_status = SUBMERCHANT_NONE
+    elif user.is_approved:
+        submerchant_status = SUBMERCHANT_APPROVED
+    elif user.is_rejected:
+        submerchant_status = SUBMERCHANT_REJECTED
+    else:
+        submerchant_status = SUBMERCHANT_PENDING
+
+    return {
+        'email': user.email,
+        'username': user.username,
+        'local_tz': user.local_tz,
+        'is_premium': bool(user.is_premium),
+        'submerchant_status': submerchant_status,
+    }
+
+
+def get_user_claims():
+    """
+    Retrieves the requesting user's claims. Tokens issued before the current
+    `TOKEN_CLAIMS_VERSION` are topped up from the DB, once per request.
+
+    :rtype: dict
+    :return: `g.user_info`, holding every claim from `build_user_claims`.
+    """
+    if g.user_info.get('version') != TOKEN_CLAIMS_VERSION:
+        # Imported here, the facades pull in most of the app.
+        from almanac.facades.user_facade import UserFacade
+
+        user = UserFacade().get_user_by_id(g.user_info['user_id'])
+
+        g.user_info.update(build_user_claims(user))
+        g.user_info['version'] = TOKEN_CLAIMS_VERSION
+
+    return g.user_info
+
+
+def decode_token(token, app_config):
+    """
+    Verifies a JWT and returns its claims. Verified tokens are remembered
+    until they expire so repeat requests with the same token skip the
+    signature check.
+
+    :param str token: The encoded JWT.
+    :param dict app_config: The app config holding `JWT_KEY`.
+    :raises: jwt.InvalidTokenError
+    :rtype: dict
+    :return: The token's claims.
+    """
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+
+    digest = hashlib.sha256(token).digest()
+
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(digest)
+        if cached is not None:
+            if cached[0] > time.time():
+                _verified_tokens.move_to_end(digest)
+                return dict(cached[1])
+
+            del _verified_tokens[digest]
+
+    claims = jwt.decode(token, app_config['JWT_KEY'])
+
+    expires_at = _get_token_expiration(claims)
+    if expires_at is not None and expires_at > time.time():
+        max_size = app_config.get('JWT_CACHE_SIZE', DEFAULT_TOKEN_CACHE_SIZE)
+
+        with _verified_tokens_lock:
+            _verified_tokens[digest] = (expires_at, claims)
+            _verified_tokens.move_to_end(digest)
+
+            while len(_verified_tokens) > max_size:
+                _verified_tokens.popitem(last=False)
+
+    return dict(claims)
+
+
+def _get_token_expiration(claims):
+    """
+    Finds when a token expires, from either the registered `exp` claim or
+    the `expiration` claim written by `create_token`.
+
+    :param dict claims: The token's claims.
+    :rtype: float
+    :return: The expiration as a unix timestamp or None.
+    """
+    if 'exp' in claims:
+        return float(claims['exp'])
+
+    for time_format in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+        try:
+            expiration = datetime.strptime(claims['expiration'], time_format)
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        return (expiration - datetime(1970, 1, 1)).total_seconds()
+
+    return None
+
+
+def public_endpoint(_app, endpoint, methods=None):
+    """
+    Exempts an endpoint from JWT authentication. Call from `export_routes`
+    after registering the route.
+
+    :param flask.Flask _app: The app the endpoint is registered on.
+    :param str endpoint: The endpoint name given to `as_view`.
+    :param list[str] methods: Only exempt these HTTP methods. Every method
+    is exempt if omitted.
+    """
+    _app.config.setdefault('PUBLIC_ENDPOINTS', {})[endpoint] = (
+        frozenset(methods) if methods else None
     )
 
 
+def is_public_endpoint(app_config, endpoint, method):
+    """
+    Checks if a request to `endpoint` with `method` skips authentication.
+
+    :param dict app_config: The app config holding `PUBLIC_ENDPOINTS`.
+    :param str endpoint: The matched endpoint (None if nothing matched).
+    :param str method: The HTTP method.
+    :rtype: bool
+    :return: True if no JWT is required.
+    """
+    public = app_config.get('PUBLIC_ENDPOINTS', {})
+
+    if endpoint not in public:
+        return False
+
+    methods = public[endpoint]
+    return methods is None or method in methods
+
+
 def authentication_required(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
         if kwargs.get('user_id', False):
             return __authorize_uri(f, args, kwargs)
         if kwargs.get('email', False):
-            user = UserDAO().get_by_email(kwargs['email'])
-            return __authorize_uri(f, args, kwargs, user_id=user.public_id)
+            # Never authorize on the token's email claim: it's only as fresh
+            # as the token, and the address may since belong to someone
+            # else. The owner is loaded once per request either way.
+            user = get_user_loader().load_by_email(kwargs['email'])
+            user_id = str(user.public_id) if user is not None else None
+            return __authorize_uri(f, args, kwargs, user_id=user_id)
     return wrapper
 
 
 def __authorize_uri(f, args, kwargs, *, user_id=None):
-    if user_id is not None:
-        if user_id == g.user_info['user_id']:
-            return f(*args, **kwargs)
+    if user_id is None:
+        user_id = kwargs.get('user_id')
 
-    if kwargs.get('user_id') == g.user_info['user_id']:
+    if user_id is not None and user_id == g.user_info['user_id']:
         return f(*args, **kwargs)
     else:
         logging.error(
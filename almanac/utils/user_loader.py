@@ -0,0 +1,136 @@
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from almanac.models import db
+from almanac.models import UserTable as User
+
+
+class UserLoader(object):
+    """
+    Request-scoped identity map for `UserTable` rows keyed on `public_id`.
+
+    Ids can be primed ahead of time so that the next load fetches every
+    outstanding id in a single `IN` query. Rows are cached for the rest of
+    the request; misses aren't cached so users created mid-request are still
+    found once flushed.
+    """
+
+    def __init__(self):
+        self._by_public_id = {}
+        self._by_email = {}
+        self._pending = set()
+
+    def prime(self, *public_ids):
+        """
+        Queues users to be fetched alongside the next load.
+
+        :param str public_ids: The users' public IDs.
+        """
+        for public_id in public_ids:
+            public_id = str(public_id)
+            if public_id not in self._by_public_id:
+                self._pending.add(public_id)
+
+    def load(self, public_id):
+        """
+        Retrieves a user by public ID, fetching it along with any primed ids
+        if it isn't cached yet.
+
+        :param str public_id: The user's public ID.
+        :rtype: UserTable
+        :return: The user or None.
+        """
+        public_id = str(public_id)
+
+        if public_id not in self._by_public_id:
+            self._pending.add(public_id)
+            self._fetch_pending()
+
+        return self._by_public_id.get(public_id)
+
+    def load_many(self, public_ids):
+        """
+        Retrieves several users by public ID in (at most) one query.
+
+        :param list[str] public_ids: The users' public IDs.
+        :rtype: list[UserTable]
+        :return: The users (or None), in the order requested.
+        """
+        self.prime(*public_ids)
+        self._fetch_pending()
+
+        return [self._by_public_id.get(str(p)) for p in public_ids]
+
+    def load_by_email(self, email):
+        """
+        Retrieves a user by email.
+
+        :param str email: The user's email.
+        :rtype: UserTable
+        :return: The user or None.
+        """
+        found_user = self._by_email.get(email)
+
+        if found_user is not None and found_user.email == email:
+            return found_user
+
+        found_user = db.session.query(
+            User
+        ).filter_by(email=email).first()
+
+        if found_user is not None:
+            self._remember(found_user)
+
+        return found_user
+
+    def clear(self):
+        """
+        Forgets every cached user.
+        """
+        self._by_public_id.clear()
+        self._by_email.clear()
+        self._pending.clear()
+
+    def _fetch_pending(self):
+        pending = self._pending - set(self._by_public_id)
+        self._pending = set()
+
+        if not pending:
+            return
+
+        for found_user in db.session.query(
+            User
+        ).filter(
+            User.public_id.in_(pending)
+        ).all():
+            self._remember(found_user)
+
+    def _remember(self, found_user):
+        self._by_public_id[found_user.public_id] = found_user
+        self._by_email[found_user.email] = found_user
+
+
+def get_user_loader():
+    """
+    Retrieves the loader for the current request. Outside of an app context
+    a throwaway loader is returned.
+
+    :rtype: UserLoader
+    :return: The request's user loader.
+    """
+    if not has_app_context():
+        return UserLoader()
+
+    loader = getattr(g, '_user_loader', None)
+    if loader is None:
+        loader = g._user_loader = UserLoader()
+
+    return loader
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    # Rolled back users may have been expunged from the session.
+    if has_app_context() and getattr(g, '_user_loader', None) is not None:
+        g._user_loader.clear()
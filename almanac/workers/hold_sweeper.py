@@ -0,0 +1,159 @@
+"""
+Clears expired rows out of `event_holds` and `idempotency_keys`.
+
+Run it next to the API (one copy is plenty) with:
+
+    python -m almanac.workers.hold_sweeper
+
+Bookings already clear their provider's expired holds before placing new
+ones, so the sweeper only keeps holds abandoned by crashed or timed out
+requests from piling up. Expired idempotency keys are likewise only taken
+over lazily by a retry reusing them. Rows are deleted in small batches with
+`FOR UPDATE SKIP LOCKED`, so a booking confirming its hold is never waited on.
+"""
+import logging
+import signal
+import threading
+from os import environ
+
+import psycopg2
+
+SWEPT_TABLES = ('event_holds', 'idempotency_keys')
+
+DELETE_EXPIRED = """
+    DELETE FROM {table}
+    WHERE id IN (
+        SELECT id
+        FROM {table}
+        WHERE expires_at <= (now() at time zone 'utc')
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+
+class HoldStore(object):
+    """
+    The sweeper's (blocking) view of the `SWEPT_TABLES`.
+    """
+
+    def __init__(self, dsn):
+        """
+        :param str dsn: The postgres DSN/URL.
+        """
+        self.dsn = dsn
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.dsn)
+
+        return self._conn
+
+    def delete_expired(self, table, limit):
+        """
+        Deletes up to `limit` expired rows in its own transaction.
+
+        :param str table: One of the `SWEPT_TABLES`.
+        :param int limit: The most rows to delete.
+        :rtype: int
+        :return: The number of rows deleted.
+        """
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute(
+                DELETE_EXPIRED.format(table=table),
+                {'limit': limit},
+            )
+
+            return cur.rowcount
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+class HoldSweeper(object):
+    """
+    Deletes expired rows every `interval` seconds.
+    """
+
+    def __init__(self, store, *, batch_size=500, interval=60):
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self._stopping = threading.Event()
+
+    def run(self):
+        """
+        Sweeps until `stop` is called.
+        """
+        try:
+            while not self._stopping.is_set():
+                try:
+                    self.sweep_once()
+                except psycopg2.Error as e:
+                    logging.error(
+                        'Failed to sweep expired rows w/ exc {0}'.format(e)
+                    )
+
+                self._stopping.wait(self.interval)
+        finally:
+            self.store.close()
+
+    def stop(self):
+        self._stopping.set()
+
+    def sweep_once(self):
+        """
+        Deletes every expired row, a batch at a time.
+
+        :rtype: int
+        :return: The number of rows deleted.
+        """
+        swept = 0
+
+        for table in SWEPT_TABLES:
+            swept += self._sweep_table(table)
+
+        return swept
+
+    def _sweep_table(self, table):
+        swept = 0
+
+        while not self._stopping.is_set():
+            deleted = self.store.delete_expired(table, self.batch_size)
+            swept += deleted
+
+            if deleted < self.batch_size:
+                break
+
+        if swept:
+            logging.info('Swept {0} expired rows from {1}.'.format(
+                swept,
+                table,
+            ))
+
+        return swept
+
+
+def main():
+    logging.basicConfig(
+        level=environ.get('KRONIKL_HOLD_SWEEP_LOG_LEVEL', 'INFO').upper()
+    )
+
+    sweeper = HoldSweeper(
+        HoldStore(environ['KRONIKL_POSTGRES_FQDN']),
+        batch_size=int(environ.get('KRONIKL_HOLD_SWEEP_BATCH_SIZE', 500)),
+        interval=int(environ.get('KRONIKL_HOLD_SWEEP_INTERVAL', 60)),
+    )
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: sweeper.stop())
+
+    sweeper.run()
+
+
+if __name__ == '__main__':
+    main()
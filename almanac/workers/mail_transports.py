@@ -0,0 +1,87 @@
+import asyncio
+import importlib
+import logging
+import smtplib
+from email.mime.text import MIMEText
+from os import environ
+
+
+class LoggingTransport(object):
+    """
+    Logs mail rather than sending it. Used when no transport is configured
+    so that local development never mails anyone.
+    """
+
+    async def send(self, mail):
+        logging.info('Would have mailed {0}'.format(mail))
+
+
+class SMTPTransport(object):
+    """
+    Sends mail through an SMTP relay. `smtplib` blocks, so every send runs
+    on the loop's default executor.
+    """
+
+    def __init__(self, host, port=587, username=None, password=None,
+                 use_tls=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_environ(cls):
+        return cls(
+            environ['KRONIKL_SMTP_HOST'],
+            int(environ.get('KRONIKL_SMTP_PORT', 587)),
+            environ.get('KRONIKL_SMTP_USERNAME'),
+            environ.get('KRONIKL_SMTP_PASSWORD'),
+            environ.get('KRONIKL_SMTP_TLS', 'true').lower() == 'true',
+            int(environ.get('KRONIKL_SMTP_TIMEOUT', 30)),
+        )
+
+    async def send(self, mail):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._send, mail)
+
+    def _send(self, mail):
+        message = MIMEText(mail.body, 'html')
+        message['Subject'] = mail.subject
+        message['From'] = mail.email_from
+        message['To'] = mail.email_to
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+
+            smtp.send_message(message)
+
+
+TRANSPORTS = {
+    'log': LoggingTransport,
+    'smtp': SMTPTransport.from_environ,
+}
+
+
+def load_transport(name):
+    """
+    Builds a transport from its name. Besides the built-in `log` and `smtp`
+    transports, any `package.module:Factory` path can be given. A transport
+    is anything with a `send(mail)` coroutine which raises on failure.
+
+    :param str name: The transport's name or import path.
+    :rtype: object
+    :return: The transport.
+    """
+    if name in TRANSPORTS:
+        return TRANSPORTS[name]()
+
+    module_name, _, factory_name = name.partition(':')
+    if not factory_name:
+        raise ValueError('Unknown mail transport {0}'.format(name))
+
+    return getattr(importlib.import_module(module_name), factory_name)()
@@ -0,0 +1,315 @@
+"""
+Drains `email_queue` and hands each mail to a transport.
+
+Run it next to the API (as many copies as you like) with:
+
+    python -m almanac.workers.mail_worker
+
+Rows are claimed with `FOR UPDATE SKIP LOCKED`, so concurrent workers never
+pick up the same mail. The worker sleeps on the `new_mail` channel published
+by the `notify_mail_insert` trigger and only polls as a fallback for retries
+and missed notifications.
+"""
+import asyncio
+import logging
+import signal
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from os import environ
+
+import psycopg2
+import psycopg2.extensions
+
+from almanac.models.email_queue_table import STATUS_FAILED
+from almanac.models.email_queue_table import STATUS_PENDING
+from almanac.models.email_queue_table import STATUS_SENDING
+from almanac.models.email_queue_table import STATUS_SENT
+from almanac.workers.mail_transports import load_transport
+
+CHANNEL = 'new_mail'
+
+QueuedMail = namedtuple(
+    'QueuedMail',
+    ['id', 'email_to', 'email_from', 'subject', 'body', 'attempts'],
+)
+
+CLAIM_BATCH = """
+    WITH batch AS (
+        SELECT id
+        FROM email_queue
+        WHERE (status = %(pending)s AND next_attempt_at <= %(now)s)
+           OR (status = %(sending)s AND locked_at <= %(stale)s)
+        ORDER BY id
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE email_queue AS queue
+    SET status = %(sending)s,
+        attempts = queue.attempts + 1,
+        locked_at = %(now)s
+    FROM batch
+    WHERE queue.id = batch.id
+    RETURNING queue.id, queue.email_to, queue.email_from, queue.subject,
+              queue.body, queue.attempts
+"""
+
+MARK_SENT = """
+    UPDATE email_queue
+    SET status = %s, sent_at = (now() at time zone 'utc'), locked_at = NULL,
+        last_error = NULL
+    WHERE id = %s
+"""
+
+MARK_FAILED = """
+    UPDATE email_queue
+    SET status = %s,
+        next_attempt_at = (now() at time zone 'utc') + %s * interval '1 second',
+        locked_at = NULL,
+        last_error = %s
+    WHERE id = %s
+"""
+
+
+class MailQueueStore(object):
+    """
+    The worker's (blocking) view of `email_queue`. Every method runs in its
+    own short transaction so claimed rows are never held locked while mail
+    is being sent.
+    """
+
+    def __init__(self, dsn, lease=300):
+        """
+        :param str dsn: The postgres DSN/URL.
+        :param int lease: Seconds after which a mail stuck in `sending` (its
+        worker died mid-send) is handed out again.
+        """
+        self.dsn = dsn
+        self.lease = lease
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.dsn)
+
+        return self._conn
+
+    def claim_batch(self, limit):
+        """
+        Claims up to `limit` due mails, marking them as `sending`.
+
+        :param int limit: The most mails to claim.
+        :rtype: list[QueuedMail]
+        :return: The claimed mails.
+        """
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute("SELECT (now() at time zone 'utc')")
+            now = cur.fetchone()[0]
+
+            cur.execute(
+                CLAIM_BATCH,
+                {
+                    'pending': STATUS_PENDING,
+                    'sending': STATUS_SENDING,
+                    'now': now,
+                    'stale': now - timedelta(seconds=self.lease),
+                    'limit': limit,
+                }
+            )
+
+            return sorted(QueuedMail(*row) for row in cur.fetchall())
+
+    def mark_sent(self, mail_id):
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute(MARK_SENT, (STATUS_SENT, mail_id))
+
+    def mark_failed(self, mail_id, error, retry_in=None):
+        """
+        Records a failed send, scheduling a retry unless `retry_in` is None.
+
+        :param int mail_id: The mail's ID.
+        :param str error: Why the send failed.
+        :param int retry_in: Seconds until the next attempt.
+        """
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute(
+                MARK_FAILED,
+                (
+                    STATUS_PENDING if retry_in is not None else STATUS_FAILED,
+                    retry_in or 0,
+                    error,
+                    mail_id,
+                )
+            )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+class MailWorker(object):
+    """
+    Sends queued mail through a transport, at most `concurrency` at a time.
+    """
+
+    def __init__(self, store, transport, *, batch_size=50, concurrency=10,
+                 max_attempts=5, retry_backoff=30, poll_interval=30):
+        self.store = store
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        # psycopg2 connections mustn't be shared between threads, so every
+        # query goes through the same single thread.
+        self._db = ThreadPoolExecutor(max_workers=1)
+
+    async def run(self, listen_dsn=None):
+        """
+        Drains the queue until `stop` is called, sleeping on `new_mail`
+        between batches.
+
+        :param str listen_dsn: The DSN to LISTEN with, if any. Without one
+        the worker just polls every `poll_interval` seconds.
+        """
+        listener = self._listen(listen_dsn) if listen_dsn else None
+
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+
+                while not self._stopping and await self.drain_once():
+                    pass
+
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        self.poll_interval,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if listener is not None:
+                asyncio.get_event_loop().remove_reader(listener.fileno())
+                listener.close()
+
+            await self._call_db(self.store.close)
+            self._db.shutdown()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    async def drain_once(self):
+        """
+        Claims and sends a single batch.
+
+        :rtype: int
+        :return: The number of mails claimed.
+        """
+        batch = await self._call_db(self.store.claim_batch, self.batch_size)
+
+        if batch:
+            await asyncio.gather(*[self._deliver(mail) for mail in batch])
+
+        return len(batch)
+
+    def retry_delay(self, attempts):
+        """
+        The delay before retrying a mail which has failed `attempts` times,
+        or None if it has run out of attempts.
+
+        :param int attempts: The number of attempts made so far.
+        :rtype: int
+        :return: Seconds until the next attempt or None.
+        """
+        if attempts >= self.max_attempts:
+            return None
+
+        return self.retry_backoff * 2 ** (attempts - 1)
+
+    async def _deliver(self, mail):
+        async with self._semaphore:
+            try:
+                await self.transport.send(mail)
+            except Exception as e:
+                logging.error(
+                    'Failed to send mail {0} (attempt {1}) w/ exc {2}'.format(
+                        mail.id,
+                        mail.attempts,
+                        e,
+                    )
+                )
+                await self._call_db(
+                    self.store.mark_failed,
+                    mail.id,
+                    str(e),
+                    self.retry_delay(mail.attempts),
+                )
+                return
+
+        await self._call_db(self.store.mark_sent, mail.id)
+
+    def _listen(self, dsn):
+        conn = psycopg2.connect(dsn)
+        conn.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+
+        with conn.cursor() as cur:
+            cur.execute('LISTEN {0}'.format(CHANNEL))
+
+        def on_notify():
+            conn.poll()
+            if conn.notifies:
+                del conn.notifies[:]
+                self._wakeup.set()
+
+        asyncio.get_event_loop().add_reader(conn.fileno(), on_notify)
+
+        return conn
+
+    async def _call_db(self, fn, *args):
+        return await asyncio.get_event_loop().run_in_executor(
+            self._db,
+            fn,
+            *args
+        )
+
+
+def main():
+    logging.basicConfig(
+        level=environ.get('KRONIKL_MAIL_LOG_LEVEL', 'INFO').upper()
+    )
+
+    dsn = environ['KRONIKL_POSTGRES_FQDN']
+
+    worker = MailWorker(
+        MailQueueStore(dsn, int(environ.get('KRONIKL_MAIL_LEASE', 300))),
+        load_transport(environ.get('KRONIKL_MAIL_TRANSPORT', 'log')),
+        batch_size=int(environ.get('KRONIKL_MAIL_BATCH_SIZE', 50)),
+        concurrency=int(environ.get('KRONIKL_MAIL_CONCURRENCY', 10)),
+        max_attempts=int(environ.get('KRONIKL_MAIL_MAX_ATTEMPTS', 5)),
+        retry_backoff=int(environ.get('KRONIKL_MAIL_RETRY_BACKOFF', 30)),
+        poll_interval=int(environ.get('KRONIKL_MAIL_POLL_INTERVAL', 30)),
+    )
+
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    # LISTEN is session state, so it needs a direct connection to postgres
+    # even when KRONIKL_POSTGRES_FQDN goes through PgBouncer.
+    loop.run_until_complete(
+        worker.run(environ.get('KRONIKL_MAIL_LISTEN_FQDN', dsn))
+    )
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
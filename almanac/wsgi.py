@@ -1,3 +1,7 @@
-from almanac.almanac import create_app
+from almanac.almanac import get_app
+from almanac.utils.preload import warm_up
 
-app = create_app("test")
+app = get_app()
+
+if app.config['PRELOAD_WARM_UP']:
+    warm_up(app)
@@ -0,0 +1,91 @@
+"""
+Reports password check (login) latency percentiles as concurrency rises,
+for bcrypt run inline on request threads versus on the process pool.
+
+    python -m benchmarks.bench_login [logins per level]
+"""
+import logging
+import sys
+import threading
+import time
+
+from almanac.exc.exceptions import PasswordHashingException
+from almanac.utils.password_hasher import InlineHasher, ProcessPoolHasher
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_level(hasher, hashed, concurrency, logins):
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    per_thread = max(1, logins // concurrency)
+
+    def login():
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            try:
+                hasher.check(b'testpw', hashed)
+            except PasswordHashingException:
+                with lock:
+                    rejected[0] += 1
+                continue
+
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=login) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies, rejected[0]
+
+
+def main(logins=64):
+    # Saturation is expected at high concurrency; count it, don't log it.
+    logging.disable(logging.ERROR)
+
+    hashed = InlineHasher().hash(b'testpw')
+
+    hashers = [
+        ('inline', InlineHasher()),
+        ('process', ProcessPoolHasher()),
+    ]
+
+    print('{0:>8} {1:>6} {2:>10} {3:>10} {4:>9}'.format(
+        'hasher', 'conc', 'p50 (ms)', 'p99 (ms)', 'rejected',
+    ))
+
+    for name, hasher in hashers:
+        # Warm the pool up so process start up isn't measured.
+        hasher.check(b'testpw', hashed)
+
+        for concurrency in CONCURRENCY_LEVELS:
+            latencies, rejected = run_level(
+                hasher,
+                hashed,
+                concurrency,
+                logins,
+            )
+
+            print('{0:>8} {1:>6} {2:>10.1f} {3:>10.1f} {4:>9}'.format(
+                name,
+                concurrency,
+                percentile(latencies, 50) * 1000 if latencies else 0,
+                percentile(latencies, 99) * 1000 if latencies else 0,
+                rejected,
+            ))
+
+        if isinstance(hasher, ProcessPoolHasher):
+            hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,78 @@
+"""
+Compares marshmallow's `EventMarshal(many=True).dump` with the compiled
+`event_marshal.dump_many` on a 1k event list.
+
+    python -m benchmarks.bench_serializers [rows] [repeats]
+"""
+import decimal
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytz
+
+from almanac.schemas.fast_serializers import event_marshal
+from almanac.schemas.return_schemas import EventMarshal
+
+
+def build_events(count):
+    central = pytz.timezone('US/Central')
+    eastern = pytz.timezone('US/Eastern')
+    start = pytz.utc.localize(datetime(2017, 6, 1, 9))
+
+    events = []
+    for i in range(count):
+        utc_start = start + timedelta(hours=i)
+        utc_end = utc_start + timedelta(minutes=30)
+
+        events.append(SimpleNamespace(
+            public_id=str(uuid.uuid4()),
+            scheduling_user_id=str(uuid.uuid4()),
+            scheduled_user_id=str(uuid.uuid4()),
+            utc_start=utc_start,
+            utc_end=utc_end,
+            scheduled_tz_start=utc_start.astimezone(central),
+            scheduled_tz_end=utc_end.astimezone(central),
+            scheduling_tz_start=utc_start.astimezone(eastern),
+            scheduling_tz_end=utc_end.astimezone(eastern),
+            day_number=utc_start.day,
+            duration=30,
+            total_price=decimal.Decimal('15.00') if i % 4 else None,
+            notes='Bring the paperwork.' if i % 3 else '',
+        ))
+
+    return events
+
+
+def main(rows=1000, repeats=20):
+    events = build_events(rows)
+
+    expected = json.dumps(
+        EventMarshal(many=True).dump(events).data,
+        sort_keys=True,
+    )
+    actual = json.dumps(event_marshal.dump_many(events), sort_keys=True)
+    assert expected == actual, 'Compiled output differs from marshmallow.'
+
+    schema_time = min(timeit.repeat(
+        lambda: EventMarshal(many=True).dump(events),
+        number=1,
+        repeat=repeats,
+    ))
+    compiled_time = min(timeit.repeat(
+        lambda: event_marshal.dump_many(events),
+        number=1,
+        repeat=repeats,
+    ))
+
+    print('{0} events, best of {1}'.format(rows, repeats))
+    print('  marshmallow: {0:8.2f} ms'.format(schema_time * 1000))
+    print('  compiled:    {0:8.2f} ms'.format(compiled_time * 1000))
+    print('  speedup:     {0:8.1f}x'.format(schema_time / compiled_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,213 @@
+"""
+Reports how long a worker takes to boot (importing the app module, building
+the app, warming it up), how its first request compares with later ones,
+what loading the Braintree SDK (deferred until a payment needs it) would add
+to that, and how much memory each worker holds with and without gunicorn's
+`--preload`. Every measurement runs in a fresh interpreter.
+
+    python -m benchmarks.bench_startup [workers]
+
+Memory is read from /proc, so per-worker numbers are only reported on Linux.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# create_app reads these; the DB is never connected to.
+BENCH_ENVIRON = {
+    'KRONIKL_JWT_KEY': 'benchsecretkey',
+    'KRONIKL_JWT_EXPIRATION': '15',
+    'KRONIKL_POSTGRES_FQDN': 'postgresql://localhost/bench',
+}
+
+
+def memory_kb():
+    """
+    :rtype: tuple
+    :return: This process' (RSS, private) memory in KB, or Nones off Linux.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            fields = dict(
+                (line.split(':')[0], int(line.split()[1]))
+                for line in smaps
+                if line.split()[-1:] == ['kB']
+            )
+    except (IOError, OSError):
+        return None, None
+
+    return (
+        fields['Rss'],
+        fields['Private_Clean'] + fields['Private_Dirty'],
+    )
+
+
+def boot(warm=True):
+    started = time.perf_counter()
+    import almanac.almanac
+    from almanac.utils.preload import warm_up
+    imported = time.perf_counter()
+    app = almanac.almanac.get_app()
+    built = time.perf_counter()
+    if warm:
+        warm_up(app)
+    warmed = time.perf_counter()
+
+    rss, private = memory_kb()
+
+    return {
+        'import_ms': (imported - started) * 1000,
+        'build_ms': (built - imported) * 1000,
+        'warm_up_ms': (warmed - built) * 1000,
+        'rss_kb': rss,
+        'private_kb': private,
+    }
+
+
+def first_request(warm):
+    """
+    Times a worker's first request against the median of the next 20. The
+    request is rejected by argument parsing, so it never needs the DB.
+    """
+    booted = boot(warm)
+
+    from almanac.almanac import get_app
+    client = get_app().test_client()
+
+    timings = []
+    for _ in range(21):
+        started = time.perf_counter()
+        client.post(
+            '/authentication/login',
+            content_type='application/json',
+            data='{}',
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+
+    booted['first_ms'] = timings[0]
+    booted['steady_ms'] = statistics.median(timings[1:])
+
+    # What a worker saves by never touching the payment endpoints.
+    booted['sdk_loaded'] = 'braintree' in sys.modules
+    rss_before, _ = memory_kb()
+    started = time.perf_counter()
+    import braintree
+    booted['sdk_import_ms'] = (time.perf_counter() - started) * 1000
+    rss_after, _ = memory_kb()
+    booted['sdk_rss_kb'] = (
+        rss_after - rss_before if rss_after is not None else None
+    )
+
+    return booted
+
+
+def preload(workers):
+    """
+    Boots like gunicorn's master does with `--preload`, then forks `workers`
+    children and reports each one's memory once it has served the app.
+    """
+    master = boot()
+
+    children = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read_fd)
+            from almanac.almanac import get_app
+            get_app()
+
+            rss, private = memory_kb()
+            os.write(write_fd, json.dumps([rss, private]).encode('utf-8'))
+            os._exit(0)
+
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    memory = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as pipe:
+            memory.append(json.loads(pipe.read()))
+        os.waitpid(pid, 0)
+
+    master['workers'] = memory
+    return master
+
+
+def run(mode, *args):
+    environ = dict(os.environ)
+    for key, value in BENCH_ENVIRON.items():
+        environ.setdefault(key, value)
+
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_startup', mode] +
+        [str(arg) for arg in args],
+        env=environ,
+    )
+
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+
+def main(workers=4):
+    cold = run('--first-request', 'cold')
+    warm = run('--first-request', 'warm')
+
+    print('Worker boot')
+    print('  import almanac.almanac: {0:8.1f} ms'.format(cold['import_ms']))
+    print('  get_app():              {0:8.1f} ms'.format(cold['build_ms']))
+    print('  warm_up():              {0:8.1f} ms'.format(warm['warm_up_ms']))
+    if warm['rss_kb'] is not None:
+        print('  RSS:                    {0:8.1f} MB'.format(
+            warm['rss_kb'] / 1024
+        ))
+
+    print()
+    print('Braintree SDK')
+    print('  loaded by boot + first requests: {0}'.format(
+        'yes' if cold['sdk_loaded'] else 'no'
+    ))
+    print('  import on first payment:         {0:8.1f} ms'.format(
+        cold['sdk_import_ms']
+    ))
+    if cold['sdk_rss_kb'] is not None:
+        print('  RSS on first payment:            {0:8.1f} MB'.format(
+            cold['sdk_rss_kb'] / 1024
+        ))
+
+    print()
+    print('First request / steady state median')
+    for name, booted in (('cold', cold), ('warmed up', warm)):
+        print('  {0:<10} {1:8.2f} ms / {2:6.2f} ms'.format(
+            name,
+            booted['first_ms'],
+            booted['steady_ms'],
+        ))
+
+    preloaded = run('--preload', workers)
+    if preloaded['rss_kb'] is None:
+        return
+
+    # Without --preload every worker boots like the runs above, and none of
+    # that memory is shared.
+    print()
+    print('{0} workers'.format(workers))
+    print('  without --preload: {0:8.1f} MB private per worker'.format(
+        warm['private_kb'] / 1024
+    ))
+    print('  with --preload:    {0:8.1f} MB private per worker'.format(
+        sum(private for _, private in preloaded['workers']) /
+        len(preloaded['workers']) / 1024
+    ))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--first-request']:
+        print(json.dumps(first_request(sys.argv[2] == 'warm')))
+    elif sys.argv[1:2] == ['--preload']:
+        print(json.dumps(preload(int(sys.argv[2]))))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,30 @@
+"""
+The app with Braintree's `Transaction.sale` swapped for one which sleeps for
+BENCH_GATEWAY_LATENCY seconds and succeeds, standing in for a slow gateway.
+Served by `benchmarks.load_bookings`.
+"""
+import time
+import uuid
+from os import environ
+from types import SimpleNamespace
+
+from almanac.integrations.braintree.sdk import braintree
+from almanac.wsgi import app
+
+LATENCY = float(environ.get('BENCH_GATEWAY_LATENCY', 0.5))
+
+
+def _slow_sale(params):
+    # Under gevent `time.sleep` is patched, so this yields like a real
+    # HTTPS call to the gateway would.
+    time.sleep(LATENCY)
+
+    return SimpleNamespace(
+        is_success=True,
+        transaction=SimpleNamespace(id=uuid.uuid4().hex[:8]),
+    )
+
+
+braintree.Transaction.sale = _slow_sale
+
+__all__ = ['app']
@@ -0,0 +1,282 @@
+"""
+Load tests paid bookings (`POST /events/`) against gunicorn with sync workers
+and with gevent workers, with the payment gateway answering after an injected
+delay (see `benchmarks.gateway_latency_wsgi`). Reports throughput and latency
+percentiles for each worker class.
+
+Needs a scratch postgres database, which is dropped and re-seeded:
+
+    KRONIKL_POSTGRES_FQDN=postgresql://localhost/bench \\
+        python -m benchmarks.load_bookings [bookings] [concurrency]
+
+BENCH_GATEWAY_LATENCY (seconds, default 0.5) and BENCH_WORKERS (default 3)
+tune the run.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+BENCH_ENVIRON = {
+    'KRONIKL_JWT_KEY': 'benchsecretkey',
+    'KRONIKL_JWT_EXPIRATION': '15',
+    'KRONIKL_PRELOAD_WARM_UP': 'true',
+}
+PORT = 8765
+WORKER_CLASSES = ['sync', 'gevent']
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed(slots):
+    """
+    Creates a bookable user with an hour long schedule block for each slot
+    starting tomorrow, and a user with a billing address to book them.
+
+    :param int slots: How many bookings will be made.
+    :rtype: tuple
+    :return: The booking user's ID, the booked user's ID and the first slot.
+    """
+    from almanac.almanac import get_app
+    from almanac.models import db
+    from almanac.models import (
+        UserTable as User,
+        ScheduleTable as Schedule,
+        SubmerchantTable as Submerchant,
+        AddressTable as Address,
+    )
+
+    app = get_app()
+    first_slot = (datetime.utcnow() + timedelta(days=1)).replace(
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        scheduling = User(
+            'bench_scheduling@email.com',
+            'testpw',
+            'UTC',
+            'bench_scheduling',
+        )
+        scheduled = User(
+            'bench_scheduled@email.com',
+            'testpw',
+            'UTC',
+            'bench_scheduled',
+        )
+        scheduling_uid = scheduling.public_id
+        scheduled_uid = scheduled.public_id
+
+        db.session.add(scheduling)
+        db.session.add(scheduled)
+        db.session.commit()
+
+        User.query.filter_by(public_id=scheduled_uid).update({
+            'sixty_min_price': 15,
+        })
+
+        db.session.add(Address(
+            scheduling_uid,
+            'first',
+            'last',
+            'street address',
+            'Madison',
+            'WI',
+            '53703',
+            'US',
+            is_default=True,
+        ))
+        db.session.add(Submerchant(
+            scheduled_uid,
+            'benchaccountid',
+            'first',
+            'last',
+            'email',
+            datetime.utcnow() + timedelta(days=-365 * 20),
+            'address_street',
+            'address_locality',
+            'address_region',
+            'address_zip',
+        ))
+        db.session.add(Schedule(
+            first_slot,
+            first_slot + timedelta(hours=slots),
+            scheduled_uid,
+            'UTC',
+        ))
+        db.session.commit()
+
+        db.get_engine(app).dispose()
+
+    return scheduling_uid, scheduled_uid, first_slot
+
+
+def start_server(worker_class, workers, environ):
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '-c', 'build/gunicorn.conf.py',
+            '--workers', str(workers),
+            '--timeout', '120',
+            '-b', '127.0.0.1:{0}'.format(PORT),
+            '--log-level', 'warning',
+            'benchmarks.gateway_latency_wsgi:app',
+        ],
+        env=dict(environ, GUNICORN_WORKER_CLASS=worker_class),
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(
+                'http://127.0.0.1:{0}/'.format(PORT),
+                timeout=1,
+            )
+        except urllib.error.HTTPError:
+            # Any HTTP answer (a 404 here) means the workers are up.
+            return server
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+        else:
+            return server
+
+    server.terminate()
+    raise RuntimeError('gunicorn did not come up')
+
+
+def book(token, scheduled_uid, start):
+    body = json.dumps({
+        'scheduled_user_id': scheduled_uid,
+        'localized_start_time': start.strftime('%Y-%m-%d %H:%M:%S'),
+        'localized_end_time': (start + timedelta(hours=1)).strftime(
+            '%Y-%m-%d %H:%M:%S'
+        ),
+        'local_tz': 'UTC',
+        'is_paid': True,
+        'nonce': 'fake-valid-nonce',
+    }).encode('utf-8')
+
+    request = urllib.request.Request(
+        'http://127.0.0.1:{0}/events/'.format(PORT),
+        data=body,
+        headers={'Content-Type': 'application/json', 'jwt': token},
+        method='POST',
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run(token, scheduled_uid, first_slot, offset, bookings, concurrency):
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    slots = iter(range(bookings))
+
+    def client():
+        while True:
+            with lock:
+                slot = next(slots, None)
+            if slot is None:
+                return
+
+            start = first_slot + timedelta(hours=offset + slot)
+            started = time.perf_counter()
+            status = book(token, scheduled_uid, start)
+            elapsed = time.perf_counter() - started
+
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    failures[0] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies, failures[0], time.perf_counter() - started
+
+
+def main(bookings=200, concurrency=50):
+    os.environ.update(BENCH_ENVIRON)
+    workers = int(os.environ.get('BENCH_WORKERS', 3))
+    latency = float(os.environ.get('BENCH_GATEWAY_LATENCY', 0.5))
+
+    # Room for every greenlet in a gevent worker to hold a connection while
+    # it waits on the gateway.
+    environ = dict(
+        os.environ,
+        KRONIKL_DB_POOL_SIZE=str(max(5, concurrency // workers + 1)),
+        KRONIKL_DB_MAX_OVERFLOW='10',
+    )
+
+    from almanac.utils.security import create_token
+
+    scheduling_uid, scheduled_uid, first_slot = seed(
+        bookings * len(WORKER_CLASSES)
+    )
+    token = create_token(scheduling_uid, {
+        'JWT_KEY': BENCH_ENVIRON['KRONIKL_JWT_KEY'],
+        'JWT_EXPIRATION': int(BENCH_ENVIRON['KRONIKL_JWT_EXPIRATION']),
+    })
+
+    print(
+        '{0} bookings, {1} clients, {2} workers, '
+        'gateway latency {3:.0f}ms'.format(
+            bookings,
+            concurrency,
+            workers,
+            latency * 1000,
+        )
+    )
+    print('{0:>8} {1:>10} {2:>10} {3:>10} {4:>8}'.format(
+        'workers', 'req/s', 'p50 ms', 'p99 ms', 'failed',
+    ))
+
+    for index, worker_class in enumerate(WORKER_CLASSES):
+        server = start_server(worker_class, workers, environ)
+
+        try:
+            latencies, failures, elapsed = run(
+                token,
+                scheduled_uid,
+                first_slot,
+                index * bookings,
+                bookings,
+                concurrency,
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+        print('{0:>8} {1:>10.1f} {2:>10.1f} {3:>10.1f} {4:>8}'.format(
+            worker_class,
+            len(latencies) / elapsed,
+            percentile(latencies, 50) * 1000 if latencies else 0,
+            percentile(latencies, 99) * 1000 if latencies else 0,
+            failures,
+        ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,31 @@
+"""
+gunicorn settings shared by every deployment. Per-environment knobs (workers,
+timeout, log level) stay on the command line in `docker-entrypoint.sh`.
+"""
+from os import environ
+
+# `sync` (the default) or `gevent`. With gevent each request is a greenlet, so
+# a worker keeps serving while others wait on the payment gateway; up to
+# `worker_connections` requests at once.
+worker_class = environ.get('GUNICORN_WORKER_CLASS', 'sync')
+worker_connections = int(environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+if worker_class == 'gevent':
+    # Patched here, before the app is preloaded, so nothing it imports ends
+    # up holding on to an unpatched socket, ssl or thread module.
+    from almanac.utils.cooperative import make_cooperative
+    make_cooperative()
+
+# Build (and warm up, see `almanac.utils.preload`) the app once in the master
+# and fork it into the workers, rather than having every worker import and
+# build it on boot.
+preload_app = environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def post_fork(server, worker):
+    # Anything the master connected to while preloading would otherwise
+    # share its sockets with every worker.
+    from almanac.almanac import get_app
+    from almanac.models import db
+
+    db.get_engine(get_app()).dispose()
@@ -0,0 +1,36 @@
+"""Adding delivery status columns to the email queue.
+
+Revision ID: a3c5e1f2b7d4
+Revises: 43756838ec79
+Create Date: 2026-10-18 10:12:31.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e1f2b7d4'
+down_revision = '43756838ec79'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('email_queue', sa.Column('status', sa.String(length=16), server_default='pending', nullable=False))
+    op.add_column('email_queue', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('email_queue', sa.Column('next_attempt_at', sa.TIMESTAMP(), server_default=sa.text("(now() at time zone 'utc')"), nullable=False))
+    op.add_column('email_queue', sa.Column('locked_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('email_queue', sa.Column('sent_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('email_queue', sa.Column('last_error', sa.TEXT(), nullable=True))
+    op.create_index('idx_email_queue_status', 'email_queue', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_email_queue_status', table_name='email_queue')
+    op.drop_column('email_queue', 'last_error')
+    op.drop_column('email_queue', 'sent_at')
+    op.drop_column('email_queue', 'locked_at')
+    op.drop_column('email_queue', 'next_attempt_at')
+    op.drop_column('email_queue', 'attempts')
+    op.drop_column('email_queue', 'status')
@@ -0,0 +1,34 @@
+"""Indexing schedules and events for duration window lookups.
+
+Revision ID: b81f4d2c9e60
+Revises: a3c5e1f2b7d4
+Create Date: 2026-10-18 11:02:47.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f4d2c9e60'
+down_revision = 'a3c5e1f2b7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # btree_gist lets the user id equality and the range overlap share a
+    # single GiST index.
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+
+    op.create_index(op.f('ix_schedules_user_id'), 'schedules', ['user_id'], unique=False)
+    op.create_index('idx_schedules_user_utc_duration', 'schedules', ['user_id', 'utc_duration'], unique=False, postgresql_using='gist')
+    op.create_index('idx_events_scheduled_user_utc_duration', 'events', ['scheduled_user_id', 'utc_duration'], unique=False, postgresql_using='gist')
+    op.create_index('idx_events_scheduling_user_utc_duration', 'events', ['scheduling_user_id', 'utc_duration'], unique=False, postgresql_using='gist')
+
+
+def downgrade():
+    op.drop_index('idx_events_scheduling_user_utc_duration', table_name='events')
+    op.drop_index('idx_events_scheduled_user_utc_duration', table_name='events')
+    op.drop_index('idx_schedules_user_utc_duration', table_name='schedules')
+    op.drop_index(op.f('ix_schedules_user_id'), table_name='schedules')
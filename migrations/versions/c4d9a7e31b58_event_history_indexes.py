@@ -0,0 +1,33 @@
+"""Indexing events for keyset paginated history.
+
+Revision ID: c4d9a7e31b58
+Revises: b81f4d2c9e60
+Create Date: 2026-10-18 11:48:09.530271
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9a7e31b58'
+down_revision = 'b81f4d2c9e60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE INDEX idx_events_scheduled_user_history
+        ON events (scheduled_user_id, lower(utc_duration) DESC, id DESC);
+
+        CREATE INDEX idx_events_scheduling_user_history
+        ON events (scheduling_user_id, lower(utc_duration) DESC, id DESC);
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('idx_events_scheduling_user_history', table_name='events')
+    op.drop_index('idx_events_scheduled_user_history', table_name='events')
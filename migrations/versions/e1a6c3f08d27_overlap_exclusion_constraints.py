@@ -0,0 +1,96 @@
+"""Excluding overlapping events and schedules per user.
+
+Revision ID: e1a6c3f08d27
+Revises: c4d9a7e31b58
+Create Date: 2026-10-18 13:05:52.614087
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a6c3f08d27'
+down_revision = 'c4d9a7e31b58'
+branch_labels = None
+depends_on = None
+
+# (table, user column) pairs which get an exclusion constraint.
+EXCLUSIONS = [
+    ('events', 'scheduled_user_id'),
+    ('schedules', 'user_id'),
+]
+
+
+def find_overlaps(table, user_column):
+    """
+    Lists the rows which would violate the table's exclusion constraint.
+
+    :param str table: The table to be constrained.
+    :param str user_column: The column the rows are grouped by.
+    :rtype: list[tuple]
+    :return: (public_id, public_id) pairs of overlapping rows.
+    """
+    return op.get_bind().execute(
+        sa.text(
+            """
+            SELECT a.public_id, b.public_id
+            FROM {table} a
+            JOIN {table} b
+                ON a.{user_column} = b.{user_column}
+                AND a.id < b.id
+                AND a.utc_duration && b.utc_duration
+            ORDER BY a.id, b.id
+            """.format(table=table, user_column=user_column)
+        )
+    ).fetchall()
+
+
+def upgrade():
+    # Overlapping rows already in the tables would make ADD CONSTRAINT fail
+    # halfway through; list them instead, so they can be resolved by hand
+    # (cancel, move or delete one of each pair) before rerunning.
+    problems = []
+    for table, user_column in EXCLUSIONS:
+        overlaps = find_overlaps(table, user_column)
+        if overlaps:
+            problems.append('{0} ({1} pairs): {2}'.format(
+                table,
+                len(overlaps),
+                ', '.join('{0} & {1}'.format(a, b) for a, b in overlaps),
+            ))
+
+    if problems:
+        raise RuntimeError(
+            'Cannot exclude overlapping rows while some already overlap. '
+            'Resolve these and upgrade again: {0}'.format('; '.join(problems))
+        )
+
+    # btree_gist (enabled in b81f4d2c9e60) supplies the `=` operator class
+    # for the user id.
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+
+    # Each constraint is backed by its own GiST index on the same columns,
+    # which replaces the plain one.
+    op.drop_index('idx_events_scheduled_user_utc_duration', table_name='events')
+    op.drop_index('idx_schedules_user_utc_duration', table_name='schedules')
+
+    op.execute(
+        """
+        ALTER TABLE events
+        ADD CONSTRAINT excl_events_scheduled_user_overlap
+        EXCLUDE USING gist (scheduled_user_id WITH =, utc_duration WITH &&);
+
+        ALTER TABLE schedules
+        ADD CONSTRAINT excl_schedules_user_overlap
+        EXCLUDE USING gist (user_id WITH =, utc_duration WITH &&);
+        """
+    )
+
+
+def downgrade():
+    op.drop_constraint('excl_schedules_user_overlap', 'schedules')
+    op.drop_constraint('excl_events_scheduled_user_overlap', 'events')
+
+    op.create_index('idx_schedules_user_utc_duration', 'schedules', ['user_id', 'utc_duration'], unique=False, postgresql_using='gist')
+    op.create_index('idx_events_scheduled_user_utc_duration', 'events', ['scheduled_user_id', 'utc_duration'], unique=False, postgresql_using='gist')
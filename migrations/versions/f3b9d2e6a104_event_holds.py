@@ -0,0 +1,51 @@
+"""Adding event holds.
+
+Revision ID: f3b9d2e6a104
+Revises: e1a6c3f08d27
+Create Date: 2026-10-18 13:41:07.220945
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d2e6a104'
+down_revision = 'e1a6c3f08d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('public_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('scheduling_user_id', sa.String(length=36), nullable=False),
+    sa.Column('scheduled_user_id', sa.String(length=36), nullable=False),
+    sa.Column('utc_duration', postgresql.TSTZRANGE(), nullable=False),
+    sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+    sa.ForeignKeyConstraint(['scheduled_user_id'], ['users.public_id'], ),
+    sa.ForeignKeyConstraint(['scheduling_user_id'], ['users.public_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(op.f('ix_event_holds_public_id'), 'event_holds', ['public_id'], unique=True)
+    op.create_index(op.f('ix_event_holds_scheduled_user_id'), 'event_holds', ['scheduled_user_id'], unique=False)
+    op.create_index(op.f('ix_event_holds_expires_at'), 'event_holds', ['expires_at'], unique=False)
+
+    op.execute(
+        """
+        ALTER TABLE event_holds
+        ADD CONSTRAINT excl_event_holds_scheduled_user_overlap
+        EXCLUDE USING gist (scheduled_user_id WITH =, utc_duration WITH &&);
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_event_holds_expires_at'), table_name='event_holds')
+    op.drop_index(op.f('ix_event_holds_scheduled_user_id'), table_name='event_holds')
+    op.drop_index(op.f('ix_event_holds_public_id'), table_name='event_holds')
+    op.drop_table('event_holds')
@@ -0,0 +1,145 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from almanac.integrations.braintree import http_client
+from almanac.integrations.braintree.http_client import GatewayMetrics, \
+    KeepAliveHttp, operation_name
+
+BASE_URL = 'https://api.sandbox.braintreegateway.com:443'
+
+
+class OperationNameTestCase(unittest.TestCase):
+
+    def test_strips_merchant_and_ids(self):
+        self.assertEqual(
+            operation_name(
+                'PUT',
+                BASE_URL + '/merchants/abc123/transactions/xyz789/void',
+            ),
+            'PUT transactions/void',
+        )
+
+    def test_collection(self):
+        self.assertEqual(
+            operation_name('POST', '/merchants/abc123/transactions'),
+            'POST transactions',
+        )
+
+    def test_single_object(self):
+        self.assertEqual(
+            operation_name('GET', '/merchants/abc123/customers/cust1?x=1'),
+            'GET customers',
+        )
+
+
+class GatewayMetricsTestCase(unittest.TestCase):
+
+    def test_histogram(self):
+        metrics = GatewayMetrics(interval=0)
+
+        for _ in range(98):
+            metrics.record('POST transactions', 0.04)
+        metrics.record('POST transactions', 0.3)
+        metrics.record('POST transactions', 12, failed=True)
+
+        gauges = metrics.snapshot()['POST transactions']
+
+        self.assertEqual(gauges['calls'], 100)
+        self.assertEqual(gauges['failures'], 1)
+        self.assertEqual(gauges['p50_ms'], 50)
+        self.assertEqual(gauges['p99_ms'], 500)
+        self.assertEqual(gauges['max_ms'], 12000)
+
+    def test_logs_and_resets_every_interval(self):
+        metrics = GatewayMetrics(interval=60)
+
+        with mock.patch('time.monotonic', return_value=metrics._since + 61):
+            with mock.patch('logging.info') as log_mock:
+                metrics.record('POST transactions', 0.1)
+
+        log_mock.assert_called_once()
+        self.assertEqual(metrics.snapshot(), {})
+
+
+class KeepAliveHttpTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SimpleNamespace(
+            base_url=lambda: BASE_URL,
+            timeout=(3.05, 30),
+        )
+        self.http = KeepAliveHttp(
+            self.config,
+            SimpleNamespace(ssl_certificate='/path/to/cert'),
+        )
+
+        self.session = mock.Mock()
+        self.session.request.return_value = SimpleNamespace(
+            status_code=201,
+            text='<transaction/>',
+        )
+
+        self.metrics = GatewayMetrics(interval=0)
+
+        for name, value in (
+                ('get_session', lambda: self.session),
+                ('gateway_metrics', self.metrics),
+        ):
+            patcher = mock.patch.object(http_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_goes_through_shared_session(self):
+        response = self.http.http_do(
+            'POST',
+            '/merchants/abc123/transactions',
+            {'Accept': 'application/xml'},
+            '<transaction/>',
+        )
+
+        self.assertEqual(response, [201, '<transaction/>'])
+        self.session.request.assert_called_once_with(
+            'POST',
+            BASE_URL + '/merchants/abc123/transactions',
+            headers={'Accept': 'application/xml'},
+            data='<transaction/>',
+            verify='/path/to/cert',
+            timeout=(3.05, 30),
+        )
+        self.assertEqual(
+            self.metrics.snapshot()['POST transactions']['calls'],
+            1,
+        )
+
+    def test_records_failures(self):
+        self.session.request.side_effect = IOError('read timed out')
+
+        with self.assertRaises(IOError):
+            self.http.http_do('POST', '/merchants/abc123/transactions', {}, '')
+
+        self.assertEqual(
+            self.metrics.snapshot()['POST transactions']['failures'],
+            1,
+        )
+
+
+class GetSessionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            http_client,
+            _session=None,
+            _session_pid=None,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reused_within_a_worker(self):
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_rebuilt_after_fork(self):
+        session = http_client.get_session()
+
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(http_client.get_session(), session)
@@ -0,0 +1,97 @@
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from almanac.integrations.braintree.sdk import LazyBraintree
+
+
+class LazyBraintreeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sdk = SimpleNamespace(
+            Configuration=mock.Mock(),
+            Environment=SimpleNamespace(
+                Sandbox='sandbox-env',
+                Production='production-env',
+            ),
+            Transaction=mock.Mock(),
+        )
+
+        self.http_client = SimpleNamespace(
+            KeepAliveHttp=mock.Mock(),
+            configure_session=mock.Mock(),
+            gateway_metrics=SimpleNamespace(interval=60),
+        )
+        patcher = mock.patch.object(
+            LazyBraintree,
+            '_load_http_client',
+            return_value=self.http_client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_configure_is_deferred(self):
+        braintree = LazyBraintree()
+
+        with mock.patch.dict(sys.modules, {'braintree': self.sdk}):
+            braintree.configure('production', 'merchant', 'public', 'private')
+
+            self.assertFalse(braintree.is_loaded)
+            self.sdk.Configuration.configure.assert_not_called()
+
+            braintree.Transaction.sale({})
+
+        self.assertTrue(braintree.is_loaded)
+        self.sdk.Configuration.configure.assert_called_once_with(
+            environment='production-env',
+            merchant_id='merchant',
+            public_key='public',
+            private_key='private',
+            http_strategy=self.http_client.KeepAliveHttp,
+            timeout=(3.05, 30),
+        )
+        self.sdk.Transaction.sale.assert_called_once_with({})
+
+    def test_configure_after_load_applies_immediately(self):
+        braintree = LazyBraintree()
+
+        with mock.patch.dict(sys.modules, {'braintree': self.sdk}):
+            braintree.Transaction
+            braintree.configure('sandbox', 'merchant', 'public', 'private')
+
+        self.sdk.Configuration.configure.assert_called_once_with(
+            environment='sandbox-env',
+            merchant_id='merchant',
+            public_key='public',
+            private_key='private',
+            http_strategy=self.http_client.KeepAliveHttp,
+            timeout=(3.05, 30),
+        )
+
+    def test_configure_gateway_client(self):
+        braintree = LazyBraintree()
+
+        with mock.patch.dict(sys.modules, {'braintree': self.sdk}):
+            braintree.configure(
+                'sandbox',
+                'merchant',
+                'public',
+                'private',
+                connect_timeout=1,
+                read_timeout=5,
+                pool_size=4,
+                metrics_interval=0,
+            )
+            braintree.Transaction
+
+        self.http_client.configure_session.assert_called_once_with(4)
+        self.assertEqual(self.http_client.gateway_metrics.interval, 0)
+        self.assertEqual(
+            self.sdk.Configuration.configure.call_args[1]['timeout'],
+            (1, 5),
+        )
+
+    def test_unknown_environment(self):
+        with self.assertRaises(ValueError):
+            LazyBraintree().configure('staging', 'm', 'pub', 'priv')
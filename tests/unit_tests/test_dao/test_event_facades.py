@@ -1,5 +1,6 @@
 import random
 from datetime import datetime, timedelta
+from http import HTTPStatus
 
 import unittest
 from unittest import mock
@@ -8,7 +9,7 @@ import pytz
 
 from almanac.almanac import app
 from almanac.exc.exceptions import DAOException, FacadeException
-from almanac.DAOs.event_dao import EventDAO
+from almanac.DAOs.event_dao import EventDAO, OVERLAP_CONSTRAINT
 from almanac.facades.paid_event_facade import EventFacade
 from almanac.models import db
 from almanac.models import UserTable as User, AddressTable as Address
@@ -107,6 +108,24 @@ class EventDAOGetTestCase(unittest.TestCase):
             self.assertNotEqual([], response)
             self.assertEqual(len(response), 3)
 
+    def test_get_for_scheduled_user_window(self):
+        with app.app_context():
+            response = self.test_dao.get_for_scheduled_user(
+                self.scheduled_user,
+                window_start=datetime.utcnow() - timedelta(days=1),
+                window_end=datetime.utcnow() + timedelta(days=1),
+            )
+
+            self.assertEqual(len(response), 3)
+
+            response = self.test_dao.get_for_scheduled_user(
+                self.scheduled_user,
+                window_start=datetime.utcnow() - timedelta(days=366),
+                window_end=datetime.utcnow() - timedelta(days=360),
+            )
+
+            self.assertEqual(response, [])
+
     def test_get_by_event_id(self):
         with app.app_context():
             response = self.test_dao.get_by_event_id(
@@ -307,6 +326,282 @@ class EventDAOPostTestCase(unittest.TestCase):
                 db.drop_all()
 
 
+class EventDAOBulkPostTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            cls.test_dao = EventDAO()
+
+            scheduling_user = User(
+                "bulk_scheduling_user@email.com",
+                "testpw",
+                'UTC',
+                'bulk_scheduling_user',
+            )
+
+            scheduled_user = User(
+                "bulk_scheduled_user@email.com",
+                "testpw",
+                'UTC',
+                'bulk_scheduled_user',
+            )
+
+            db.session.add(scheduling_user)
+            db.session.add(scheduled_user)
+            db.session.commit()
+
+            cls.scheduling_user = scheduling_user.public_id
+            cls.scheduled_user = scheduled_user.public_id
+
+            User.query.filter_by(
+                public_id=cls.scheduled_user
+            ).update({
+                'sixty_min_price': 15
+            })
+
+            db.session.add(Submerchant(
+                cls.scheduled_user,
+                'testaccountid',
+                'firstName',
+                'LastName',
+                'email',
+                datetime.utcnow() + timedelta(days=-365*20),
+                'address_street',
+                'address_locality',
+                'address_region',
+                'address_zip',
+                ))
+
+            cls.day = (datetime.utcnow() + timedelta(days=2)).replace(
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+            db.session.add(Schedule(
+                cls.day.replace(hour=8),
+                cls.day.replace(hour=16),
+                cls.scheduled_user,
+                'UTC'
+            ))
+            db.session.commit()
+
+    def _slot(self, hour, notes=None):
+        return {
+            'localized_start_time': self.day.replace(hour=hour).strftime(
+                '%Y-%m-%d %H:%M:%S'
+            ),
+            'localized_end_time': self.day.replace(hour=hour + 1).strftime(
+                '%Y-%m-%d %H:%M:%S'
+            ),
+            'notes': notes,
+        }
+
+    def test_create_events_bulk(self):
+        with app.app_context():
+            response = self.test_dao.create_events_bulk(
+                self.scheduling_user,
+                self.scheduled_user,
+                [self._slot(8, 'first'), self._slot(10), self._slot(12)],
+                'UTC',
+            )
+
+            self.assertEqual(len(response), 3)
+            self.assertEqual(response[0].notes, 'first')
+
+            found_events = db.session.query(Event).filter_by(
+                scheduled_user_id=self.scheduled_user,
+            ).all()
+
+            self.assertEqual(len(found_events), 3)
+
+    def test_create_events_bulk_fail_overlapping_each_other(self):
+        with app.app_context():
+            with self.assertRaises(DAOException):
+                self.test_dao.create_events_bulk(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    [self._slot(14), self._slot(14)],
+                    'UTC',
+                )
+
+    def test_create_events_bulk_fail_inserts_nothing(self):
+        with app.app_context():
+            with self.assertRaises(DAOException):
+                self.test_dao.create_events_bulk(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    [self._slot(9, 'bulk-rollback'), self._slot(18)],
+                    'UTC',
+                )
+
+            found_event = db.session.query(Event).filter_by(
+                notes='bulk-rollback',
+            ).first()
+
+            self.assertIsNone(found_event)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
+
+
+class EventDAOOverlapTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            # Created by the migrations, not `create_all`.
+            db.session.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            db.session.execute(
+                'ALTER TABLE events ADD CONSTRAINT {0} EXCLUDE USING gist '
+                '(scheduled_user_id WITH =, utc_duration WITH &&)'.format(
+                    OVERLAP_CONSTRAINT,
+                )
+            )
+            db.session.commit()
+
+            cls.test_dao = EventDAO()
+
+            scheduling_user = User(
+                "overlap_scheduling_user@email.com",
+                "testpw",
+                'UTC',
+                'overlap_scheduling_user',
+            )
+
+            scheduled_user = User(
+                "overlap_scheduled_user@email.com",
+                "testpw",
+                'UTC',
+                'overlap_scheduled_user',
+            )
+
+            db.session.add(scheduling_user)
+            db.session.add(scheduled_user)
+            db.session.commit()
+
+            cls.scheduling_user = scheduling_user.public_id
+            cls.scheduled_user = scheduled_user.public_id
+
+            User.query.filter_by(
+                public_id=cls.scheduled_user
+            ).update({
+                'sixty_min_price': 15
+            })
+
+            db.session.add(Submerchant(
+                cls.scheduled_user,
+                'testaccountid',
+                'firstName',
+                'LastName',
+                'email',
+                datetime.utcnow() + timedelta(days=-365*20),
+                'address_street',
+                'address_locality',
+                'address_region',
+                'address_zip',
+                ))
+
+            cls.day = (datetime.utcnow() + timedelta(days=2)).replace(
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+            db.session.add(Schedule(
+                cls.day.replace(hour=8),
+                cls.day.replace(hour=20),
+                cls.scheduled_user,
+                'UTC'
+            ))
+            db.session.commit()
+
+    def _slot(self, hour, minute=0):
+        start = self.day.replace(hour=hour, minute=minute)
+
+        return {
+            'localized_start_time': start.strftime('%Y-%m-%d %H:%M:%S'),
+            'localized_end_time': (
+                start + timedelta(minutes=60)
+            ).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def _book(self, hour, minute=0):
+        slot = self._slot(hour, minute)
+
+        return self.test_dao.create_new_event(
+            self.scheduling_user,
+            self.scheduled_user,
+            slot['localized_start_time'],
+            slot['localized_end_time'],
+            'UTC',
+        )
+
+    def test_create_new_event_fail_slot_booked(self):
+        with app.app_context():
+            self._book(9)
+
+            with self.assertRaises(DAOException) as e:
+                self._book(9, 30)
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+            self.assertEqual(
+                e.exception.msg,
+                'Invalid event. The requested time slot has already been '
+                'booked.'
+            )
+
+    def test_create_new_event_adjacent_slots(self):
+        with app.app_context():
+            self._book(11)
+            self._book(12)
+
+            found_events = db.session.query(Event).filter_by(
+                scheduled_user_id=self.scheduled_user,
+            ).count()
+
+            self.assertGreaterEqual(found_events, 2)
+
+    def test_create_events_bulk_fail_slot_booked(self):
+        with app.app_context():
+            self._book(14)
+
+            with self.assertRaises(DAOException) as e:
+                self.test_dao.create_events_bulk(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    [self._slot(15), self._slot(14)],
+                    'UTC',
+                )
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+            found_starts = [
+                event.utc_start.astimezone(pytz.utc).hour
+                for event in db.session.query(Event).filter_by(
+                    scheduled_user_id=self.scheduled_user,
+                )
+            ]
+
+            self.assertNotIn(15, found_starts)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
+
+
 class TestPaidEventFacade(unittest.TestCase):
 
     @classmethod
@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import unittest
+
+from almanac.almanac import app
+from almanac.DAOs.event_dao import EventDAO
+from almanac.DAOs.event_hold_dao import EventHoldDAO
+from almanac.exc.exceptions import DAOException
+from almanac.models import db
+from almanac.models import UserTable as User
+from almanac.models import ScheduleTable as Schedule
+from almanac.models import EventHoldTable as EventHold
+from almanac.models import SubmerchantTable as Submerchant
+
+
+class EventHoldDAOTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            cls.test_dao = EventHoldDAO()
+
+            scheduling_user = User(
+                "hold_scheduling_user@email.com",
+                "testpw",
+                'UTC',
+                'hold_scheduling_user',
+            )
+
+            scheduled_user = User(
+                "hold_scheduled_user@email.com",
+                "testpw",
+                'UTC',
+                'hold_scheduled_user',
+            )
+
+            db.session.add(scheduling_user)
+            db.session.add(scheduled_user)
+            db.session.commit()
+
+            cls.scheduling_user = scheduling_user.public_id
+            cls.scheduled_user = scheduled_user.public_id
+
+            User.query.filter_by(
+                public_id=cls.scheduled_user
+            ).update({
+                'sixty_min_price': 15
+            })
+
+            db.session.add(Submerchant(
+                cls.scheduled_user,
+                'testaccountid',
+                'firstName',
+                'LastName',
+                'email',
+                datetime.utcnow() + timedelta(days=-365*20),
+                'address_street',
+                'address_locality',
+                'address_region',
+                'address_zip',
+                ))
+
+            cls.day = (datetime.utcnow() + timedelta(days=2)).replace(
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+            db.session.add(Schedule(
+                cls.day.replace(hour=8),
+                cls.day.replace(hour=16),
+                cls.scheduled_user,
+                'UTC'
+            ))
+            db.session.commit()
+
+    def _event(self, hour, minute=0):
+        start = self.day.replace(hour=hour, minute=minute)
+
+        return EventDAO().build_new_event(
+            self.scheduling_user,
+            self.scheduled_user,
+            start.strftime('%Y-%m-%d %H:%M:%S'),
+            (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+            'UTC',
+        )
+
+    def _holds(self, hold_ids):
+        return db.session.query(EventHold).filter(
+            EventHold.public_id.in_(hold_ids),
+        ).all()
+
+    def test_place_commits(self):
+        with app.app_context():
+            hold_ids = self.test_dao.place([self._event(8)], 300)
+
+            db.session.remove()
+
+            holds = self._holds(hold_ids)
+            self.assertEqual(len(holds), 1)
+            self.assertEqual(holds[0].scheduled_user_id, self.scheduled_user)
+            self.assertGreater(holds[0].expires_at, datetime.utcnow())
+
+    def test_place_fail_slot_held(self):
+        with app.app_context():
+            self.test_dao.place([self._event(9)], 300)
+
+            with self.assertRaises(DAOException) as e:
+                self.test_dao.place([self._event(9, 30)], 300)
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+    def test_place_fail_slot_booked(self):
+        with app.app_context():
+            EventDAO().insert_events([self._event(10)])
+
+            with self.assertRaises(DAOException) as e:
+                self.test_dao.place([self._event(10, 30)], 300)
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+    def test_place_clears_expired_holds(self):
+        with app.app_context():
+            expired_ids = self.test_dao.place([self._event(11)], -1)
+
+            hold_ids = self.test_dao.place([self._event(11, 30)], 300)
+
+            self.assertEqual(self._holds(expired_ids), [])
+            self.assertEqual(len(self._holds(hold_ids)), 1)
+
+    def test_claim(self):
+        with app.app_context():
+            event = self._event(13)
+            hold_ids = self.test_dao.place([event], 300)
+
+            self.test_dao.claim(hold_ids, self.scheduled_user)
+            EventDAO().insert_events([event])
+
+            self.assertEqual(self._holds(hold_ids), [])
+
+    def test_claim_fail_hold_lost(self):
+        with app.app_context():
+            hold_ids = self.test_dao.place([self._event(14)], 300)
+            self.test_dao.release(hold_ids)
+
+            with self.assertRaises(DAOException) as e:
+                self.test_dao.claim(hold_ids, self.scheduled_user)
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+    def test_release(self):
+        with app.app_context():
+            hold_ids = self.test_dao.place([self._event(15)], 300)
+
+            self.test_dao.release(hold_ids)
+
+            db.session.remove()
+
+            self.assertEqual(self._holds(hold_ids), [])
+
+            # The slot can be held again straight away.
+            self.test_dao.place([self._event(15)], 300)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
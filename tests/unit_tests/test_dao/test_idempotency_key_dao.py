@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import unittest
+from unittest import mock
+
+from almanac.almanac import app
+from almanac.DAOs.idempotency_key_dao import IdempotencyKeyDAO
+from almanac.exc.exceptions import DAOException
+from almanac.models import db
+from almanac.models import UserTable as User
+from almanac.models import IdempotencyKeyTable as IdempotencyKey
+
+
+class IdempotencyKeyDAOTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            cls.test_dao = IdempotencyKeyDAO()
+
+            user = User(
+                "idempotent_user@email.com",
+                "testpw",
+                'UTC',
+                'idempotent_user',
+            )
+
+            db.session.add(user)
+            db.session.commit()
+
+            cls.user_id = user.public_id
+
+    def _begin(self, key, request_hash='hash', ttl=60, lease=60):
+        return self.test_dao.begin(
+            self.user_id,
+            key,
+            request_hash,
+            ttl=ttl,
+            lease=lease,
+        )
+
+    def _update(self, key, **values):
+        db.session.query(IdempotencyKey).filter_by(
+            user_id=self.user_id,
+            key=key,
+        ).update(values)
+        db.session.commit()
+
+    def test_begin_claims_new_key(self):
+        with app.app_context():
+            self.assertIsNone(self._begin('new-key'))
+
+            db.session.remove()
+
+            record = db.session.query(IdempotencyKey).filter_by(
+                user_id=self.user_id,
+                key='new-key',
+            ).one()
+
+            self.assertFalse(record.is_complete)
+            self.assertIsNotNone(record.locked_at)
+
+    def test_begin_replays_completed(self):
+        with app.app_context():
+            self._begin('completed-key')
+            self.test_dao.complete(
+                self.user_id,
+                'completed-key',
+                HTTPStatus.OK,
+                '{"ok": true}',
+            )
+
+            stored = self._begin('completed-key')
+
+            self.assertEqual(stored.status_code, HTTPStatus.OK)
+            self.assertEqual(stored.response_body, '{"ok": true}')
+
+    def test_begin_fail_in_flight(self):
+        with app.app_context():
+            self._begin('in-flight-key')
+
+            with self.assertRaises(DAOException) as e:
+                self._begin('in-flight-key')
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+    def test_begin_fail_different_request(self):
+        with app.app_context():
+            self._begin('reused-key')
+
+            with self.assertRaises(DAOException) as e:
+                self._begin('reused-key', request_hash='other-hash')
+
+            self.assertEqual(
+                e.exception.status_code,
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+            )
+
+    def test_begin_takes_over_dead_request(self):
+        with app.app_context():
+            self._begin('dead-key')
+            self._update(
+                'dead-key',
+                locked_at=datetime.utcnow() - timedelta(seconds=120),
+            )
+
+            self.assertIsNone(self._begin('dead-key', lease=60))
+
+            # Now held by the retry.
+            with self.assertRaises(DAOException):
+                self._begin('dead-key', lease=60)
+
+    def test_begin_reuses_expired_key(self):
+        with app.app_context():
+            self._begin('expired-key')
+            self.test_dao.complete(
+                self.user_id,
+                'expired-key',
+                HTTPStatus.OK,
+                '{}',
+            )
+            self._update(
+                'expired-key',
+                expires_at=datetime.utcnow() - timedelta(seconds=1),
+            )
+
+            self.assertIsNone(
+                self._begin('expired-key', request_hash='other-hash')
+            )
+
+    def test_begin_retries_when_race_winner_releases(self):
+        with app.app_context():
+            # The insert loses to another request, which then fails and
+            # releases the key before this one reads it back.
+            with mock.patch.object(
+                self.test_dao,
+                '_get',
+                return_value=None,
+            ), mock.patch.object(
+                self.test_dao,
+                '_insert',
+                side_effect=[False, True],
+            ) as insert:
+                self.assertIsNone(self._begin('vanishing-key'))
+
+            self.assertEqual(insert.call_count, 2)
+
+    def test_begin_fail_when_key_keeps_vanishing(self):
+        with app.app_context():
+            with mock.patch.object(
+                self.test_dao,
+                '_get',
+                return_value=None,
+            ), mock.patch.object(
+                self.test_dao,
+                '_insert',
+                return_value=False,
+            ):
+                with self.assertRaises(DAOException) as e:
+                    self._begin('always-vanishing-key')
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+
+    def test_release(self):
+        with app.app_context():
+            self._begin('released-key')
+            self.test_dao.release(self.user_id, 'released-key')
+
+            self.assertIsNone(self._begin('released-key'))
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
@@ -0,0 +1,238 @@
+import json
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from almanac.almanac import app
+from almanac.DAOs.availability_dao import AvailabilityDAO
+from almanac.DAOs.event_dao import EventDAO
+from almanac.DAOs.schedule_dao import ScheduleDAO
+from almanac.models import db
+from almanac.utils import schedule_index
+
+SEEDED_USERS = 100
+# Schedules and events each, so 1M rows between them.
+ROWS_PER_USER = 5000
+
+SEED_SQL = """
+INSERT INTO users (
+    public_id, created_at, email, username, password, is_deleted, local_tz,
+    is_premium, is_validated
+)
+SELECT
+    'seed-' || u, now(), 'seed-' || u || '@email.com', 'seed' || u,
+    '\\x00'::bytea, false, 'UTC', false, true
+FROM generate_series(1, :users) u;
+
+-- A schedule and an event every other hour per user, ending a couple of
+-- weeks from now.
+INSERT INTO schedules (
+    public_id, created_at, user_id, utc_duration, local_duration,
+    day_number, month_number, local_tz
+)
+SELECT
+    md5('schedule-' || u || '-' || n), now(), 'seed-' || u,
+    tsrange(start, start + interval '1 hour'),
+    tstzrange(start AT TIME ZONE 'UTC',
+              (start + interval '1 hour') AT TIME ZONE 'UTC'),
+    extract(day from start), extract(month from start), 'UTC'
+FROM (
+    SELECT
+        u, n,
+        date_trunc('hour', now() AT TIME ZONE 'UTC') - interval '400 days'
+            + n * interval '2 hours' AS start
+    FROM generate_series(1, :users) u, generate_series(1, :per_user) n
+) seeded;
+
+INSERT INTO events (
+    public_id, created_at, scheduling_user_id, scheduled_user_id,
+    utc_duration, scheduled_tz_duration, scheduling_tz_duration,
+    day_number, month_number, duration, total_price, service_fee
+)
+SELECT
+    md5('event-' || u || '-' || n), now(),
+    'seed-' || (u % :users + 1), 'seed-' || u,
+    tstzrange(start, start + interval '1 hour'),
+    tstzrange(start, start + interval '1 hour'),
+    tstzrange(start, start + interval '1 hour'),
+    extract(day from start), extract(month from start), 60, 15, 0.5
+FROM (
+    SELECT
+        u, n,
+        date_trunc('hour', now()) - interval '400 days'
+            + n * interval '2 hours' AS start
+    FROM generate_series(1, :users) u, generate_series(1, :per_user) n
+) seeded;
+"""
+
+# What the migrations add on top of `create_all`. Built after seeding, which
+# is much quicker than maintaining them row by row.
+INDEX_SQL = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE events
+ADD CONSTRAINT excl_events_scheduled_user_overlap
+EXCLUDE USING gist (scheduled_user_id WITH =, utc_duration WITH &&);
+
+ALTER TABLE schedules
+ADD CONSTRAINT excl_schedules_user_overlap
+EXCLUDE USING gist (user_id WITH =, utc_duration WITH &&);
+
+CREATE INDEX idx_events_scheduling_user_utc_duration
+ON events USING gist (scheduling_user_id, utc_duration);
+
+ANALYZE users;
+ANALYZE schedules;
+ANALYZE events;
+"""
+
+GIST_INDEXES = {
+    'schedules': {'excl_schedules_user_overlap'},
+    'events': {
+        'excl_events_scheduled_user_overlap',
+        'idx_events_scheduling_user_utc_duration',
+    },
+}
+
+
+class RangeQueryPlanTestCase(unittest.TestCase):
+    """
+    Checks that the DAOs' temporal lookups are answered from the GiST range
+    indexes, rather than scanning every row a user has, by EXPLAINing the
+    SQL they actually run against a million seeded rows.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            db.session.execute(SEED_SQL, {
+                'users': SEEDED_USERS,
+                'per_user': ROWS_PER_USER,
+            })
+            db.session.execute(INDEX_SQL)
+            db.session.commit()
+
+        cls.user_id = 'seed-1'
+        cls.window_start = datetime.utcnow() + timedelta(days=1)
+        cls.window_end = datetime.utcnow() + timedelta(days=8)
+
+    @contextmanager
+    def _captured_statements(self):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+    def _plan_nodes(self, statement, parameters):
+        connection = db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+            plan = cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        nodes = []
+        pending = [plan[0]['Plan']]
+        while pending:
+            node = pending.pop()
+            nodes.append(node)
+            pending.extend(node.get('Plans', []))
+
+        return nodes
+
+    def _assert_uses_gist(self, f, *args, **kwargs):
+        with self._captured_statements() as statements:
+            f(*args, **kwargs)
+
+        checked = 0
+        for statement, parameters in statements:
+            for table, indexes in GIST_INDEXES.items():
+                if 'FROM {0}'.format(table) not in statement:
+                    continue
+
+                nodes = self._plan_nodes(statement, parameters)
+                scans = [
+                    node for node in nodes
+                    if node.get('Relation Name') == table or
+                    node.get('Index Name') in indexes
+                ]
+
+                self.assertNotIn(
+                    'Seq Scan',
+                    [node['Node Type'] for node in scans],
+                    statement,
+                )
+                self.assertTrue(
+                    indexes & {node.get('Index Name') for node in scans},
+                    statement,
+                )
+                checked += 1
+
+        self.assertGreater(checked, 0)
+
+    def test_schedules_in_window(self):
+        with app.app_context():
+            self._assert_uses_gist(
+                ScheduleDAO().get,
+                self.user_id,
+                window_start=self.window_start,
+                window_end=self.window_end,
+            )
+
+    def test_scheduled_user_events_in_window(self):
+        with app.app_context():
+            self._assert_uses_gist(
+                EventDAO().get_for_scheduled_user,
+                self.user_id,
+                window_start=self.window_start,
+                window_end=self.window_end,
+            )
+
+    def test_scheduling_user_events_in_window(self):
+        with app.app_context():
+            self._assert_uses_gist(
+                EventDAO().get_for_scheduling_user,
+                self.user_id,
+                window_start=self.window_start,
+                window_end=self.window_end,
+            )
+
+    def test_bookable_slots(self):
+        with app.app_context():
+            self._assert_uses_gist(
+                AvailabilityDAO().get_bookable_slots,
+                self.user_id,
+                self.window_start,
+                self.window_end,
+                60,
+            )
+
+    def test_schedule_index_load(self):
+        with app.app_context():
+            schedule_index.invalidate_schedule_index(self.user_id)
+
+            self._assert_uses_gist(
+                schedule_index.get_schedule_index,
+                self.user_id,
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 
 from almanac.almanac import app
 from almanac.exc.exceptions import DAOException
-from almanac.DAOs.schedule_dao import ScheduleDAO
+from almanac.DAOs.schedule_dao import ScheduleDAO, OVERLAP_CONSTRAINT
 from almanac.models import db
 from almanac.models import UserTable as User
 from almanac.models import ScheduleTable as Schedule
@@ -94,6 +94,49 @@ class ScheduleDAOGetTestCase(unittest.TestCase):
 
             self.assertNotEqual([], response)
 
+    def test_get_excludes_same_month_last_year(self):
+        with app.app_context():
+            last_year = datetime.utcnow().replace(day=1, hour=12, minute=0)
+            last_year = last_year.replace(year=last_year.year - 1)
+
+            schedule = Schedule(
+                last_year,
+                last_year + timedelta(hours=1),
+                self.test_uid,
+                'US/Central'
+            )
+            schedule_id = schedule.public_id
+
+            db.session.add(schedule)
+            db.session.commit()
+
+            response = self.test_dao.get(self.test_uid)
+
+            self.assertNotIn(schedule_id, [s.public_id for s in response])
+
+            response = self.test_dao.get(
+                self.test_uid,
+                window_start=last_year,
+                window_end=last_year + timedelta(days=1),
+            )
+
+            self.assertEqual([schedule_id], [s.public_id for s in response])
+
+    def test_get_fail_invalid_window(self):
+        with app.app_context():
+            with self.assertRaises(DAOException):
+                self.test_dao.get(
+                    self.test_uid,
+                    window_start=datetime.utcnow(),
+                    window_end=datetime.utcnow() - timedelta(days=1),
+                )
+
+            with self.assertRaises(DAOException):
+                self.test_dao.get(
+                    self.test_uid,
+                    window_start=datetime.utcnow(),
+                )
+
     @classmethod
     def tearDownClass(cls):
         with app.app_context():
@@ -390,3 +433,98 @@ class UserDAOPutTestCase(unittest.TestCase):
             if app.config['TEAR_DOWN_AFTER']:
                 db.drop_all()
 
+
+
+class ScheduleDAOOverlapTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            # Created by the migrations, not `create_all`.
+            db.session.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            db.session.execute(
+                'ALTER TABLE schedules ADD CONSTRAINT {0} EXCLUDE USING gist '
+                '(user_id WITH =, utc_duration WITH &&)'.format(
+                    OVERLAP_CONSTRAINT,
+                )
+            )
+            db.session.commit()
+
+            cls.test_dao = ScheduleDAO()
+
+            test_user = User(
+                "scheduleoverlaptest@email.com",
+                "testpw",
+                'UTC',
+                'scheduleoverlaptest',
+            )
+
+            cls.test_uid = test_user.public_id
+
+            db.session.add(test_user)
+            db.session.commit()
+
+            cls.day = (datetime.utcnow() + timedelta(days=3)).replace(
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+    def test_post_fail_overlap(self):
+        with app.app_context():
+            self.test_dao.post(
+                self.day.replace(hour=2),
+                self.day.replace(hour=5),
+                self.test_uid,
+            )
+
+            with self.assertRaises(DAOException) as e:
+                self.test_dao.post(
+                    self.day.replace(hour=4),
+                    self.day.replace(hour=6),
+                    self.test_uid,
+                )
+
+            self.assertEqual(
+                e.exception.msg,
+                "Invalid schedule. This overlaps with a previous schedule."
+            )
+
+    def test_put_fail_overlap(self):
+        with app.app_context():
+            self.test_dao.post(
+                self.day.replace(hour=8),
+                self.day.replace(hour=10),
+                self.test_uid,
+            )
+            schedule = self.test_dao.post(
+                self.day.replace(hour=12),
+                self.day.replace(hour=14),
+                self.test_uid,
+            )
+
+            with self.assertRaises(DAOException):
+                self.test_dao.put(
+                    schedule.public_id,
+                    self.day.replace(hour=9),
+                    self.day.replace(hour=14),
+                    self.test_uid,
+                )
+
+            # Resizing within its own slot doesn't conflict with itself.
+            resized = self.test_dao.put(
+                schedule.public_id,
+                self.day.replace(hour=12),
+                self.day.replace(hour=15),
+                self.test_uid,
+            )
+
+            self.assertEqual(15, resized.utc_end.hour)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
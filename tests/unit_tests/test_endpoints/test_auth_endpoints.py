@@ -2,12 +2,17 @@ from http import HTTPStatus
 
 import unittest
 import json
+from unittest import mock
 
 
 from almanac.almanac import app
 from almanac.DAOs.user_dao import UserDAO
 from almanac.models import db
 from almanac.models import UserTable as User
+from almanac.utils import login_limiter
+from almanac.utils.login_limiter import LocalLoginLimiter
+from almanac.utils.security import TOKEN_CLAIMS_VERSION, create_token, \
+    decode_token
 
 
 class AuthEndpointTestCase(unittest.TestCase):
@@ -33,6 +38,9 @@ class AuthEndpointTestCase(unittest.TestCase):
 
             cls.scheduled_uid = test_user.public_id
 
+    def setUp(self):
+        login_limiter._limiter = LocalLoginLimiter()
+
     def test_login(self):
         with app.app_context():
             data = {
@@ -101,3 +109,154 @@ class AuthEndpointTestCase(unittest.TestCase):
 
             self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
 
+
+
+    def test_login_throttled_before_lookup(self):
+        with app.app_context(), mock.patch.dict(app.config, {
+            'LOGIN_LIMIT_ATTEMPTS': 2,
+        }):
+            data = {
+                'user_challenge': 'auth_test_user@email.com',
+                'plaintext_password': 'badpassword'
+            }
+
+            for _ in range(2):
+                response = self.test_client.post(
+                    '/authentication/login',
+                    content_type='application/json',
+                    data=json.dumps(data)
+                )
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+            with mock.patch(
+                'almanac.api.v1.auth.AuthDAO.login'
+            ) as login:
+                response = self.test_client.post(
+                    '/authentication/login',
+                    content_type='application/json',
+                    data=json.dumps(data)
+                )
+
+            self.assertEqual(
+                response.status_code,
+                HTTPStatus.TOO_MANY_REQUESTS
+            )
+            self.assertIn('Retry-After', response.headers)
+            login.assert_not_called()
+
+    def test_login_throttled_by_forwarded_ip(self):
+        with app.app_context(), mock.patch.dict(app.config, {
+            'LOGIN_LIMIT_IP_ATTEMPTS': 2,
+        }):
+            def login(user_challenge, forwarded_for):
+                return self.test_client.post(
+                    '/authentication/login',
+                    content_type='application/json',
+                    data=json.dumps({
+                        'user_challenge': user_challenge,
+                        'plaintext_password': 'badpassword'
+                    }),
+                    headers={'X-Forwarded-For': forwarded_for}
+                )
+
+            login('a@email.com', '203.0.113.1')
+            # Entries left of the one nginx appended are the client's own.
+            login('b@email.com', '10.9.9.9, 203.0.113.1')
+
+            response = login('c@email.com', '203.0.113.1')
+            self.assertEqual(
+                response.status_code,
+                HTTPStatus.TOO_MANY_REQUESTS
+            )
+
+            response = login('c@email.com', '203.0.113.2')
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+    def test_login_token_carries_claims(self):
+        with app.app_context():
+            data = {
+                'user_challenge': 'auth_test_user@email.com',
+                'plaintext_password': 'testpw'
+            }
+
+            response = self.test_client.post(
+                '/authentication/login',
+                content_type='application/json',
+                data=json.dumps(data)
+            )
+            response = json.loads(response.data.decode('utf-8'))
+
+            claims = decode_token(response['new_jwt'], app.config)
+
+            self.assertEqual(claims['version'], TOKEN_CLAIMS_VERSION)
+            self.assertEqual(claims['user_id'], str(self.scheduled_uid))
+            self.assertEqual(claims['email'], 'auth_test_user@email.com')
+            self.assertEqual(claims['local_tz'], 'US/Central')
+            self.assertFalse(claims['is_premium'])
+            self.assertEqual(claims['submerchant_status'], 'none')
+
+    def test_refresh(self):
+        with app.app_context():
+            response = self.test_client.post(
+                '/authentication/refresh',
+                headers={'jwt': create_token(self.scheduled_uid, app.config)},
+            )
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            response = json.loads(response.data.decode('utf-8'))
+            claims = decode_token(response['new_jwt'], app.config)
+
+            self.assertEqual(claims['version'], TOKEN_CLAIMS_VERSION)
+            self.assertEqual(claims['local_tz'], 'US/Central')
+
+    def test_refresh_requires_token(self):
+        with app.app_context():
+            response = self.test_client.post('/authentication/refresh')
+
+            self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_email_route_authorized_by_user_id(self):
+        with app.app_context():
+            # The email claim is stale; only the user id counts.
+            token = create_token(
+                str(self.scheduled_uid),
+                app.config,
+                {'email': 'old-address@email.com'},
+            )
+
+            response = self.test_client.get(
+                '/users/email/auth_test_user@email.com',
+                headers={'jwt': token},
+            )
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            response = self.test_client.get(
+                '/users/email/old-address@email.com',
+                headers={'jwt': token},
+            )
+            self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_email_route_ignores_email_claim(self):
+        with app.app_context():
+            other_user = User(
+                'claimed-address@email.com',
+                'testpw',
+                'US/Central',
+                'claimed_address',
+            )
+            db.session.add(other_user)
+            db.session.commit()
+
+            token = create_token(
+                str(self.scheduled_uid),
+                app.config,
+                {'email': 'claimed-address@email.com'},
+            )
+
+            response = self.test_client.get(
+                '/users/email/claimed-address@email.com',
+                headers={'jwt': token},
+            )
+            self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
@@ -0,0 +1,190 @@
+from http import HTTPStatus
+from datetime import datetime, timedelta
+
+import unittest
+import json
+from unittest import mock
+
+from almanac.almanac import app
+from almanac.models import db
+from almanac.models import (
+    UserTable as User,
+    ScheduleTable as Schedule,
+    SubmerchantTable as Submerchant,
+    EventTable as Event,
+)
+from almanac.utils.security import create_token
+
+
+class AvailabilityEndpointTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            cls.test_client = app.test_client()
+
+            scheduling = User(
+                "availability_scheduling@email.com",
+                "testpw",
+                'UTC',
+                'availability_scheduling',
+            )
+
+            scheduled = User(
+                "availability_scheduled@email.com",
+                "testpw",
+                'UTC',
+                'availability_scheduled',
+            )
+
+            cls.scheduling_uid = scheduling.public_id
+            cls.scheduled_uid = scheduled.public_id
+
+            db.session.add(scheduling)
+            db.session.add(scheduled)
+            db.session.commit()
+
+            User.query.filter_by(
+                public_id=cls.scheduled_uid
+            ).update({
+                'sixty_min_price': 15
+            })
+
+            db.session.add(Submerchant(
+                cls.scheduled_uid,
+                'testaccountid',
+                'firstName',
+                'LastName',
+                'email',
+                datetime.utcnow() + timedelta(days=-365*20),
+                'address_street',
+                'address_locality',
+                'address_region',
+                'address_zip',
+            ))
+            db.session.commit()
+
+            cls.day = (datetime.utcnow() + timedelta(days=2)).replace(
+                hour=0,
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+            db.session.add(Schedule(
+                cls.day.replace(hour=9),
+                cls.day.replace(hour=13),
+                cls.scheduled_uid,
+                'UTC'
+            ))
+            db.session.add(Event(
+                cls.day.replace(hour=10),
+                cls.day.replace(hour=11),
+                cls.scheduling_uid,
+                cls.scheduled_uid,
+            ))
+            db.session.commit()
+
+    def test_get(self):
+        with app.app_context():
+            data = {
+                'window_start': self.day.isoformat(),
+                'window_end': (self.day + timedelta(days=1)).isoformat(),
+                'duration': 60,
+            }
+
+            response = self.test_client.get(
+                '/availability/{0}'.format(self.scheduled_uid),
+                content_type='application/json',
+                data=json.dumps(data),
+                headers={'jwt': create_token(self.scheduling_uid, app.config)}
+            )
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            slots = json.loads(str(response.data.decode('utf-8')))['slots']
+
+            self.assertEqual(
+                [slot['utc_start'][11:16] for slot in slots],
+                ['09:00', '11:00', '12:00'],
+            )
+
+    def test_get_keeps_open_schedule_on_its_grid(self):
+        now = self.day.replace(hour=9, minute=7, second=13, microsecond=123456)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def utcnow(cls):
+                return now
+
+        with app.app_context(), mock.patch(
+            'almanac.DAOs.availability_dao.datetime',
+            FrozenDatetime,
+        ):
+            data = {
+                'window_start': self.day.isoformat(),
+                'window_end': (self.day + timedelta(days=1)).isoformat(),
+                'duration': 30,
+            }
+
+            response = self.test_client.get(
+                '/availability/{0}'.format(self.scheduled_uid),
+                content_type='application/json',
+                data=json.dumps(data),
+                headers={'jwt': create_token(self.scheduling_uid, app.config)}
+            )
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+            slots = json.loads(str(response.data.decode('utf-8')))['slots']
+
+            self.assertEqual(
+                [slot['utc_start'][11:19] for slot in slots],
+                [
+                    '09:30:00', '11:00:00', '11:30:00', '12:00:00',
+                    '12:30:00',
+                ],
+            )
+
+    def test_get_fail_invalid_duration(self):
+        with app.app_context():
+            data = {
+                'window_start': self.day.isoformat(),
+                'window_end': (self.day + timedelta(days=1)).isoformat(),
+                'duration': 45,
+            }
+
+            response = self.test_client.get(
+                '/availability/{0}'.format(self.scheduled_uid),
+                content_type='application/json',
+                data=json.dumps(data),
+                headers={'jwt': create_token(self.scheduling_uid, app.config)}
+            )
+
+            self.assertNotEqual(response.status_code, HTTPStatus.OK)
+
+    def test_get_fail_window_too_large(self):
+        with app.app_context():
+            data = {
+                'window_start': self.day.isoformat(),
+                'window_end': (self.day + timedelta(days=60)).isoformat(),
+                'duration': 60,
+            }
+
+            response = self.test_client.get(
+                '/availability/{0}'.format(self.scheduled_uid),
+                content_type='application/json',
+                data=json.dumps(data),
+                headers={'jwt': create_token(self.scheduling_uid, app.config)}
+            )
+
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
@@ -420,9 +420,223 @@ class PaymentEventEndpointsTestCase(unittest.TestCase):
                 response['msg'].startswith("Invalid duration.")
             )
 
+    def _post_with_key(self, data, key):
+        return self.test_client.post(
+            '/events/',
+            content_type='application/json',
+            data=json.dumps(data),
+            headers={
+                'jwt': create_token(self.scheduling_uid, app.config),
+                'Idempotency-Key': key,
+            }
+        )
+
+    def _slot(self, start_hour, notes):
+        return {
+            'scheduled_user_id': self.scheduled_uid,
+            'localized_start_time': (
+                datetime.utcnow().replace(hour=start_hour) + timedelta(days=1)
+            ).strftime('%Y-%m-%d %H:%M:%S'),
+            'localized_end_time': (
+                datetime.utcnow().replace(hour=start_hour + 1) +
+                timedelta(days=1)
+            ).strftime('%Y-%m-%d %H:%M:%S'),
+            'local_tz': 'UTC',
+            'notes': notes,
+            'is_paid': True,
+            'nonce': 'fake-valid-debit-nonce',
+        }
+
+    @mock.patch('braintree.Transaction.sale')
+    def test_post_idempotent_retry(self, transaction_mock):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=9) + timedelta(days=1),
+                datetime.utcnow().replace(hour=12) + timedelta(days=1),
+                self.scheduled_uid,
+                'UTC',
+            ))
+            db.session.commit()
+
+            data = self._slot(10, 'idempotent-retry')
+
+            first = self._post_with_key(data, 'retry-key')
+            retry = self._post_with_key(data, 'retry-key')
+
+            self.assertEqual(first.status_code, HTTPStatus.OK)
+            self.assertEqual(retry.status_code, HTTPStatus.OK)
+            self.assertEqual(retry.data, first.data)
+            self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+            self.assertEqual(transaction_mock.call_count, 1)
+
+            self.assertEqual(
+                db.session.query(Event).filter_by(
+                    notes='idempotent-retry',
+                ).count(),
+                1,
+            )
+
+    @mock.patch('braintree.Transaction.sale')
+    def test_post_fail_idempotency_key_reused(self, transaction_mock):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=13) + timedelta(days=1),
+                datetime.utcnow().replace(hour=16) + timedelta(days=1),
+                self.scheduled_uid,
+                'UTC',
+            ))
+            db.session.commit()
+
+            first = self._post_with_key(self._slot(13, 'reused'), 'reused-key')
+            other = self._post_with_key(self._slot(14, 'reused'), 'reused-key')
+
+            self.assertEqual(first.status_code, HTTPStatus.OK)
+            self.assertEqual(
+                other.status_code,
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+            )
+            self.assertEqual(transaction_mock.call_count, 1)
+
     @classmethod
     def tearDownClass(cls):
         with app.app_context():
             if app.config['TEAR_DOWN_AFTER']:
                 db.drop_all()
 
+
+
+class EventHistoryEndpointTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            cls.test_client = app.test_client()
+
+            scheduling = User(
+                "history_scheduling@email.com",
+                "testpw",
+                'US/Central',
+                'history_scheduling',
+            )
+
+            scheduled = User(
+                "history_scheduled@email.com",
+                "testpw",
+                'US/Central',
+                'history_scheduled',
+            )
+
+            cls.scheduling_uid = scheduling.public_id
+            cls.scheduled_uid = scheduled.public_id
+
+            db.session.add(scheduling)
+            db.session.add(scheduled)
+            db.session.commit()
+
+            User.query.filter_by(
+                public_id=cls.scheduled_uid
+            ).update({
+                'sixty_min_price': 15
+            })
+
+            db.session.add(Submerchant(
+                cls.scheduled_uid,
+                'testaccountid',
+                'firstName',
+                'LastName',
+                'email',
+                datetime.utcnow() + timedelta(days=-365*20),
+                'address_street',
+                'address_locality',
+                'address_region',
+                'address_zip',
+            ))
+            db.session.commit()
+
+            cls.eids = []
+            for i in range(5):
+                start = datetime.utcnow().replace(
+                    hour=12,
+                    minute=0,
+                    second=0,
+                    microsecond=0,
+                ) - timedelta(days=90 * i)
+
+                new_event = Event(
+                    start,
+                    start + timedelta(minutes=60),
+                    cls.scheduling_uid,
+                    cls.scheduled_uid,
+                )
+
+                db.session.add(new_event)
+                db.session.commit()
+
+                cls.eids.append(new_event.public_id)
+
+    def _get_history(self, **data):
+        data.setdefault('is_scheduling', False)
+
+        return self.test_client.get(
+            '/events/{0}/history'.format(self.scheduled_uid),
+            content_type='application/json',
+            data=json.dumps(data),
+            headers={'jwt': create_token(self.scheduled_uid, app.config)}
+        )
+
+    def test_get_pages(self):
+        with app.app_context():
+            seen = []
+            cursor = None
+
+            while True:
+                response = self._get_history(limit=2, cursor=cursor)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+                response = json.loads(str(response.data.decode('utf-8')))
+                seen.extend(e['public_id'] for e in response['events'])
+
+                cursor = response['next_cursor']
+                if cursor is None:
+                    break
+
+            self.assertEqual(seen, self.eids)
+
+    def test_get_stream(self):
+        with app.app_context():
+            response = self._get_history(stream=True)
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.mimetype, 'application/x-ndjson')
+
+            lines = response.data.decode('utf-8').splitlines()
+            self.assertEqual(
+                [json.loads(line)['public_id'] for line in lines],
+                self.eids,
+            )
+
+    def test_get_fail_invalid_cursor(self):
+        with app.app_context():
+            response = self._get_history(cursor='not-a-cursor')
+
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_get_fail_other_user(self):
+        with app.app_context():
+            response = self.test_client.get(
+                '/events/{0}/history'.format(self.scheduled_uid),
+                content_type='application/json',
+                data=json.dumps({'is_scheduling': False}),
+                headers={'jwt': create_token(self.scheduling_uid, app.config)}
+            )
+
+            self.assertNotEqual(response.status_code, HTTPStatus.OK)
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
@@ -0,0 +1,198 @@
+import multiprocessing
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from unittest import mock
+
+import unittest
+
+from almanac.almanac import app
+from almanac.DAOs.event_dao import OVERLAP_CONSTRAINT
+from almanac.exc.exceptions import BaseAlmanacException
+from almanac.facades.paid_event_facade import EventFacade
+from almanac.models import db
+from almanac.models import UserTable as User, AddressTable as Address
+from almanac.models import ScheduleTable as Schedule
+from almanac.models import EventTable as Event, SubmerchantTable as Submerchant
+
+PROVIDERS = 4
+CONTENDERS_PER_PROVIDER = 8
+# How long the stubbed gateway takes to settle a sale, which is how long a
+# winning booking's slot stays held.
+GATEWAY_LATENCY = 0.2
+
+
+def _slow_sale(params):
+    time.sleep(GATEWAY_LATENCY)
+    return mock.MagicMock()
+
+
+def _book(scheduling_user, scheduled_user, start, barrier, results):
+    with app.app_context():
+        # The parent's pooled connections mustn't be shared with it.
+        db.get_engine(app).dispose()
+
+        barrier.wait()
+
+        try:
+            EventFacade().create_new_event(
+                scheduling_user,
+                scheduled_user,
+                start.strftime('%Y-%m-%d %H:%M:%S'),
+                (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                'UTC',
+                None,
+                'fake-nonce',
+            )
+        except BaseAlmanacException as e:
+            results.put((scheduled_user, e.status_code, e.msg))
+        else:
+            results.put((scheduled_user, HTTPStatus.OK, None))
+
+
+class BookingConcurrencyTestCase(unittest.TestCase):
+    """
+    Races several processes to book overlapping slots against each of a few
+    providers at the same moment. Exactly one booking per provider may win.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            # Created by the migrations, not `create_all`.
+            db.session.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            db.session.execute(
+                'ALTER TABLE events ADD CONSTRAINT {0} EXCLUDE USING gist '
+                '(scheduled_user_id WITH =, utc_duration WITH &&)'.format(
+                    OVERLAP_CONSTRAINT,
+                )
+            )
+            db.session.commit()
+
+            scheduling_user = User(
+                "race_scheduling_user@email.com",
+                "testpw",
+                'UTC',
+                'race_scheduling_user',
+            )
+            db.session.add(scheduling_user)
+            db.session.commit()
+
+            cls.scheduling_user = scheduling_user.public_id
+
+            db.session.add(Address(
+                cls.scheduling_user,
+                'test-first',
+                'test-last',
+                'test-street-address',
+                'test-locality',
+                'test-region',
+                '53703',
+                'US',
+                is_default=True,
+            ))
+
+            cls.day = (datetime.utcnow() + timedelta(days=2)).replace(
+                minute=0,
+                second=0,
+                microsecond=0,
+            )
+
+            cls.providers = []
+            for i in range(PROVIDERS):
+                provider = User(
+                    "race_provider{0}@email.com".format(i),
+                    "testpw",
+                    'UTC',
+                    'race_provider{0}'.format(i),
+                )
+                provider.sixty_min_price = 15
+                db.session.add(provider)
+                db.session.commit()
+
+                db.session.add(Submerchant(
+                    provider.public_id,
+                    'testaccountid{0}'.format(i),
+                    'firstName',
+                    'LastName',
+                    'email',
+                    datetime.utcnow() + timedelta(days=-365*20),
+                    'address_street',
+                    'address_locality',
+                    'address_region',
+                    'address_zip',
+                ))
+                db.session.add(Schedule(
+                    cls.day.replace(hour=8),
+                    cls.day.replace(hour=16),
+                    provider.public_id,
+                    'UTC',
+                ))
+                db.session.commit()
+
+                cls.providers.append(provider.public_id)
+
+            db.get_engine(app).dispose()
+
+    @mock.patch('braintree.Transaction.sale', side_effect=_slow_sale)
+    def test_no_double_bookings(self, transaction_mock):
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(PROVIDERS * CONTENDERS_PER_PROVIDER)
+        results = context.Queue()
+
+        processes = [
+            context.Process(
+                target=_book,
+                args=(
+                    self.scheduling_user,
+                    provider,
+                    # Every contender's hour overlaps every other's.
+                    self.day.replace(hour=10) + timedelta(
+                        minutes=15 * (i % 4),
+                    ),
+                    barrier,
+                    results,
+                ),
+            )
+            for provider in self.providers
+            for i in range(CONTENDERS_PER_PROVIDER)
+        ]
+
+        for process in processes:
+            process.start()
+
+        outcomes = [results.get(timeout=60) for _ in processes]
+
+        for process in processes:
+            process.join(timeout=60)
+
+        for provider in self.providers:
+            statuses = [
+                status
+                for scheduled_user, status, msg in outcomes
+                if scheduled_user == provider
+            ]
+
+            self.assertEqual(statuses.count(HTTPStatus.OK), 1)
+            self.assertEqual(
+                statuses.count(HTTPStatus.CONFLICT),
+                CONTENDERS_PER_PROVIDER - 1,
+            )
+
+        with app.app_context():
+            for provider in self.providers:
+                self.assertEqual(
+                    db.session.query(Event).filter_by(
+                        scheduled_user_id=provider,
+                    ).count(),
+                    1,
+                )
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
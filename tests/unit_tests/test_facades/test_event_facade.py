@@ -1,15 +1,19 @@
 from datetime import datetime, timedelta
+from http import HTTPStatus
 from unittest import mock
 
 import unittest
 
 from almanac.almanac import app
-from almanac.exc.exceptions import DAOException, FacadeException
+from almanac.DAOs.event_dao import EventDAO
+from almanac.exc.exceptions import DAOException, FacadeException, \
+    SQLException
 from almanac.facades.paid_event_facade import EventFacade
 from almanac.models import db
 from almanac.models import UserTable as User, AddressTable as Address
 from almanac.models import ScheduleTable as Schedule
 from almanac.models import EventTable as Event, SubmerchantTable as Submerchant
+from almanac.models import EventHoldTable as EventHold
 
 
 class TestPaidEventFacade(unittest.TestCase):
@@ -91,6 +95,208 @@ class TestPaidEventFacade(unittest.TestCase):
 
             db.session.commit()
 
+    @mock.patch('braintree.Transaction.sale')
+    def test_create_new_event_holds_then_commits(self, transaction_mock):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=10) + timedelta(days=1),
+                datetime.utcnow().replace(hour=14) + timedelta(days=1),
+                self.scheduled_user,
+                'UTC',
+            ))
+            db.session.commit()
+
+            with mock.patch.object(
+                EventDAO,
+                'lock_scheduled_user',
+                wraps=EventDAO().lock_scheduled_user,
+            ) as lock_mock:
+                EventFacade().create_new_event(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    (datetime.utcnow().replace(hour=11) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    (datetime.utcnow().replace(hour=12) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'UTC',
+                    'test-locks-and-commits',
+                    'fake-nonce',
+                )
+
+            # Once to place the hold, once to swap it for the event.
+            lock_mock.assert_has_calls([
+                mock.call(self.scheduled_user),
+                mock.call(self.scheduled_user),
+            ])
+            self.assertEqual(db.session.query(EventHold).count(), 0)
+
+            # Committed, not just flushed: visible from a fresh session.
+            db.session.remove()
+
+            found_event = db.session.query(
+                Event
+            ).filter_by(
+                notes='test-locks-and-commits',
+            ).first()
+
+            self.assertIsNotNone(found_event)
+
+    @mock.patch('braintree.Transaction.void')
+    @mock.patch('braintree.Transaction.sale')
+    def test_lost_hold_voids_sale(self, transaction_mock, void_mock):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=15) + timedelta(days=1),
+                datetime.utcnow().replace(hour=18) + timedelta(days=1),
+                self.scheduled_user,
+                'UTC',
+            ))
+            db.session.commit()
+
+            def sweep_during_sale(params):
+                db.session.query(EventHold).delete()
+                db.session.commit()
+
+                return transaction_mock.return_value
+
+            transaction_mock.side_effect = sweep_during_sale
+
+            with self.assertRaises(DAOException) as e:
+                EventFacade().create_new_event(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    (datetime.utcnow().replace(hour=16) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    (datetime.utcnow().replace(hour=17) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'UTC',
+                    'test-lost-hold',
+                    'fake-nonce',
+                )
+
+            self.assertEqual(e.exception.status_code, HTTPStatus.CONFLICT)
+            void_mock.assert_called_once_with(
+                transaction_mock.return_value.transaction.id
+            )
+
+            found_event = db.session.query(
+                Event
+            ).filter_by(
+                notes='test-lost-hold',
+            ).first()
+
+            self.assertIsNone(found_event)
+
+    @mock.patch('braintree.Transaction.void')
+    @mock.patch('braintree.Transaction.sale')
+    def test_failed_insert_voids_sale_and_frees_slot(
+            self,
+            transaction_mock,
+            void_mock,
+    ):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=21) + timedelta(days=1),
+                datetime.utcnow().replace(hour=23) + timedelta(days=1),
+                self.scheduled_user,
+                'UTC',
+            ))
+            db.session.commit()
+
+            def book():
+                return EventFacade().create_new_event(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    (datetime.utcnow().replace(hour=22) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    (datetime.utcnow().replace(hour=23) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'UTC',
+                    'test-failed-insert',
+                    'fake-nonce',
+                )
+
+            with mock.patch.object(
+                EventDAO,
+                'insert_events',
+                side_effect=SQLException('Error processing request.'),
+            ):
+                with self.assertRaises(SQLException):
+                    book()
+
+            void_mock.assert_called_once_with(
+                transaction_mock.return_value.transaction.id
+            )
+            self.assertEqual(db.session.query(EventHold).count(), 0)
+
+            book()
+
+            self.assertEqual(
+                db.session.query(Event).filter_by(
+                    notes='test-failed-insert',
+                ).count(),
+                1
+            )
+
+    @mock.patch(
+        'almanac.facades.paid_event_facade.BraintreePaymentFacade.void'
+    )
+    @mock.patch('braintree.Transaction.sale')
+    def test_failed_void_keeps_booking_error(
+            self,
+            transaction_mock,
+            void_mock,
+    ):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=0) + timedelta(days=1),
+                datetime.utcnow().replace(hour=2) + timedelta(days=1),
+                self.scheduled_user,
+                'UTC',
+            ))
+            db.session.commit()
+
+            void_mock.side_effect = RuntimeError('gateway timeout')
+
+            with mock.patch.object(
+                EventDAO,
+                'insert_events',
+                side_effect=SQLException('Error processing request.'),
+            ), mock.patch('logging.critical') as critical:
+                with self.assertRaises(SQLException):
+                    EventFacade().create_new_event(
+                        self.scheduling_user,
+                        self.scheduled_user,
+                        (datetime.utcnow().replace(hour=0) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                        (datetime.utcnow().replace(hour=1) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                        'UTC',
+                        'test-failed-void',
+                        'fake-nonce',
+                    )
+
+            self.assertTrue(critical.called)
+            self.assertEqual(db.session.query(EventHold).count(), 0)
+
+    @mock.patch('braintree.Transaction.sale')
+    def test_failed_sale_releases_hold(self, transaction_mock):
+        with app.app_context():
+            db.session.add(Schedule(
+                datetime.utcnow().replace(hour=19) + timedelta(days=1),
+                datetime.utcnow().replace(hour=21) + timedelta(days=1),
+                self.scheduled_user,
+                'UTC',
+            ))
+            db.session.commit()
+
+            transaction_mock.side_effect = RuntimeError('gateway timeout')
+
+            with self.assertRaises(FacadeException):
+                EventFacade().create_new_event(
+                    self.scheduling_user,
+                    self.scheduled_user,
+                    (datetime.utcnow().replace(hour=19) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    (datetime.utcnow().replace(hour=20) + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'UTC',
+                    'test-failed-sale',
+                    'fake-nonce',
+                )
+
+            self.assertEqual(db.session.query(EventHold).count(), 0)
+
     @mock.patch('braintree.Transaction.sale')
     def test_rollback_on_failure(self, transaction_mock):
         with app.app_context():
@@ -3,6 +3,7 @@ from unittest import mock
 
 from almanac.almanac import app
 from almanac.exc.exceptions import SQLException
+from almanac.DAOs.mail_queue_dao import MailQueueDAO
 from almanac.DAOs.user_dao import UserDAO
 from almanac.facades.user_facade import UserFacade
 from almanac.models import db
@@ -76,7 +77,7 @@ class UserDAOTestCase(unittest.TestCase):
                 found_user.verify_token in found_mail_queue.body
             )
 
-    @mock.patch('almanac.DAOs.mail_queue_dao.MailQueueDAO.push_to_queue')
+    @mock.patch('almanac.DAOs.mail_queue_dao.MailQueueDAO.push_to_outbox')
     def test_create_user_mail_queue_failure(self, mail_queue):
         mail_queue.side_effect = SQLException('Test')
 
@@ -105,6 +106,68 @@ class UserDAOTestCase(unittest.TestCase):
 
             self.assertIsNone(found_mail_queue)
 
+    def test_outbox_discarded_on_rollback(self):
+        with app.app_context():
+            MailQueueDAO().push_to_outbox(
+                'rolled-back@email.com',
+                'contact@kronikl.io',
+                'Subject',
+                'Body',
+            )
+            db.session.rollback()
+            db.session.commit()
+
+            found_mail_queue = db.session.query(
+                EmailQueue
+            ).filter_by(
+                email_to='rolled-back@email.com'
+            ).first()
+
+            self.assertIsNone(found_mail_queue)
+
+    def test_outbox_flushed_on_commit(self):
+        with app.app_context():
+            for i in range(3):
+                MailQueueDAO().push_to_outbox(
+                    'outbox-{0}@email.com'.format(i),
+                    'contact@kronikl.io',
+                    'Subject',
+                    'Body',
+                )
+
+            found_mail_queue = db.session.query(
+                EmailQueue
+            ).filter(
+                EmailQueue.email_to.like('outbox-%')
+            ).all()
+            self.assertEqual(len(found_mail_queue), 0)
+
+            db.session.commit()
+
+            found_mail_queue = db.session.query(
+                EmailQueue
+            ).filter(
+                EmailQueue.email_to.like('outbox-%')
+            ).all()
+            self.assertEqual(len(found_mail_queue), 3)
+
+    def test_regenerate_reset_token_queues_email(self):
+        with app.app_context():
+            new_token = self.test_facade.regenerate_reset_password_token(
+                'test@email.com'
+            )
+
+            found_mail_queue = db.session.query(
+                EmailQueue
+            ).filter_by(
+                email_to='test@email.com',
+                email_from='contact@kronikl.io',
+            ).all()
+
+            self.assertTrue(any(
+                str(new_token) in email.body for email in found_mail_queue
+            ))
+
     @classmethod
     def tearDownClass(cls):
         with app.app_context():
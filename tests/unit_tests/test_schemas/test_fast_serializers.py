@@ -0,0 +1,79 @@
+import decimal
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytz
+
+from almanac.schemas.fast_serializers import event_marshal, user_marshal
+from almanac.schemas.return_schemas import EventMarshal, UserMarshal
+
+
+class FastSerializersTestCase(unittest.TestCase):
+
+    def setUp(self):
+        start = pytz.utc.localize(datetime(2017, 6, 1, 9))
+
+        self.event = SimpleNamespace(
+            public_id='event-id',
+            scheduling_user_id='scheduling-id',
+            scheduled_user_id='scheduled-id',
+            utc_start=start,
+            utc_end=start.replace(hour=10),
+            scheduled_tz_start=start.astimezone(pytz.timezone('US/Central')),
+            scheduled_tz_end=datetime(2017, 6, 1, 5),
+            day_number=1,
+            duration=60,
+            total_price=decimal.Decimal('15.50'),
+            notes='',
+        )
+
+    def test_event_matches_marshmallow(self):
+        self.assertEqual(
+            event_marshal.dump(self.event),
+            EventMarshal().dump(self.event).data,
+        )
+
+    def test_event_many_matches_marshmallow(self):
+        events = [self.event, SimpleNamespace(), None]
+
+        self.assertEqual(
+            event_marshal.dump_many(events),
+            EventMarshal(many=True).dump(events).data,
+        )
+
+    def test_invalid_value_matches_marshmallow(self):
+        self.event.duration = 'not a number'
+
+        self.assertEqual(
+            event_marshal.dump(self.event),
+            EventMarshal().dump(self.event).data,
+        )
+        self.assertEqual(
+            event_marshal.dump_many([self.event]),
+            EventMarshal(many=True).dump([self.event]).data,
+        )
+
+    def test_user_matches_marshmallow(self):
+        user = SimpleNamespace(
+            public_id='user-id',
+            email='user@email.com',
+            is_premium=False,
+            sixty_min_price=decimal.Decimal('0'),
+            local_tz='US/Central',
+            username='user',
+            has_deposit_account=True,
+        )
+
+        dumped = user_marshal.dump(user)
+
+        self.assertEqual(dumped, UserMarshal().dump(user).data)
+        self.assertEqual(dumped['user_id'], 'user-id')
+
+    def test_dict_matches_marshmallow(self):
+        user = {'public_id': 'user-id', 'username': 'user'}
+
+        self.assertEqual(
+            user_marshal.dump(user),
+            UserMarshal().dump(user).data,
+        )
@@ -0,0 +1,68 @@
+import sys
+import unittest
+from unittest import mock
+
+import psycopg2
+import psycopg2.extensions
+
+from almanac.utils import cooperative
+
+
+class FakeConnection(object):
+    def __init__(self, states):
+        self.states = list(states)
+
+    def poll(self):
+        return self.states.pop(0)
+
+    def fileno(self):
+        return 7
+
+
+class GeventWaitCallbackTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.gevent_socket = mock.Mock()
+        gevent = mock.Mock(socket=self.gevent_socket)
+
+        patcher = mock.patch.dict(sys.modules, {
+            'gevent': gevent,
+            'gevent.socket': self.gevent_socket,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_waits_on_hub_until_ready(self):
+        conn = FakeConnection([
+            psycopg2.extensions.POLL_WRITE,
+            psycopg2.extensions.POLL_READ,
+            psycopg2.extensions.POLL_OK,
+        ])
+
+        cooperative.gevent_wait_callback(conn)
+
+        self.gevent_socket.wait_write.assert_called_once_with(7, timeout=None)
+        self.gevent_socket.wait_read.assert_called_once_with(7, timeout=None)
+        self.assertEqual(conn.states, [])
+
+    def test_ready_connection_never_waits(self):
+        cooperative.gevent_wait_callback(
+            FakeConnection([psycopg2.extensions.POLL_OK])
+        )
+
+        self.gevent_socket.wait_read.assert_not_called()
+        self.gevent_socket.wait_write.assert_not_called()
+
+    def test_bad_poll_state(self):
+        with self.assertRaises(psycopg2.OperationalError):
+            cooperative.gevent_wait_callback(FakeConnection([42]))
+
+    def test_patch_psycopg2(self):
+        with mock.patch(
+            'almanac.utils.cooperative.psycopg2.extensions.set_wait_callback'
+        ) as set_wait_callback:
+            cooperative.patch_psycopg2()
+
+        set_wait_callback.assert_called_once_with(
+            cooperative.gevent_wait_callback
+        )
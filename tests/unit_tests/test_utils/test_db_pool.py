@@ -0,0 +1,113 @@
+import sqlite3
+import unittest
+from unittest import mock
+
+import sqlalchemy
+from sqlalchemy.engine.url import make_url
+
+from almanac.utils import db_pool
+from almanac.utils.db_pool import AlmanacSQLAlchemy, InstrumentedNullPool, \
+    InstrumentedQueuePool, PingingQueuePool, PoolMetrics
+
+
+class InstrumentedPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = PoolMetrics(interval=0)
+        patcher = mock.patch.object(db_pool, 'pool_metrics', self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _engine(self, poolclass, **kwargs):
+        return sqlalchemy.create_engine(
+            'sqlite://',
+            poolclass=poolclass,
+            creator=lambda: sqlite3.connect(
+                ':memory:',
+                check_same_thread=False,
+            ),
+            **kwargs
+        )
+
+    def test_tracks_in_use(self):
+        engine = self._engine(InstrumentedQueuePool, pool_size=2)
+
+        first = engine.connect()
+        second = engine.connect()
+        self.assertEqual(self.metrics.in_use, 2)
+
+        first.close()
+        second.close()
+        self.assertEqual(self.metrics.in_use, 0)
+        self.assertEqual(self.metrics.snapshot()['in_use_max'], 2)
+        self.assertEqual(self.metrics.snapshot()['checkouts'], 2)
+
+    def test_counts_timeouts(self):
+        engine = self._engine(
+            InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.01,
+        )
+
+        conn = engine.connect()
+        with self.assertRaises(sqlalchemy.exc.TimeoutError):
+            engine.connect()
+        conn.close()
+
+        self.assertEqual(self.metrics.snapshot()['timeouts'], 1)
+        self.assertEqual(self.metrics.in_use, 0)
+
+    def test_pre_ping_replaces_dead_connections(self):
+        engine = self._engine(PingingQueuePool, pool_size=1)
+
+        conn = engine.connect()
+        conn.close()
+        engine.pool._pool.queue[0].connection.close()
+
+        conn = engine.connect()
+        self.assertEqual(conn.scalar('SELECT 1'), 1)
+        conn.close()
+
+        self.assertEqual(self.metrics.in_use, 0)
+
+    def test_null_pool(self):
+        engine = self._engine(InstrumentedNullPool)
+
+        conn = engine.connect()
+        self.assertEqual(self.metrics.in_use, 1)
+        conn.close()
+        self.assertEqual(self.metrics.in_use, 0)
+
+
+class PoolClassTestCase(unittest.TestCase):
+
+    def _options(self, **config):
+        app = mock.Mock(config=dict(config))
+        options = {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30}
+
+        with mock.patch('flask_sqlalchemy.SQLAlchemy.apply_driver_hacks'):
+            AlmanacSQLAlchemy().apply_driver_hacks(
+                app,
+                make_url('postgresql://localhost/test'),
+                options,
+            )
+
+        return options
+
+    def test_queue_pool(self):
+        self.assertIs(
+            self._options()['poolclass'],
+            InstrumentedQueuePool
+        )
+        self.assertIs(
+            self._options(DB_POOL_PRE_PING=True)['poolclass'],
+            PingingQueuePool
+        )
+
+    def test_pgbouncer(self):
+        options = self._options(DB_PGBOUNCER=True, DB_POOL_PRE_PING=True)
+
+        self.assertIs(options['poolclass'], InstrumentedNullPool)
+        self.assertNotIn('pool_size', options)
+        self.assertNotIn('max_overflow', options)
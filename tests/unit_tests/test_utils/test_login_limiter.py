@@ -0,0 +1,228 @@
+import unittest
+from unittest import mock
+
+from almanac.almanac import app
+from almanac.exc.exceptions import LoginThrottledException
+from almanac.utils import login_limiter
+from almanac.utils.login_limiter import LocalLoginLimiter, \
+    RedisLoginLimiter, admit_login, reset_login_attempts
+
+
+class LocalLoginLimiterTestCase(unittest.TestCase):
+
+    def test_allows_up_to_limit(self):
+        limiter = LocalLoginLimiter()
+
+        with mock.patch('time.monotonic', return_value=100):
+            self.assertEqual(limiter.hit('a', 2, 60), 0)
+            self.assertEqual(limiter.hit('a', 2, 60), 0)
+            self.assertEqual(limiter.hit('a', 2, 60), 60)
+
+            self.assertEqual(limiter.hit('b', 2, 60), 0)
+
+    def test_window_slides(self):
+        limiter = LocalLoginLimiter()
+
+        with mock.patch('time.monotonic', return_value=100):
+            limiter.hit('a', 2, 60)
+        with mock.patch('time.monotonic', return_value=130):
+            limiter.hit('a', 2, 60)
+            self.assertEqual(limiter.hit('a', 2, 60), 30)
+
+        # The first attempt has left the window but the second hasn't.
+        with mock.patch('time.monotonic', return_value=161):
+            self.assertEqual(limiter.hit('a', 2, 60), 0)
+            self.assertEqual(limiter.hit('a', 2, 60), 29)
+
+    def test_rejected_attempts_are_not_counted(self):
+        limiter = LocalLoginLimiter()
+
+        with mock.patch('time.monotonic', return_value=100):
+            limiter.hit('a', 1, 60)
+        with mock.patch('time.monotonic', return_value=150):
+            limiter.hit('a', 1, 60)
+        with mock.patch('time.monotonic', return_value=161):
+            self.assertEqual(limiter.hit('a', 1, 60), 0)
+
+    def test_reset(self):
+        limiter = LocalLoginLimiter()
+        limiter.hit('a', 1, 60)
+        limiter.reset('a')
+
+        self.assertEqual(limiter.hit('a', 1, 60), 0)
+
+    def test_evicts_least_recently_used(self):
+        limiter = LocalLoginLimiter(max_size=2)
+        limiter.hit('a', 1, 60)
+        limiter.hit('b', 1, 60)
+        limiter.hit('c', 1, 60)
+
+        self.assertEqual(limiter.hit('a', 1, 60), 0)
+        self.assertNotEqual(limiter.hit('c', 1, 60), 0)
+
+
+class FakeRedis(object):
+    """
+    Just enough of redis-py 3's StrictRedis (sorted sets and pipelines) to
+    run `RedisLoginLimiter` against. Signatures match redis-py 3, so calls
+    still written for 2.x fail here as they would in production.
+    """
+    def __init__(self):
+        self.zsets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def delete(self, *names):
+        for name in names:
+            self.zsets.pop(name, None)
+
+
+class FakePipeline(object):
+
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append(
+                lambda: getattr(self, '_' + name)(*args, **kwargs)
+            )
+        return queue
+
+    def execute(self):
+        return [command() for command in self._commands]
+
+    def _zset(self, name):
+        return self._client.zsets.setdefault(name, {})
+
+    def _zremrangebyscore(self, name, min, max):
+        zset = self._zset(name)
+        removed = [m for m, score in zset.items() if min <= score <= max]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    def _zadd(self, name, mapping, nx=False, xx=False, ch=False, incr=False):
+        zset = self._zset(name)
+        added = len(set(mapping) - set(zset))
+        zset.update(mapping)
+        return added
+
+    def _zcard(self, name):
+        return len(self._zset(name))
+
+    def _expire(self, name, time):
+        return True
+
+    def _ranked(self, name):
+        return sorted(self._zset(name).items(), key=lambda item: item[1])
+
+    def _zremrangebyrank(self, name, min, max):
+        ranked = self._ranked(name)
+        removed = ranked[min:len(ranked) + max + 1 if max < 0 else max + 1]
+        for member, _ in removed:
+            del self._zset(name)[member]
+        return len(removed)
+
+    def _zrange(self, name, start, end, withscores=False):
+        ranked = self._ranked(name)[start:end + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+
+class RedisLoginLimiterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeRedis()
+        self.limiter = RedisLoginLimiter(None, client=self.client)
+
+    def test_allows_up_to_limit(self):
+        with mock.patch('time.time', return_value=100):
+            self.assertEqual(self.limiter.hit('a', 2, 60), 0)
+            self.assertEqual(self.limiter.hit('a', 2, 60), 0)
+            self.assertEqual(self.limiter.hit('a', 2, 60), 60)
+
+            self.assertEqual(self.limiter.hit('b', 2, 60), 0)
+
+    def test_rejected_attempts_are_not_counted(self):
+        with mock.patch('time.time', return_value=100):
+            self.limiter.hit('a', 1, 60)
+            self.limiter.hit('a', 1, 60)
+        with mock.patch('time.time', return_value=130):
+            self.assertEqual(self.limiter.hit('a', 1, 60), 30)
+        with mock.patch('time.time', return_value=161):
+            self.assertEqual(self.limiter.hit('a', 1, 60), 0)
+
+    def test_reset(self):
+        self.limiter.hit('a', 1, 60)
+        self.limiter.reset('a')
+
+        self.assertEqual(self.limiter.hit('a', 1, 60), 0)
+
+    def test_fails_open_when_redis_is_down(self):
+        import redis
+
+        with mock.patch.object(
+            self.client,
+            'pipeline',
+            side_effect=redis.ConnectionError('down'),
+        ), mock.patch('logging.critical') as critical:
+            self.assertEqual(self.limiter.hit('a', 0, 60), 0)
+
+        self.assertTrue(critical.called)
+
+    def test_does_not_swallow_other_errors(self):
+        with mock.patch.object(
+            self.client,
+            'pipeline',
+            side_effect=TypeError('bad call'),
+        ):
+            with self.assertRaises(TypeError):
+                self.limiter.hit('a', 0, 60)
+
+
+class AdmitLoginTestCase(unittest.TestCase):
+
+    def setUp(self):
+        login_limiter._limiter = LocalLoginLimiter()
+
+    def tearDown(self):
+        login_limiter._limiter = None
+
+    def test_limits_by_identity(self):
+        with app.app_context(), mock.patch.dict(app.config, {
+            'LOGIN_LIMIT_ATTEMPTS': 2,
+            'LOGIN_LIMIT_IP_ATTEMPTS': 100,
+        }):
+            admit_login('User@email.com', '10.0.0.1')
+            admit_login('user@email.com ', '10.0.0.2')
+
+            with self.assertRaises(LoginThrottledException) as e:
+                admit_login('user@email.com', '10.0.0.3')
+
+            self.assertGreater(e.exception.retry_after, 0)
+
+            admit_login('other@email.com', '10.0.0.3')
+
+    def test_limits_by_ip(self):
+        with app.app_context(), mock.patch.dict(app.config, {
+            'LOGIN_LIMIT_ATTEMPTS': 100,
+            'LOGIN_LIMIT_IP_ATTEMPTS': 2,
+        }):
+            admit_login('a@email.com', '10.0.0.1')
+            admit_login('b@email.com', '10.0.0.1')
+
+            with self.assertRaises(LoginThrottledException):
+                admit_login('c@email.com', '10.0.0.1')
+
+            admit_login('c@email.com', '10.0.0.2')
+
+    def test_success_resets_identity(self):
+        with app.app_context(), mock.patch.dict(app.config, {
+            'LOGIN_LIMIT_ATTEMPTS': 1,
+            'LOGIN_LIMIT_IP_ATTEMPTS': 100,
+        }):
+            admit_login('user@email.com', '10.0.0.1')
+            reset_login_attempts('user@email.com')
+            admit_login('user@email.com', '10.0.0.1')
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+from almanac.exc.exceptions import PasswordHashingException
+from almanac.utils.password_hasher import InlineHasher, ProcessPoolHasher
+
+
+class InlineHasherTestCase(unittest.TestCase):
+
+    def test_hash_and_check(self):
+        hasher = InlineHasher()
+        hashed = hasher.hash(b'testpw', 4)
+
+        self.assertTrue(hasher.check(b'testpw', hashed))
+        self.assertFalse(hasher.check(b'wrongpw', hashed))
+
+
+class ProcessPoolHasherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.hasher = ProcessPoolHasher(max_workers=1, max_pending=0, timeout=5)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    def test_hash_and_check(self):
+        hashed = self.hasher.hash(b'testpw', 4)
+
+        self.assertTrue(self.hasher.check(b'testpw', hashed))
+        self.assertFalse(self.hasher.check(b'wrongpw', hashed))
+        self.assertTrue(InlineHasher().check(b'testpw', hashed))
+
+    def test_saturated_fails_fast(self):
+        busy = threading.Thread(target=self.hasher._submit, args=(time.sleep, 1))
+        busy.start()
+        time.sleep(0.1)
+
+        try:
+            started = time.monotonic()
+            with self.assertRaises(PasswordHashingException) as e:
+                self.hasher.check(b'testpw', b'irrelevant')
+
+            self.assertEqual(
+                e.exception.status_code,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+            self.assertLess(time.monotonic() - started, 0.5)
+        finally:
+            busy.join()
+
+    def test_timeout(self):
+        self.hasher.timeout = 0.1
+
+        with self.assertRaises(PasswordHashingException) as e:
+            self.hasher._submit(time.sleep, 1)
+
+        self.assertEqual(
+            e.exception.status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+        )
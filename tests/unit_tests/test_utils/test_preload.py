@@ -0,0 +1,50 @@
+import gc
+import unittest
+from unittest import mock
+
+from almanac.almanac import app
+from almanac.models import db
+from almanac.models import UserTable as User
+from almanac.utils import preload
+
+
+class WarmUpTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            db.session.add(User(
+                'preload@email.com',
+                'testpw',
+                'Asia/Tokyo',
+                'preload',
+            ))
+            db.session.commit()
+
+    def tearDown(self):
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    def test_loads_user_zones(self):
+        with mock.patch('almanac.utils.preload.pytz.timezone') as timezone:
+            preload.warm_up(app)
+
+        timezone.assert_any_call('Asia/Tokyo')
+
+    def test_schemas_found(self):
+        from almanac.schemas import return_schemas
+
+        schemas = preload._schemas(return_schemas)
+
+        self.assertIn(return_schemas.EventMarshal, schemas)
+        self.assertIn(return_schemas.UserMarshal, schemas)
+
+    def test_survives_db_errors(self):
+        with mock.patch(
+            'almanac.utils.preload.db.session.query',
+            side_effect=Exception('no db'),
+        ):
+            self.assertEqual(preload._load_user_zones(app), [])
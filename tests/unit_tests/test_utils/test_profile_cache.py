@@ -0,0 +1,155 @@
+import unittest
+from unittest import mock
+
+from almanac.almanac import app
+from almanac.DAOs.user_dao import UserDAO
+from almanac.facades.user_facade import UserFacade
+from almanac.models import db
+from almanac.models import UserTable as User
+from almanac.utils.profile_cache import LocalProfileCache, \
+    RedisProfileCache, get_profile_cache
+
+
+class LocalProfileCacheTestCase(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = LocalProfileCache()
+        cache.set('a', {'username': 'a'})
+
+        self.assertEqual(cache.get('a'), {'username': 'a'})
+        self.assertIsNone(cache.get('b'))
+
+    def test_delete(self):
+        cache = LocalProfileCache()
+        cache.set('a', {'username': 'a'})
+        cache.delete('a')
+
+        self.assertIsNone(cache.get('a'))
+
+    def test_expires(self):
+        cache = LocalProfileCache(ttl=10)
+
+        with mock.patch('time.monotonic', return_value=100):
+            cache.set('a', {'username': 'a'})
+
+        with mock.patch('time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('a'))
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalProfileCache(max_size=2)
+        cache.set('a', {})
+        cache.set('b', {})
+        cache.get('a')
+        cache.set('c', {})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class FakeRedis(object):
+    """
+    The few StrictRedis calls `RedisProfileCache` makes, over a dict which
+    can be shared to stand in for several workers.
+    """
+    def __init__(self, store=None):
+        self.store = {} if store is None else store
+
+    def get(self, name):
+        return self.store.get(name)
+
+    def setex(self, name, time, value):
+        self.store[name] = value.encode('utf-8')
+
+    def delete(self, *names):
+        for name in names:
+            self.store.pop(name, None)
+
+
+class RedisProfileCacheTestCase(unittest.TestCase):
+
+    def test_private_fields_stay_in_process(self):
+        client = FakeRedis()
+        cache = RedisProfileCache(None, client=client)
+        cache.set('a', {'username': 'a', 'email': 'a@email.com'})
+
+        self.assertNotIn(b'a@email.com', client.store[cache.KEY_PREFIX + 'a'])
+        self.assertEqual(
+            cache.get('a'),
+            {'username': 'a', 'email': 'a@email.com'},
+        )
+
+    def test_other_worker_misses_without_private_fields(self):
+        client = FakeRedis()
+        RedisProfileCache(None, client=client).set(
+            'a',
+            {'username': 'a', 'email': 'a@email.com'},
+        )
+
+        other_worker = RedisProfileCache(None, client=FakeRedis(client.store))
+        self.assertIsNone(other_worker.get('a'))
+
+    def test_delete(self):
+        cache = RedisProfileCache(None, client=FakeRedis())
+        cache.set('a', {'username': 'a', 'email': 'a@email.com'})
+        cache.delete('a')
+
+        self.assertIsNone(cache.get('a'))
+
+
+class ProfileCacheInvalidationTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            test_user = User(
+                "profile-cache@email.com",
+                "testpw",
+                'US/Central',
+                'profilecache',
+            )
+
+            cls.test_uid = test_user.public_id
+            cls.test_verify_token = test_user.verify_token
+
+            db.session.add(test_user)
+            db.session.commit()
+
+    def test_put_invalidates_profile(self):
+        with app.app_context():
+            profile = UserFacade().get_user_profile_by_id(self.test_uid)
+            self.assertIsNone(profile['sixty_min_price'])
+
+            UserDAO().put(self.test_uid, sixty_min_price=25.0)
+
+            profile = UserFacade().get_user_profile_by_id(self.test_uid)
+            self.assertEqual(profile['sixty_min_price'], 25.0)
+
+    def test_hit_skips_db(self):
+        with app.app_context():
+            UserFacade().get_user_profile_by_id(self.test_uid)
+
+            with mock.patch(
+                'almanac.facades.user_facade.UserDAO'
+            ) as dao:
+                profile = UserFacade().get_user_profile_by_id(self.test_uid)
+
+            dao.assert_not_called()
+            self.assertEqual(profile['email'], 'profile-cache@email.com')
+
+    def test_verify_invalidates_profile(self):
+        with app.app_context():
+            UserFacade().get_user_profile_by_id(self.test_uid)
+
+            UserDAO().verify_token(self.test_verify_token)
+
+            self.assertIsNone(get_profile_cache().get(str(self.test_uid)))
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
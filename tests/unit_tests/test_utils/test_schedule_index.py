@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime, timedelta
+
+from almanac.utils.schedule_index import IntervalIndex
+
+
+class IntervalIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.base = datetime(2017, 10, 1)
+
+        self.index = IntervalIndex([
+            (self._at(9), self._at(12), 'morning'),
+            (self._at(13), self._at(17), 'afternoon'),
+            (self._at(16), self._at(20), 'evening'),
+        ])
+
+    def _at(self, hour, minute=0):
+        return self.base + timedelta(hours=hour, minutes=minute)
+
+    def test_covers(self):
+        self.assertTrue(self.index.covers(self._at(9), self._at(10)))
+        self.assertTrue(self.index.covers(self._at(11), self._at(12)))
+        self.assertTrue(self.index.covers(self._at(17), self._at(20)))
+
+    def test_covers_fail_spans_two_schedules(self):
+        self.assertFalse(self.index.covers(self._at(11), self._at(14)))
+
+    def test_covers_fail_outside_schedules(self):
+        self.assertFalse(self.index.covers(self._at(7), self._at(8)))
+        self.assertFalse(self.index.covers(self._at(12), self._at(13)))
+        self.assertFalse(self.index.covers(self._at(19), self._at(21)))
+
+    def test_overlaps(self):
+        self.assertTrue(self.index.overlaps(self._at(8), self._at(10)))
+        self.assertTrue(self.index.overlaps(self._at(16), self._at(17)))
+
+    def test_overlaps_half_open_bounds(self):
+        self.assertFalse(self.index.overlaps(self._at(12), self._at(13)))
+        self.assertFalse(self.index.overlaps(self._at(20), self._at(21)))
+
+    def test_overlaps_excluding_self(self):
+        self.assertFalse(
+            self.index.overlaps(
+                self._at(8),
+                self._at(12, 30),
+                exclude='morning',
+            )
+        )
+        self.assertTrue(
+            self.index.overlaps(
+                self._at(12),
+                self._at(14),
+                exclude='morning',
+            )
+        )
+
+    def test_overlapping(self):
+        self.assertEqual(
+            list(self.index.overlapping(self._at(11), self._at(17))),
+            ['morning', 'afternoon', 'evening'],
+        )
+
+    def test_empty_index(self):
+        empty = IntervalIndex([])
+
+        self.assertEqual(len(empty), 0)
+        self.assertFalse(empty.covers(self._at(9), self._at(10)))
+        self.assertFalse(empty.overlaps(self._at(9), self._at(10)))
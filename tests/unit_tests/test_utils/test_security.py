@@ -0,0 +1,159 @@
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import jwt
+
+from almanac.utils import security
+from almanac.utils.security import build_user_claims, create_token, \
+    decode_token, is_public_endpoint
+
+
+class DecodeTokenTestCase(unittest.TestCase):
+
+    def setUp(self):
+        security._verified_tokens.clear()
+
+        self.config = {
+            'JWT_KEY': 'testsecretkey',
+            'JWT_EXPIRATION': 15,
+            'JWT_CACHE_SIZE': 2,
+        }
+
+    def test_decode_is_cached(self):
+        token = create_token('user-id', self.config)
+
+        with mock.patch(
+            'almanac.utils.security.jwt.decode',
+            wraps=jwt.decode,
+        ) as decode:
+            first = decode_token(token, self.config)
+            second = decode_token(token.decode('utf-8'), self.config)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first['user_id'], 'user-id')
+
+    def test_cached_claims_are_copies(self):
+        token = create_token('user-id', self.config)
+
+        decode_token(token, self.config)['user_id'] = 'someone-else'
+
+        self.assertEqual(decode_token(token, self.config)['user_id'], 'user-id')
+
+    def test_expired_token_not_cached(self):
+        token = jwt.encode({
+            'user_id': 'user-id',
+            'expiration': str(datetime.utcnow() - timedelta(minutes=1)),
+        }, self.config['JWT_KEY'])
+
+        decode_token(token, self.config)
+
+        self.assertEqual(len(security._verified_tokens), 0)
+
+    def test_cache_is_bounded(self):
+        for user_id in ('a', 'b', 'c'):
+            decode_token(create_token(user_id, self.config), self.config)
+
+        self.assertEqual(len(security._verified_tokens), 2)
+
+    def test_invalid_signature_raises(self):
+        token = jwt.encode({'user_id': 'user-id'}, 'not-the-key')
+
+        with self.assertRaises(jwt.DecodeError):
+            decode_token(token, self.config)
+
+
+class PublicEndpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'PUBLIC_ENDPOINTS': {
+                'api_v1_authentication': None,
+                'api_v1_users_new_user': frozenset(['POST']),
+            }
+        }
+
+    def test_public_for_all_methods(self):
+        self.assertTrue(
+            is_public_endpoint(self.config, 'api_v1_authentication', 'GET')
+        )
+
+    def test_public_for_some_methods(self):
+        self.assertTrue(
+            is_public_endpoint(self.config, 'api_v1_users_new_user', 'POST')
+        )
+        self.assertFalse(
+            is_public_endpoint(self.config, 'api_v1_users_new_user', 'GET')
+        )
+
+    def test_unknown_endpoint(self):
+        self.assertFalse(is_public_endpoint(self.config, 'api_v1_events', 'GET'))
+        self.assertFalse(is_public_endpoint(self.config, None, 'GET'))
+
+
+class UserClaimsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'JWT_KEY': 'testsecretkey',
+            'JWT_EXPIRATION': 15,
+        }
+        self.user = SimpleNamespace(
+            email='claims@email.com',
+            username='claims',
+            local_tz='US/Central',
+            is_premium=True,
+        )
+
+    def test_build_claims_without_submerchant(self):
+        claims = build_user_claims(self.user)
+
+        self.assertEqual(claims['local_tz'], 'US/Central')
+        self.assertTrue(claims['is_premium'])
+        self.assertEqual(
+            claims['submerchant_status'],
+            security.SUBMERCHANT_NONE
+        )
+
+    def test_build_claims_submerchant_status(self):
+        self.user.is_approved = False
+        self.user.is_rejected = False
+        self.assertEqual(
+            build_user_claims(self.user)['submerchant_status'],
+            security.SUBMERCHANT_PENDING
+        )
+
+        self.user.is_approved = True
+        self.assertEqual(
+            build_user_claims(self.user)['submerchant_status'],
+            security.SUBMERCHANT_APPROVED
+        )
+
+        self.user.is_approved = False
+        self.user.is_rejected = True
+        self.assertEqual(
+            build_user_claims(self.user)['submerchant_status'],
+            security.SUBMERCHANT_REJECTED
+        )
+
+    def test_token_carries_versioned_claims(self):
+        token = create_token(
+            'user-id',
+            self.config,
+            build_user_claims(self.user),
+        )
+        claims = jwt.decode(token, self.config['JWT_KEY'])
+
+        self.assertEqual(claims['version'], security.TOKEN_CLAIMS_VERSION)
+        self.assertEqual(claims['user_id'], 'user-id')
+        self.assertEqual(claims['email'], 'claims@email.com')
+
+    def test_token_without_claims_is_unversioned(self):
+        claims = jwt.decode(
+            create_token('user-id', self.config),
+            self.config['JWT_KEY']
+        )
+
+        self.assertNotIn('version', claims)
@@ -0,0 +1,108 @@
+import unittest
+
+from sqlalchemy import event
+
+from almanac.almanac import app
+from almanac.DAOs.user_dao import UserDAO
+from almanac.exc.exceptions import DAOException
+from almanac.models import db
+from almanac.models import UserTable as User
+from almanac.utils.user_loader import get_user_loader
+
+
+class UserLoaderTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            first_user = User(
+                "loader-first@email.com",
+                "testpw",
+                'US/Central',
+                'loaderfirst',
+            )
+
+            second_user = User(
+                "loader-second@email.com",
+                "testpw",
+                'US/Central',
+                'loadersecond',
+            )
+
+            deleted_user = User(
+                "loader-deleted@email.com",
+                "testpw",
+                'US/Central',
+                'loaderdeleted',
+            )
+            deleted_user.is_deleted = True
+
+            cls.first_uid = first_user.public_id
+            cls.second_uid = second_user.public_id
+            cls.deleted_uid = deleted_user.public_id
+
+            db.session.add(first_user)
+            db.session.add(second_user)
+            db.session.add(deleted_user)
+            db.session.commit()
+
+    def setUp(self):
+        self.statements = []
+
+    def _count_statements(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def test_primed_users_load_in_one_query(self):
+        with app.app_context():
+            event.listen(
+                db.engine,
+                'before_cursor_execute',
+                self._count_statements,
+            )
+
+            try:
+                loader = get_user_loader()
+                loader.prime(self.first_uid, self.second_uid)
+
+                first = loader.load(self.first_uid)
+                second = loader.load(self.second_uid)
+                first_again = UserDAO().get(self.first_uid)
+            finally:
+                event.remove(
+                    db.engine,
+                    'before_cursor_execute',
+                    self._count_statements,
+                )
+
+            self.assertEqual(len(self.statements), 1)
+            self.assertEqual(first.public_id, self.first_uid)
+            self.assertEqual(second.public_id, self.second_uid)
+            self.assertIs(first, first_again)
+
+    def test_get_by_email_shares_cache(self):
+        with app.app_context():
+            by_email = UserDAO().get_by_email('loader-first@email.com')
+            by_id = UserDAO().get(self.first_uid)
+
+            self.assertIs(by_email, by_id)
+
+    def test_get_fail_deleted_user(self):
+        with app.app_context():
+            with self.assertRaises(DAOException):
+                UserDAO().get(self.deleted_uid)
+
+    def test_loader_is_request_scoped(self):
+        with app.app_context():
+            first_loader = get_user_loader()
+
+        with app.app_context():
+            self.assertIsNot(first_loader, get_user_loader())
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            if app.config['TEAR_DOWN_AFTER']:
+                db.drop_all()
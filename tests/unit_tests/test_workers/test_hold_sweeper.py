@@ -0,0 +1,77 @@
+import unittest
+
+from almanac.workers.hold_sweeper import HoldSweeper, SWEPT_TABLES
+
+
+class InMemoryStore(object):
+
+    def __init__(self, expired, expired_keys=0):
+        self.expired = {
+            'event_holds': expired,
+            'idempotency_keys': expired_keys,
+        }
+        self.batches = []
+        self.closed = False
+
+    def delete_expired(self, table, limit):
+        deleted = min(limit, self.expired[table])
+        self.expired[table] -= deleted
+        self.batches.append((table, deleted))
+        return deleted
+
+    def close(self):
+        self.closed = True
+
+
+class HoldSweeperTestCase(unittest.TestCase):
+
+    def test_sweep_deletes_in_batches(self):
+        store = InMemoryStore(5)
+        sweeper = HoldSweeper(store, batch_size=2)
+
+        swept = sweeper.sweep_once()
+
+        self.assertEqual(swept, 5)
+        self.assertEqual(store.batches, [
+            ('event_holds', 2),
+            ('event_holds', 2),
+            ('event_holds', 1),
+            ('idempotency_keys', 0),
+        ])
+
+    def test_sweep_every_table(self):
+        store = InMemoryStore(1, expired_keys=3)
+        sweeper = HoldSweeper(store, batch_size=10)
+
+        self.assertEqual(sweeper.sweep_once(), 4)
+        self.assertEqual(
+            [table for table, deleted in store.batches],
+            list(SWEPT_TABLES),
+        )
+
+    def test_sweep_stops_on_short_batch(self):
+        store = InMemoryStore(0)
+        sweeper = HoldSweeper(store, batch_size=2)
+
+        self.assertEqual(sweeper.sweep_once(), 0)
+        self.assertEqual(store.batches, [
+            ('event_holds', 0),
+            ('idempotency_keys', 0),
+        ])
+
+    def test_run_until_stopped(self):
+        store = InMemoryStore(3)
+        sweeper = HoldSweeper(store, batch_size=10, interval=0)
+
+        original = store.delete_expired
+
+        def delete_then_stop(table, limit):
+            sweeper.stop()
+            return original(table, limit)
+
+        store.delete_expired = delete_then_stop
+
+        sweeper.run()
+
+        self.assertEqual(store.expired['event_holds'], 0)
+        self.assertTrue(store.closed)
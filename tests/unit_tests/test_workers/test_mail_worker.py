@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+
+from almanac.workers.mail_worker import MailWorker, QueuedMail
+
+
+class InMemoryStore(object):
+
+    def __init__(self, mails):
+        self.pending = list(mails)
+        self.sent = []
+        self.failed = []
+
+    def claim_batch(self, limit):
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return [mail._replace(attempts=mail.attempts + 1) for mail in batch]
+
+    def mark_sent(self, mail_id):
+        self.sent.append(mail_id)
+
+    def mark_failed(self, mail_id, error, retry_in=None):
+        self.failed.append((mail_id, error, retry_in))
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(object):
+
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def send(self, mail):
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        await asyncio.sleep(0)
+
+        self.in_flight -= 1
+        if mail.id in self.fail_for:
+            raise RuntimeError('relay unavailable')
+
+
+class MailWorkerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _mails(self, count, attempts=0):
+        return [
+            QueuedMail(i, 'to@example.com', 'from@example.com', 'Hi', 'Body',
+                       attempts)
+            for i in range(count)
+        ]
+
+    def test_drain_sends_in_batches(self):
+        store = InMemoryStore(self._mails(5))
+        worker = MailWorker(store, RecordingTransport(), batch_size=2)
+
+        claimed = self.loop.run_until_complete(worker.drain_once())
+
+        self.assertEqual(claimed, 2)
+        self.assertEqual(sorted(store.sent), [0, 1])
+        self.assertEqual(len(store.pending), 3)
+
+    def test_concurrency_is_bounded(self):
+        store = InMemoryStore(self._mails(20))
+        transport = RecordingTransport()
+        worker = MailWorker(store, transport, batch_size=20, concurrency=3)
+
+        self.loop.run_until_complete(worker.drain_once())
+
+        self.assertEqual(len(store.sent), 20)
+        self.assertEqual(transport.most_in_flight, 3)
+
+    def test_failure_is_retried_with_backoff(self):
+        store = InMemoryStore(self._mails(2))
+        worker = MailWorker(
+            store,
+            RecordingTransport(fail_for=[1]),
+            retry_backoff=10,
+        )
+
+        self.loop.run_until_complete(worker.drain_once())
+
+        self.assertEqual(store.sent, [0])
+        self.assertEqual(store.failed, [(1, 'relay unavailable', 10)])
+
+    def test_failure_gives_up_after_max_attempts(self):
+        store = InMemoryStore(self._mails(1, attempts=2))
+        worker = MailWorker(
+            store,
+            RecordingTransport(fail_for=[0]),
+            max_attempts=3,
+        )
+
+        self.loop.run_until_complete(worker.drain_once())
+
+        self.assertEqual(store.failed, [(0, 'relay unavailable', None)])
+
+    def test_retry_delay(self):
+        worker = MailWorker(None, None, max_attempts=4, retry_backoff=30)
+
+        self.assertEqual(worker.retry_delay(1), 30)
+        self.assertEqual(worker.retry_delay(2), 60)
+        self.assertEqual(worker.retry_delay(3), 120)
+        self.assertIsNone(worker.retry_delay(4))